@@ -1,5 +1,7 @@
 """Mulliken population analysis."""
 import numpy as np
+from scipy import sparse
+from chemtools.orbstools import validation
 from chemtools.orbstools.orthogonalization import power_symmetric
 from chemtools.orbstools.quasi import project
 
@@ -65,6 +67,9 @@ def mulliken_populations(
         &= \sum_{jk} (\sum_A w_{jk}^A) S_{jk} P_{kj}\\
         &= \sum_{jk} S_{jk} P_{kj}
 
+    The numerical checks of the inputs (e.g. symmetry of the overlap and normalization of the
+    molecular orbitals) follow the validation policy of `chemtools.orbstools.validation`.
+
     Parameters
     ----------
     coeff_ab_mo : np.ndarray(K, M)
@@ -93,13 +98,17 @@ def mulliken_populations(
         Index of the atom to which each atomic basis function belongs.
         Data type must be integers.
         `K` is the number of atomic orbitals.
-    atom_weights : np.ndarray(A, K, K)
+    atom_weights : {np.ndarray(A, K, K), np.ndarray(A, K), list of scipy.sparse.spmatrix(K, K)}
         Weights of the atomic orbital pairs for the atoms. In other words, this weight controls the
         amount of electrons associated with an atomic orbital pair that will be attributed to an
         atom.
         `A` is the number of atoms and `K` is the number of atomic orbitals.
+        Weights can be given as a dense array, as a list of sparse matrices (one for each atom), or
+        in the factored form :math:`u_j^A` of shape (A, K) for the weights
+        :math:`w_{jk}^A = (u_j^A + u_k^A) / 2`, which avoids building the density matrix.
         Default is the Mulliken partitioning scheme where two orbitals that belong to the given atom
-        is 1, only one orbital that belong to the given atoms is 0.5, and no orbitals is 0.
+        is 1, only one orbital that belong to the given atoms is 0.5, and no orbitals is 0, which
+        is computed from the gross populations of the atomic orbitals using O(K^2) memory.
 
     Returns
     -------
@@ -116,8 +125,8 @@ def mulliken_populations(
         If `olp_ab_ab` is not a two-dimensional numpy array of floats.
         If `num_atoms` is not an integer.
         If `ab_atom_indices` is not a a one-dimensional numpy array of ints.
-        If `atom_weights` is not the default value (`None`) and is not a 3-dimensional numpy array
-        of ints/flotas.
+        If `atom_weights` is not the default value (`None`) and is not a 2- or 3-dimensional numpy
+        array of ints/flotas or a list of sparse matrices.
     ValueError
         If `olp_ab_ab` is not square.
         If the number of rows in `coeff_ab_mo` is not equal to the number of rows in
@@ -192,11 +201,11 @@ def mulliken_populations(
             "equal."
         )
 
-    if not np.allclose(olp_ab_ab, olp_ab_ab.T):
+    if not validation.is_symmetric(olp_ab_ab):
         raise ValueError("Overlap of the atomic basis functions must be symmetric.")
     if not np.allclose(np.diag(olp_ab_ab), 1):
         raise ValueError("Overlap of the atomic basis functions must be normalized.")
-    if not np.allclose(np.diag(coeff_ab_mo.T.dot(olp_ab_ab).dot(coeff_ab_mo)), 1):
+    if not validation.is_normalized(coeff_ab_mo, olp_ab_ab):
         raise ValueError(
             "Molecular orbitals (and the corresponding transformation matrix) must be normalized."
         )
@@ -218,22 +227,56 @@ def mulliken_populations(
             " less than the number of atoms"
         )
 
-    if atom_weights is None:
-        num_ab = olp_ab_ab.shape[0]
-        # NOTE: creating this numpy array is quite memory intensive. Since nothing here will ever be
-        # a computational bottleneck, it will be smarter to use a for loop incorporating the next
-        # two parts (weights and density) together. However, we keep these two parts separated to
-        # make it easier to implement different weight paradigms.
-        atom_weights = np.zeros((num_atoms, num_ab, num_ab))
-        ab_atom_indices_separated = ab_atom_indices[None, :] == np.arange(num_atoms)[:, None]
-        atom_weights += (ab_atom_indices_separated.astype(float) * 0.5)[:, :, None]
-        atom_weights += (ab_atom_indices_separated.astype(float) * 0.5)[:, None, :]
-        # code above is equivalent to the following:
-        # atom_weights = {}
-        # for i in range(num_atoms):
-        #     weights = np.zeros(num_ab)
-        #     weights[ab_atom_indices == i] = 0.5
-        #     atom_weights[i] = weights[:, None] + weights[None, :]
+    num_ab = olp_ab_ab.shape[0]
+    if atom_weights is None or (isinstance(atom_weights, np.ndarray) and atom_weights.ndim == 2):
+        if atom_weights is not None:
+            if atom_weights.dtype not in [float, int]:
+                raise TypeError(
+                    "Orbital weights for the atoms must be a numpy array of ints/floats."
+                )
+            if atom_weights.shape != (num_atoms, num_ab):
+                raise ValueError(
+                    "Factored orbital weights for the atoms must have the shape (number of atoms, "
+                    "number of atomic orbitals)."
+                )
+            if not validation.is_partition(atom_weights):
+                raise ValueError(
+                    "Orbital weights for the atoms must be normalized, i.e. sum over the first "
+                    "dimension must result in 1's."
+                )
+        # NOTE: the weights w_{jk}^A = (u_j^A + u_k^A) / 2 (which includes the Mulliken
+        # partitioning, where u_j^A is 1 if orbital j belongs to atom A and 0 otherwise) only need
+        # the gross populations of the atomic orbitals, i.e. the diagonal of S P, so the density
+        # matrix and the (A, K, K) weights are never built.
+        ab_pops = np.sum(olp_ab_ab.dot(coeff_ab_mo) * coeff_ab_mo * occupations[None, :], axis=1)
+        if atom_weights is None:
+            output = np.bincount(ab_atom_indices, weights=ab_pops, minlength=num_atoms)
+        else:
+            output = atom_weights.dot(ab_pops)
+    elif isinstance(atom_weights, (list, tuple)) and all(
+        sparse.issparse(weights) for weights in atom_weights
+    ):
+        if len(atom_weights) != num_atoms:
+            raise ValueError(
+                "Number of sparse orbital weights for the atoms must be equal to the number of "
+                "atoms."
+            )
+        if any(weights.shape != olp_ab_ab.shape for weights in atom_weights):
+            raise ValueError(
+                "Sparse orbital weights for each atom must have a shape equal to the number of "
+                "atomic orbitals."
+            )
+        check = validation.get_validation() != "off"
+        if check and any(abs(weights - weights.T).max() > 1e-8 for weights in atom_weights):
+            raise ValueError("Sparse orbital weights for each atom must be symmetric.")
+        if check and not np.allclose(sum(atom_weights).toarray(), 1):
+            raise ValueError(
+                "Orbital weights for the atoms must be normalized, i.e. sum over the atoms must "
+                "result in 1's."
+            )
+        density = (coeff_ab_mo * occupations[None, :]).dot(coeff_ab_mo.T)
+        raw_pops = olp_ab_ab * density.T
+        output = np.array([weights.multiply(raw_pops).sum() for weights in atom_weights])
     else:
         if not (
             isinstance(atom_weights, np.ndarray)
@@ -241,7 +284,8 @@ def mulliken_populations(
             and atom_weights.dtype in [float, int]
         ):
             raise TypeError(
-                "Orbital weights for the atoms must be a 3-dimensional numpy array of ints/floats."
+                "Orbital weights for the atoms must be a 2- or 3-dimensional numpy array of "
+                "ints/floats or a list of scipy sparse matrices."
             )
         if atom_weights.shape[0] != num_atoms:
             raise ValueError(
@@ -253,26 +297,23 @@ def mulliken_populations(
                 "Second and third dimension of the orbital weights for the atoms must be equal to "
                 "the number of atomic orbitals."
             )
-        if not np.allclose(atom_weights, np.swapaxes(atom_weights, 1, 2)):
+        if not validation.is_symmetric(atom_weights):
             raise ValueError(
                 "Orbital weights for each atom must be symmetric, i.e. `atom_weights` must be "
                 "symmetric with respect to the interchange of the second and third indices."
             )
-        if not np.allclose(np.sum(atom_weights, axis=0), 1):
+        if not validation.is_partition(atom_weights):
             raise ValueError(
                 "Orbital weights for the atoms must be normalized, i.e. sum over the first "
                 "dimension must result in 1's."
             )
-
-    # NOTE: the axis keyword used here for np.sum uses API introduced in numpy 1.7.0. This means
-    # that this function call will restrict the version of numpy used by this package.
-    density = (coeff_ab_mo * occupations[None, :]).dot(coeff_ab_mo.T)
-    raw_pops = (olp_ab_ab * density.T)[None, :, :] * atom_weights
-    output = np.sum(raw_pops, axis=(1, 2))
-    # code above is equivalent to the following:
-    # output = np.zeros(num_atoms)
-    # for atom_ind, weights in atom_weights.items():
-    #     output[atom_ind] = np.sum(olp_ab_ab * density.T * weights)
+        density = (coeff_ab_mo * occupations[None, :]).dot(coeff_ab_mo.T)
+        raw_pops = olp_ab_ab * density.T
+        output = atom_weights.reshape(num_atoms, -1).dot(raw_pops.ravel())
+        # code above is equivalent to the following:
+        # output = np.zeros(num_atoms)
+        # for atom_ind, weights in enumerate(atom_weights):
+        #     output[atom_ind] = np.sum(olp_ab_ab * density.T * weights)
 
     if not abs(np.sum(occupations) - np.sum(output)) < 1e-6:
         print("WARNING: Population does not match up with the number of electrons.")
@@ -422,3 +463,243 @@ def lowdin_populations(
         ab_atom_indices,
         new_atom_weights=atom_weights,
     )
+
+
+def _check_batch_input(
+    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, ab_weights
+):
+    """Check the inputs of the batched population analysis.
+
+    Returns
+    -------
+    occupations : np.ndarray(T, M)
+        Occupation numbers of the molecular orbitals of each wavefunction.
+    ab_weights : np.ndarray(A, K)
+        Factored weights of the atomic orbitals for the atoms.
+
+    """
+    # pylint: disable=R0912
+    if not (
+        isinstance(coeff_ab_mo, np.ndarray) and coeff_ab_mo.ndim == 3 and coeff_ab_mo.dtype == float
+    ):
+        raise TypeError(
+            "Transformation matrices from atomic basis functions to molecular orbitals must be a "
+            "three-dimensional numpy array of floats."
+        )
+    if not (
+        isinstance(occupations, np.ndarray)
+        and occupations.ndim in [1, 2]
+        and occupations.dtype in [float, int]
+    ):
+        raise TypeError(
+            "Molecular orbital occupation numbers must be a one- or two-dimensional numpy array of "
+            "floats or ints."
+        )
+    if not (isinstance(olp_ab_ab, np.ndarray) and olp_ab_ab.ndim == 2 and olp_ab_ab.dtype == float):
+        raise TypeError(
+            "Overlap of the atomic basis functions must be a two-dimensional numpy array of floats."
+        )
+    if not isinstance(num_atoms, int):
+        raise TypeError("Number of atoms must be an integer.")
+    if not (
+        isinstance(ab_atom_indices, np.ndarray)
+        and ab_atom_indices.ndim == 1
+        and ab_atom_indices.dtype == int
+    ):
+        raise TypeError(
+            "Atom indices of each atomic basis function must be a one-dimensional numpy array of "
+            "integers with size equal to the number of atomic basis functions."
+        )
+
+    num_ab = olp_ab_ab.shape[0]
+    if not olp_ab_ab.shape[1] == num_ab:
+        raise ValueError("Overlap matrix is not square.")
+    if not coeff_ab_mo.shape[1] == num_ab:
+        raise ValueError(
+            "Number of atomic orbitals in the transformation matrices and overlap matrix are not "
+            "equal."
+        )
+    occupations = np.broadcast_to(occupations, coeff_ab_mo.shape[:1] + occupations.shape[-1:])
+    if occupations.shape != (coeff_ab_mo.shape[0], coeff_ab_mo.shape[2]):
+        raise ValueError(
+            "Number of wavefunctions and molecular orbitals in the transformation matrices and "
+            "occupations are not equal."
+        )
+    if not validation.is_symmetric(olp_ab_ab):
+        raise ValueError("Overlap of the atomic basis functions must be symmetric.")
+    if not np.allclose(np.diag(olp_ab_ab), 1):
+        raise ValueError("Overlap of the atomic basis functions must be normalized.")
+    if not np.all(occupations >= 0):
+        raise ValueError("Occupation numbers must be greater than or equal to 0.")
+    if np.any(occupations > 2):
+        print("WARNING: Atleast one occupation number exceeds 2.")
+
+    if ab_atom_indices.size != num_ab:
+        raise ValueError(
+            "Number of indices in `ab_atom_indices` must be equal to the number of atomic basis "
+            "functions."
+        )
+    if not (np.all(ab_atom_indices >= 0) and np.all(ab_atom_indices < num_atoms)):
+        raise ValueError(
+            "Atom indices of each atomic basis function must be greater than or equal to zero and "
+            " less than the number of atoms"
+        )
+    if ab_weights is None:
+        ab_weights = (ab_atom_indices[None, :] == np.arange(num_atoms)[:, None]).astype(float)
+    else:
+        if not (
+            isinstance(ab_weights, np.ndarray)
+            and ab_weights.ndim == 2
+            and ab_weights.dtype in [float, int]
+        ):
+            raise TypeError(
+                "Factored orbital weights for the atoms must be a two-dimensional numpy array of "
+                "ints/floats."
+            )
+        if ab_weights.shape != (num_atoms, num_ab):
+            raise ValueError(
+                "Factored orbital weights for the atoms must have the shape (number of atoms, "
+                "number of atomic orbitals)."
+            )
+        if not validation.is_partition(ab_weights):
+            raise ValueError(
+                "Orbital weights for the atoms must be normalized, i.e. sum over the first "
+                "dimension must result in 1's."
+            )
+    return occupations, ab_weights
+
+
+def _batch_populations(coeff_ab_mo, olp_coeff_ab_mo, occupations, ab_weights):
+    """Return the atomic populations from the gross populations of the atomic orbitals.
+
+    Parameters
+    ----------
+    coeff_ab_mo : np.ndarray(T, K, M)
+        Transformation matrices from the atomic basis to molecular orbitals.
+    olp_coeff_ab_mo : np.ndarray(T, K, M)
+        Product of the overlap of the atomic basis functions and the transformation matrices.
+    occupations : np.ndarray(T, M)
+        Occupation numbers of each molecular orbital.
+    ab_weights : np.ndarray(A, K)
+        Factored weights of the atomic orbitals for the atoms.
+
+    Returns
+    -------
+    population : np.ndarray(T, A)
+        Number of electrons associated with each atom in each wavefunction.
+
+    """
+    if not validation.is_normalized_batch(coeff_ab_mo, olp_coeff_ab_mo):
+        raise ValueError(
+            "Molecular orbitals (and the corresponding transformation matrix) must be normalized."
+        )
+    # gross populations of the atomic orbitals, i.e. diagonal of S P for each wavefunction
+    ab_pops = np.matmul(coeff_ab_mo * olp_coeff_ab_mo, occupations[:, :, None])[:, :, 0]
+    output = ab_pops.dot(ab_weights.T)
+    if not np.allclose(np.sum(occupations, axis=1), np.sum(output, axis=1), rtol=0, atol=1e-6):
+        print("WARNING: Population does not match up with the number of electrons.")
+    return output
+
+
+def mulliken_populations_batch(
+    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, ab_weights=None
+):
+    r"""Return the Mulliken populations of a stack of wavefunctions with the same basis set.
+
+    Parameters
+    ----------
+    coeff_ab_mo : np.ndarray(T, K, M)
+        Transformation matrices from the atomic basis to molecular orbitals of `T`
+        wavefunctions (e.g. snapshots of a trajectory).
+        Data type must be float.
+        `K` is the number of atomic orbitals and `M` is the number of molecular orbitals.
+    occupations : {np.ndarray(T, M), np.ndarray(M,)}
+        Occupation numbers of each molecular orbital of each wavefunction, or of all
+        wavefunctions.
+        Data type must be integers or floats.
+    olp_ab_ab : np.ndarray(K, K)
+        Overlap between atomic basis functions, shared by all wavefunctions.
+        Data type must be floats.
+    num_atoms : int
+        Number of atoms.
+    ab_atom_indices : np.ndarray(K,)
+        Index of the atom to which each atomic basis function belongs.
+        Data type must be integers.
+    ab_weights : np.ndarray(A, K)
+        Factored weights :math:`u_j^A` of the atomic orbitals for the atoms, i.e. the weight of an
+        atomic orbital pair is :math:`w_{jk}^A = (u_j^A + u_k^A) / 2`.
+        Default is the Mulliken partitioning scheme, where :math:`u_j^A` is 1 if the atomic orbital
+        belongs to the atom and 0 otherwise.
+
+    Returns
+    -------
+    population : np.ndarray(T, A)
+        Number of electrons associated with each atom in each wavefunction.
+
+    Raises
+    ------
+    TypeError
+        If the inputs do not have the types of the parameters.
+    ValueError
+        If the shapes of the inputs are not consistent.
+        If the inputs do not satisfy the conditions of `mulliken_populations`.
+
+    See Also
+    --------
+    orbstools.mulliken.mulliken_populations
+
+    """
+    occupations, ab_weights = _check_batch_input(
+        coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, ab_weights
+    )
+    return _batch_populations(
+        coeff_ab_mo, np.matmul(olp_ab_ab, coeff_ab_mo), occupations, ab_weights
+    )
+
+
+def lowdin_populations_batch(
+    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, ab_weights=None
+):
+    r"""Return the Lowdin populations of a stack of wavefunctions with the same basis set.
+
+    The overlap is factored once, :math:`S^{1/2}`, and the molecular orbitals of all wavefunctions
+    are transformed to the symmetrically orthogonalized basis with one batched product.
+
+    Parameters
+    ----------
+    coeff_ab_mo : np.ndarray(T, K, M)
+        Transformation matrices from the atomic basis to molecular orbitals of `T`
+        wavefunctions (e.g. snapshots of a trajectory).
+        Data type must be float.
+        `K` is the number of atomic orbitals and `M` is the number of molecular orbitals.
+    occupations : {np.ndarray(T, M), np.ndarray(M,)}
+        Occupation numbers of each molecular orbital of each wavefunction, or of all
+        wavefunctions.
+        Data type must be integers or floats.
+    olp_ab_ab : np.ndarray(K, K)
+        Overlap between atomic basis functions, shared by all wavefunctions.
+        Data type must be floats.
+    num_atoms : int
+        Number of atoms.
+    ab_atom_indices : np.ndarray(K,)
+        Index of the atom to which each atomic basis function belongs.
+        Data type must be integers.
+    ab_weights : np.ndarray(A, K)
+        Factored weights :math:`u_j^A` of the orthogonalized atomic orbitals for the atoms.
+        Default is the Mulliken partitioning scheme.
+
+    Returns
+    -------
+    population : np.ndarray(T, A)
+        Number of electrons associated with each atom in each wavefunction.
+
+    See Also
+    --------
+    orbstools.mulliken.lowdin_populations
+
+    """
+    occupations, ab_weights = _check_batch_input(
+        coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, ab_weights
+    )
+    coeff_oab_mo = np.matmul(power_symmetric(olp_ab_ab, 0.5), coeff_ab_mo)
+    return _batch_populations(coeff_oab_mo, coeff_oab_mo, occupations, ab_weights)
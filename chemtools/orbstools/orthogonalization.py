@@ -1,5 +1,14 @@
 """Tools for matrix decomposition and power."""
+from collections import OrderedDict
+import hashlib
+
 import numpy as np
+from chemtools.orbstools import validation
+
+# maximum number of bytes of the eigenvalues and eigenvectors kept by `factorize_symmetric`
+# (factorizations larger than this are not kept, and 0 disables the cache)
+FACTORIZATION_CACHE_BYTES = 256 * 1024 ** 2
+_FACTORIZATION_CACHE = OrderedDict()
 
 
 def eigh(matrix, threshold=1e-9):
@@ -46,7 +55,7 @@ def eigh(matrix, threshold=1e-9):
         raise TypeError("Given matrix must be a two-dimensional numpy array.")
     if matrix.shape[0] != matrix.shape[1]:
         raise ValueError("Given matrix must be square.")
-    if not np.allclose(matrix.conjugate().T, matrix):
+    if not validation.is_symmetric(matrix):
         raise ValueError("Given matrix must be Hermitian.")
     if not isinstance(threshold, (int, float)):
         raise TypeError("Given threshold must be an integer or a float.")
@@ -130,9 +139,144 @@ def svd(matrix, threshold=1e-9):
     return u, sigma, vdagger
 
 
+class SymmetricFactorization(object):
+    """Eigendecomposition of a symmetric matrix that serves any power of the matrix.
+
+    Attributes
+    ----------
+    eigval : np.ndarray(K,)
+        Eigenvalues (above the threshold) sorted in decreasing order.
+    eigvec : np.ndarray(N, K)
+        Matrix where the columns are the corresponding eigenvectors to the eigval.
+
+    """
+
+    def __init__(self, matrix, threshold=1e-9):
+        """Diagonalize the given symmetric matrix.
+
+        Parameters
+        ----------
+        matrix : np.ndarray(N, N)
+            Symmetric matrix.
+        threshold : {1e-9, float}
+            In the eigenvalue decomposition, the eigenvalues (and corresponding eigenvectors) that
+            are less than the threshold are discarded.
+
+        """
+        self.eigval, self.eigvec = eigh(matrix, threshold=threshold)
+        self.eigval.flags.writeable = False
+        self.eigvec.flags.writeable = False
+
+    @property
+    def nbytes(self):
+        """Return the number of bytes of the eigenvalues and eigenvectors."""
+        return self.eigval.nbytes + self.eigvec.nbytes
+
+    def power(self, k):
+        """Return the kth power of the matrix.
+
+        Parameters
+        ----------
+        k : {int, float}
+            Power of the matrix.
+
+        Returns
+        -------
+        matrix_power : np.ndarray(N, N)
+            Matrix raised to the kth power.
+
+        Raises
+        ------
+        ValueError
+            If the `k` is a fraction and matrix has negative eigenvalues.
+
+        """
+        if k % 1 != 0 and np.any(self.eigval < 0):
+            raise ValueError(
+                "Given matrix has negative eigenvalues. Fractional powers of negative "
+                "eigenvalues are not supported."
+            )
+        return (self.eigvec * (self.eigval ** k)).dot(self.eigvec.T)
+
+
+def _factorization_key(matrix, threshold):
+    """Return the key of the factorization of the given matrix in the cache.
+
+    The key is the hash of the content of the matrix, which is cheap compared to its
+    eigendecomposition.
+
+    """
+    sha = hashlib.sha1(np.ascontiguousarray(matrix).view(np.uint8))
+    sha.update(str((matrix.shape, matrix.dtype.str, threshold)).encode())
+    return sha.hexdigest()
+
+
+def factorize_symmetric(matrix, threshold=1e-9):
+    """Return the (memoized) eigendecomposition of the given symmetric matrix.
+
+    Factorizations are memoized by the content of the matrix, so repeated calls on the same (or an
+    equal) matrix diagonalize it only once. The cache holds the eigenvalues and eigenvectors of at
+    most `FACTORIZATION_CACHE_BYTES` bytes (256 MiB by default) for the life of the process,
+    discarding the least recently used factorizations. A factorization of an N x N matrix of floats
+    takes about 8 N^2 bytes, so a factorization larger than the whole cache (N above about 5800
+    by default, e.g. the overlap of a large basis set) is never cached and is recomputed on every
+    call. Raise `FACTORIZATION_CACHE_BYTES` to cache such factorizations, set it to 0 to disable
+    the cache, and use `clear_factorization_cache` to release the memory it holds.
+
+    The matrix is checked to be symmetric on every call, according to the validation policy.
+
+    Parameters
+    ----------
+    matrix : np.ndarray(N, N)
+        Symmetric matrix.
+    threshold : {1e-9, float}
+        In the eigenvalue decomposition, the eigenvalues (and corresponding eigenvectors) that are
+        less than the threshold are discarded.
+
+    Returns
+    -------
+    factorization : SymmetricFactorization
+        Eigendecomposition of the matrix.
+
+    Raises
+    ------
+    TypeError
+        If `matrix` is not a two-dimensional numpy array.
+    ValueError
+        If `matrix` is not a square matrix.
+        If `matrix` is not Hermitian.
+
+    """
+    if not (isinstance(matrix, np.ndarray) and matrix.ndim == 2):
+        raise TypeError("Given matrix must be a two-dimensional numpy array.")
+    if matrix.shape[0] != matrix.shape[1]:
+        raise ValueError("Given matrix must be square.")
+    key = _factorization_key(matrix, threshold)
+    factorization = _FACTORIZATION_CACHE.pop(key, None)
+    if factorization is None:
+        # symmetry is checked by `eigh`
+        factorization = SymmetricFactorization(matrix, threshold=threshold)
+    elif not validation.is_symmetric(matrix):
+        raise ValueError("Given matrix must be Hermitian.")
+    if factorization.nbytes > FACTORIZATION_CACHE_BYTES:
+        return factorization
+    # most recently used factorizations are at the end
+    _FACTORIZATION_CACHE[key] = factorization
+    while sum(value.nbytes for value in _FACTORIZATION_CACHE.values()) > FACTORIZATION_CACHE_BYTES:
+        _FACTORIZATION_CACHE.popitem(last=False)
+    return factorization
+
+
+def clear_factorization_cache():
+    """Discard the factorizations memoized by `factorize_symmetric`."""
+    _FACTORIZATION_CACHE.clear()
+
+
 def power_symmetric(matrix, k, threshold=1e-9):
     """Return the kth power of the given symmetric matrix.
 
+    The eigendecomposition of the matrix is memoized, see `factorize_symmetric`.
+
     Parameters
     ----------
     matrix : np.ndarray(N, N)
@@ -154,10 +298,4 @@ def power_symmetric(matrix, k, threshold=1e-9):
         If the `k` is a fraction and matrix has negative eigenvalues.
 
     """
-    eigval, eigvec = eigh(matrix, threshold=threshold)
-    if k % 1 != 0 and np.any(eigval < 0):
-        raise ValueError(
-            "Given matrix has negative eigenvalues. Fractional powers of negative eigenvalues are "
-            "not supported."
-        )
-    return (eigvec * (eigval ** k)).dot(eigvec.T)
+    return factorize_symmetric(matrix, threshold=threshold).power(k)
@@ -1,6 +1,9 @@
 """Module for making Quasiatomic orbitals."""
+import numbers
+
 import numpy as np
 from chemtools.orbstools import orthogonalization as orth
+from chemtools.orbstools import validation
 
 
 def _check_input(
@@ -8,6 +11,9 @@ def _check_input(
 ):
     """Check the inputs.
 
+    The numerical checks (e.g. normalization, symmetry and positive semidefiniteness) follow the
+    validation policy of `chemtools.orbstools.validation`.
+
     Parameters
     ----------
     olp_ab_ab : np.ndarray(K, K)
@@ -72,9 +78,9 @@ def _check_input(
             )
         if not np.allclose(np.diag(olp_ab_ab), np.ones(olp_ab_ab.shape[0])):
             raise ValueError("Given overlap matrix for atomic basis is not normalized.")
-        if not np.allclose(olp_ab_ab, olp_ab_ab.T):
+        if not validation.is_symmetric(olp_ab_ab):
             raise ValueError("Given overlap matrix for atomic basis is not symmetric.")
-        if not np.all(orth.eigh(olp_ab_ab)[0] >= 0):
+        if not validation.is_positive_semidefinite(olp_ab_ab):
             raise ValueError("Given overlap matrix for atomic basis is not positive semidefinite.")
 
     if olp_aao_ab is not None:
@@ -95,9 +101,9 @@ def _check_input(
             )
         if not np.allclose(np.diag(olp_aao_aao), np.ones(olp_aao_aao.shape[0])):
             raise ValueError("Given overlap matrix for AAO is not normalized.")
-        if not np.allclose(olp_aao_aao, olp_aao_aao.T):
+        if not validation.is_symmetric(olp_aao_aao):
             raise ValueError("Given overlap matrix for AAO is not symmetric.")
-        if not np.all(orth.eigh(olp_aao_aao)[0] >= 0):
+        if not validation.is_positive_semidefinite(olp_aao_aao):
             raise ValueError("Given overlap matrix for AAO is not positive semidefinite.")
 
     if (
@@ -139,8 +145,7 @@ def _check_input(
         )
 
     if coeff_ab_mo is not None and olp_ab_ab is not None:
-        olp_mo_mo = coeff_ab_mo.T.dot(olp_ab_ab).dot(coeff_ab_mo)
-        if not np.allclose(np.diag(olp_mo_mo), np.ones(olp_mo_mo.shape[0])):
+        if not validation.is_normalized(coeff_ab_mo, olp_ab_ab):
             raise ValueError(
                 "The overlap of the molecular orbitals, calculated from `coeff_ab_mo` and "
                 "`olp_ab_ab` is not normalized."
@@ -162,7 +167,7 @@ def _check_input(
             )
 
 
-def project(olp_one_one, olp_one_two):
+def project(olp_one_one, olp_one_two, check_rank=True):
     r"""Project one basis set onto another basis set.
 
     .. math::
@@ -180,6 +185,9 @@ def project(olp_one_one, olp_one_two):
         Overlap of the basis functions in set 1 with basis functions from set 1.
     olp_one_two : np.ndarray(N, M)
         Overlap of the basis functions in set 1 with basis functions from set 2.
+    check_rank : {True, bool}
+        Whether to warn about linearly dependent projections, which needs the rank (i.e. a singular
+        value decomposition) of the transformation matrix.
 
     Returns
     -------
@@ -210,6 +218,8 @@ def project(olp_one_one, olp_one_two):
     normalizer = np.diag(olp_proj_proj) ** (-0.5)
     coeff_one_proj *= normalizer
     # Check linear dependence
+    if not check_rank:
+        return coeff_one_proj
     rank = np.linalg.matrix_rank(coeff_one_proj)
     if rank < coeff_one_proj.shape[1]:
         print(
@@ -221,7 +231,7 @@ def project(olp_one_one, olp_one_two):
     return coeff_one_proj
 
 
-def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
+def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None, block_size=None):
     r"""Return transformation matrix from atomic basis functions to minimal molecular orbitals.
 
     Parameters
@@ -236,6 +246,13 @@ def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
     dim_mmo : {int, None}
         Total dimension of the MMO space.
         Default is the dimension of the reference basis function space.
+    block_size : {int, None}
+        Number of virtual molecular orbitals that are processed at once.
+        If given, the overlap of the reference basis functions with the virtual molecular orbitals
+        is never built. Instead, the largest right singular vectors are obtained from the
+        eigenvectors of its (small) Gram matrix, which is accumulated over blocks of virtual
+        molecular orbitals, see `_make_virtual_mmo`.
+        Default builds the whole overlap and computes its singular value decomposition.
 
     Returns
     -------
@@ -246,7 +263,9 @@ def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
     ------
     TypeError
         If `dim_mmo` is not an integer (or None).
+        If `block_size` is not an integer (or None).
     ValueError
+        If `block_size` is not positive.
         If the dimension of the MMO space is larger than the number of molecular orbitals.
         If the dimension of the MMO space is smaller than the space that needs to be spanned.
 
@@ -261,9 +280,13 @@ def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
 
     """
     _check_input(coeff_ab_mo=coeff_ab_mo, olp_aao_ab=olp_aao_ab, indices_span=indices_span)
-    olp_aao_mo = olp_aao_ab.dot(coeff_ab_mo)
+    if block_size is not None:
+        if not isinstance(block_size, numbers.Integral):
+            raise TypeError("Block size must be an integer (or None).")
+        if block_size <= 0:
+            raise ValueError("Block size must be positive, not {0}.".format(block_size))
 
-    num_aao, num_mo = olp_aao_mo.shape
+    num_aao, num_mo = olp_aao_ab.shape[0], coeff_ab_mo.shape[1]
     if dim_mmo is None:
         dim_mmo = num_aao
     if not isinstance(dim_mmo, int):
@@ -283,12 +306,18 @@ def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
     dim_span = np.sum(indices_span)
     num_to_add = dim_mmo - dim_span
 
+    if block_size is not None:
+        coeff_ab_virmmo = _make_virtual_mmo(
+            olp_aao_ab, coeff_ab_mo, np.flatnonzero(~indices_span), num_to_add, block_size
+        )
+        return np.hstack((coeff_ab_mo[:, indices_span], coeff_ab_virmmo))
+
     # Create occupied MMO
     coeff_occmo_occmmo = np.identity(dim_span)
 
     # Create virtual MMO
     #  find overlap between aao and virtuals
-    olp_aao_virmo = olp_aao_mo[:, ~indices_span]
+    olp_aao_virmo = olp_aao_ab.dot(coeff_ab_mo[:, ~indices_span])
     #  from the right singular vector of olp_aao_virmo
     coeff_virmo_virmmo = orth.svd(olp_aao_virmo)[2].T
     #  select vectors with largest (num_to_add) singular values
@@ -305,7 +334,63 @@ def make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=None):
     return coeff_ab_mo.dot(coeff_mo_mmo)
 
 
-def quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, dim=None):
+def _make_virtual_mmo(olp_aao_ab, coeff_ab_mo, indices_vir, num_to_add, block_size):
+    r"""Return the virtual MMO's from blocks of virtual molecular orbitals.
+
+    The virtual MMO's are the virtual molecular orbitals transformed by the right singular vectors
+    of :math:`A = \braket{\mathrm{AAO} | \mathrm{virMO}}` with the largest singular values. Since
+    :math:`A` has few rows, these are obtained from the eigendecomposition of
+    :math:`A A^\dagger = U \Sigma^2 U^\dagger`:
+
+    .. math::
+
+        C^{\mathrm{AB},\mathrm{virMMO}} = C^{\mathrm{AB},\mathrm{virMO}} V
+        = (C^{\mathrm{AB},\mathrm{virMO}} A^\dagger) U \Sigma^{-1}
+
+    where :math:`A A^\dagger` and :math:`C^{\mathrm{AB},\mathrm{virMO}} A^\dagger` are accumulated
+    over blocks of virtual molecular orbitals.
+
+    Parameters
+    ----------
+    olp_aao_ab : np.ndarray(L, K)
+        Overlap between reference basis functions (rows) and atomic basis functions (columns).
+    coeff_ab_mo : np.ndarray(K, M)
+        Transformation matrix from atomic basis functions (rows) to molecular orbitals (columns).
+    indices_vir : np.ndarray
+        Indices of the virtual molecular orbitals.
+    num_to_add : int
+        Number of virtual MMO's.
+    block_size : int
+        Number of virtual molecular orbitals that are processed at once.
+
+    Returns
+    -------
+    coeff_ab_virmmo : np.ndarray(K, num_to_add)
+        Transformation matrix from atomic basis functions to virtual MMO's.
+
+    """
+    num_aao, num_ab = olp_aao_ab.shape
+    gram = np.zeros((num_aao, num_aao))
+    coeff_ab_aaovir = np.zeros((num_ab, num_aao))
+    for start in range(0, indices_vir.size, block_size):
+        coeff_ab_block = coeff_ab_mo[:, indices_vir[start:start + block_size]]
+        olp_aao_block = olp_aao_ab.dot(coeff_ab_block)
+        gram += olp_aao_block.dot(olp_aao_block.T)
+        coeff_ab_aaovir += coeff_ab_block.dot(olp_aao_block.T)
+    # the Gram matrix is symmetric by construction, so its eigenvalues (squared singular values)
+    # are sorted in decreasing order directly
+    sigma_sq, coeff_aao_left = np.linalg.eigh(gram)
+    sigma_sq, coeff_aao_left = sigma_sq[::-1], coeff_aao_left[:, ::-1]
+    # squared singular values at the rounding error of the Gram matrix are discarded, i.e. below
+    # max(sigma_sq) * L * eps, which does not depend on the scale of the overlap
+    kept = sigma_sq > sigma_sq[0] * num_aao * np.finfo(float).eps
+    sigma_sq, coeff_aao_left = sigma_sq[kept][:num_to_add], coeff_aao_left[:, kept][:, :num_to_add]
+    return coeff_ab_aaovir.dot(coeff_aao_left) / np.sqrt(sigma_sq)
+
+
+def quambo(
+    olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, dim=None, block_size=None, check_rank=True
+):
     r"""Return transformation matrix from atomic basis functions to QUAMBO's.
 
     Parameters
@@ -333,6 +418,11 @@ def quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, dim=None):
     dim : {int, None}
         Number of QUAMBO basis functions.
         Default is the number of reference basis functions.
+    block_size : {int, None}
+        Number of virtual molecular orbitals that are processed at once when making the MMO's.
+        See `make_mmo`.
+    check_rank : {True, bool}
+        Whether to warn about linearly dependent projections. See `project`.
 
     Returns
     -------
@@ -366,11 +456,13 @@ def quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, dim=None):
         indices_span=indices_span,
     )
     # Find MMO for QUAMBOs
-    coeff_ab_mmo = make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=dim)
+    coeff_ab_mmo = make_mmo(
+        olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=dim, block_size=block_size
+    )
     # Get transformation
     olp_mmo_mmo = coeff_ab_mmo.T.dot(olp_ab_ab).dot(coeff_ab_mmo)
     olp_mmo_aao = (olp_aao_ab.dot(coeff_ab_mmo)).T
-    coeff_mmo_proj = project(olp_mmo_mmo, olp_mmo_aao)
+    coeff_mmo_proj = project(olp_mmo_mmo, olp_mmo_aao, check_rank=check_rank)
     # Normalize
     olp_proj_proj = coeff_mmo_proj.T.dot(olp_mmo_mmo).dot(coeff_mmo_proj)
     coeff_mmo_proj *= np.diag(olp_proj_proj) ** (-0.5)
@@ -378,7 +470,16 @@ def quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, dim=None):
     return coeff_ab_mmo.dot(coeff_mmo_proj)
 
 
-def quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span, dim=None):
+def quao(
+    olp_ab_ab,
+    olp_aao_ab,
+    olp_aao_aao,
+    coeff_ab_mo,
+    indices_span,
+    dim=None,
+    block_size=None,
+    check_rank=True,
+):
     r"""Return transformation matrix from atomic basis functions to QUAO's.
 
     Parameters
@@ -412,6 +513,11 @@ def quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span, dim=None
     dim : {int, None}
         Number of QUAMBO basis functions.
         Default is the number of reference basis functions.
+    block_size : {int, None}
+        Number of virtual molecular orbitals that are processed at once when making the MMO's.
+        See `make_mmo`.
+    check_rank : {True, bool}
+        Whether to warn about linearly dependent projections. See `project`.
 
     Returns
     -------
@@ -448,12 +554,14 @@ def quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span, dim=None
     olp_oaao_ab = orth.power_symmetric(olp_aao_aao, -0.5).dot(olp_aao_ab)
 
     # Get MMOs using the orthogonalized AAOs (MMO for QUAOs)
-    coeff_ab_mmo = make_mmo(olp_oaao_ab, coeff_ab_mo, indices_span, dim_mmo=dim)
+    coeff_ab_mmo = make_mmo(
+        olp_oaao_ab, coeff_ab_mo, indices_span, dim_mmo=dim, block_size=block_size
+    )
 
     # Find transformation for QUAOs
     olp_mmo_mmo = coeff_ab_mmo.T.dot(olp_ab_ab).dot(coeff_ab_mmo)
     olp_mmo_aao = (olp_aao_ab.dot(coeff_ab_mmo)).T
-    coeff_mmo_proj = project(olp_mmo_mmo, olp_mmo_aao)
+    coeff_mmo_proj = project(olp_mmo_mmo, olp_mmo_aao, check_rank=check_rank)
 
     # Normalize
     olp_proj_proj = coeff_mmo_proj.T.dot(olp_mmo_mmo).dot(coeff_mmo_proj)
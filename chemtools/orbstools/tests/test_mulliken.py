@@ -6,13 +6,16 @@ except ImportError:
 
 from chemtools.orbstools.mulliken import (
     lowdin_populations,
+    lowdin_populations_batch,
     mulliken_populations,
+    mulliken_populations_batch,
     mulliken_populations_newbasis,
 )
 from chemtools.orbstools.orthogonalization import power_symmetric
 from chemtools.orbstools.quasi import project
 import numpy as np
 from numpy.testing import assert_raises
+from scipy import sparse
 
 
 def test_mulliken_populations_input():
@@ -385,6 +388,82 @@ def test_mulliken_populations():
     )
 
 
+def test_mulliken_populations_weights_forms():
+    """Test orbstools.mulliken.mulliken_populations with dense, factored and sparse weights."""
+    with path("chemtools.data", "naclo4_coeff_ab_mo.npy") as fname:
+        coeff_ab_mo = np.load(str(fname))
+    with path("chemtools.data", "naclo4_olp_ab_ab.npy") as fname:
+        olp_ab_ab = np.load(str(fname))
+    with path("chemtools.data", "naclo4_occupations.npy") as fname:
+        occupations = np.load(str(fname))
+    with path("chemtools.data", "naclo4_ab_atom_indices.npy") as fname:
+        ab_atom_indices = np.load(str(fname))
+
+    # Mulliken partitioning with explicit dense, factored and sparse weights
+    ab_weights = (ab_atom_indices[None, :] == np.arange(6)[:, None]).astype(float)
+    atom_weights = 0.5 * (ab_weights[:, :, None] + ab_weights[:, None, :])
+    sparse_weights = [sparse.csr_matrix(weights) for weights in atom_weights]
+    pops = mulliken_populations(coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices)
+    assert np.allclose(np.sum(pops), np.sum(occupations))
+    for weights in [atom_weights, ab_weights, sparse_weights]:
+        assert np.allclose(
+            mulliken_populations(
+                coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices, atom_weights=weights
+            ),
+            pops,
+        )
+
+    # factored weights that split the orbitals of the first atom between the first two atoms
+    ab_weights[0, ab_atom_indices == 0] = 0.25
+    ab_weights[1, ab_atom_indices == 0] = 0.75
+    atom_weights = 0.5 * (ab_weights[:, :, None] + ab_weights[:, None, :])
+    sparse_weights = [sparse.csr_matrix(weights) for weights in atom_weights]
+    pops = mulliken_populations(
+        coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices, atom_weights=atom_weights
+    )
+    for weights in [ab_weights, sparse_weights]:
+        assert np.allclose(
+            mulliken_populations(
+                coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices, atom_weights=weights
+            ),
+            pops,
+        )
+
+    assert_raises(
+        TypeError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices,
+        atom_weights=ab_weights.astype(complex),
+    )
+    assert_raises(
+        ValueError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices,
+        atom_weights=ab_weights[:5],
+    )
+    assert_raises(
+        ValueError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices,
+        atom_weights=ab_weights * 2,
+    )
+    assert_raises(
+        ValueError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices,
+        atom_weights=sparse_weights[:5],
+    )
+    assert_raises(
+        ValueError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices,
+        atom_weights=[weights[:, :-1] for weights in sparse_weights],
+    )
+    rand_weights = [weights + sparse.random(124, 124, density=0.01) for weights in sparse_weights]
+    assert_raises(
+        ValueError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices,
+        atom_weights=rand_weights,
+    )
+    assert_raises(
+        ValueError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices,
+        atom_weights=[weights * 2 for weights in sparse_weights],
+    )
+    assert_raises(
+        TypeError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices,
+        atom_weights=list(atom_weights),
+    )
+
+
 def test_mulliken_populations_newbasis():
     """Test orbstools.mulliken.mulliken_populations_newabasis."""
     with path("chemtools.data", "naclo4_coeff_ab_mo.npy") as fname:
@@ -438,3 +517,64 @@ def test_lowdin_populations():
         ),
         lowdin_populations(coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices),
     )
+
+
+def test_populations_batch():
+    """Test orbstools.mulliken.mulliken_populations_batch and lowdin_populations_batch."""
+    with path("chemtools.data", "naclo4_coeff_ab_mo.npy") as fname:
+        coeff_ab_mo = np.load(str(fname))
+    with path("chemtools.data", "naclo4_olp_ab_ab.npy") as fname:
+        olp_ab_ab = np.load(str(fname))
+    with path("chemtools.data", "naclo4_occupations.npy") as fname:
+        occupations = np.load(str(fname))
+    with path("chemtools.data", "naclo4_ab_atom_indices.npy") as fname:
+        ab_atom_indices = np.load(str(fname))
+
+    # wavefunctions with rotated molecular orbitals and different occupations
+    num_mo = coeff_ab_mo.shape[1]
+    coeffs = np.array(
+        [coeff_ab_mo] + [coeff_ab_mo.dot(np.linalg.qr(np.random.rand(num_mo, num_mo))[0])
+                         for _ in range(3)]
+    )
+    occs = np.array([occupations] + [np.random.rand(num_mo) * 2 for _ in range(3)])
+    for func_batch, func in [
+        (mulliken_populations_batch, mulliken_populations),
+        (lowdin_populations_batch, lowdin_populations),
+    ]:
+        pops = func_batch(coeffs, occs, olp_ab_ab, 6, ab_atom_indices)
+        assert pops.shape == (4, 6)
+        for coeff, occ, pop in zip(coeffs, occs, pops):
+            assert np.allclose(pop, func(coeff, occ, olp_ab_ab, 6, ab_atom_indices))
+        # occupations shared by all wavefunctions
+        pops = func_batch(coeffs, occupations, olp_ab_ab, 6, ab_atom_indices)
+        for coeff, pop in zip(coeffs, pops):
+            assert np.allclose(pop, func(coeff, occupations, olp_ab_ab, 6, ab_atom_indices))
+        # factored weights
+        ab_weights = (ab_atom_indices[None, :] == np.arange(6)[:, None]).astype(float)
+        ab_weights[:, ab_atom_indices == 0] = 1 / 6
+        atom_weights = 0.5 * (ab_weights[:, :, None] + ab_weights[:, None, :])
+        pops = func_batch(coeffs, occs, olp_ab_ab, 6, ab_atom_indices, ab_weights=ab_weights)
+        for coeff, occ, pop in zip(coeffs, occs, pops):
+            assert np.allclose(
+                pop, func(coeff, occ, olp_ab_ab, 6, ab_atom_indices, atom_weights=atom_weights)
+            )
+
+        assert_raises(TypeError, func_batch, coeff_ab_mo, occs, olp_ab_ab, 6, ab_atom_indices)
+        assert_raises(
+            TypeError, func_batch, coeffs, occs.tolist(), olp_ab_ab, 6, ab_atom_indices
+        )
+        assert_raises(ValueError, func_batch, coeffs, occs[:2], olp_ab_ab, 6, ab_atom_indices)
+        assert_raises(
+            ValueError, func_batch, coeffs[:, :-1], occs, olp_ab_ab, 6, ab_atom_indices
+        )
+        assert_raises(ValueError, func_batch, coeffs, -occs, olp_ab_ab, 6, ab_atom_indices)
+        assert_raises(ValueError, func_batch, coeffs, occs, olp_ab_ab, 5, ab_atom_indices)
+        assert_raises(ValueError, func_batch, 2 * coeffs, occs, olp_ab_ab, 6, ab_atom_indices)
+        assert_raises(
+            ValueError, func_batch, coeffs, occs, olp_ab_ab, 6, ab_atom_indices,
+            ab_weights=2 * ab_weights,
+        )
+        assert_raises(
+            TypeError, func_batch, coeffs, occs, olp_ab_ab, 6, ab_atom_indices,
+            ab_weights=atom_weights,
+        )
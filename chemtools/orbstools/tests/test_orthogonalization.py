@@ -1,4 +1,5 @@
 """Tests for orbtools.orthogonalization."""
+from chemtools.orbstools import validation
 import chemtools.orbstools.orthogonalization as orth
 import numpy as np
 from numpy.testing import assert_raises
@@ -78,3 +79,74 @@ def test_power_symmetric():
     matrix = np.random.rand(100, 100)
     matrix = matrix + matrix.T
     assert_raises(ValueError, orth.power_symmetric, matrix, 0.5)
+
+
+def test_factorize_symmetric():
+    """Test orbstools.orthogonalization.factorize_symmetric."""
+    orth.clear_factorization_cache()
+    unitary = np.linalg.svd(np.random.rand(10, 10))[0]
+    matrix = (unitary * np.random.rand(10)).dot(unitary.T)
+    factorization = orth.factorize_symmetric(matrix)
+    assert np.allclose(factorization.power(1), matrix)
+    assert np.allclose(factorization.power(-1), np.linalg.inv(matrix))
+    assert np.allclose(factorization.power(0.5).dot(factorization.power(0.5)), matrix)
+    # powers are new arrays
+    factorization.power(1)[0, 0] = 100
+    assert np.allclose(factorization.power(1), matrix)
+    # same and equal matrices are diagonalized once
+    assert orth.factorize_symmetric(matrix) is factorization
+    assert orth.factorize_symmetric(matrix.copy()) is factorization
+    assert orth.factorize_symmetric(matrix, threshold=1e-8) is not factorization
+    assert np.allclose(orth.power_symmetric(matrix, -0.5), factorization.power(-0.5))
+    # modified matrix is diagonalized again
+    matrix[0, 0] += 1
+    assert orth.factorize_symmetric(matrix) is not factorization
+    # read-only matrix modified in place is diagonalized again
+    matrix = np.diag([1., 2., 3.])
+    matrix.flags.writeable = False
+    assert np.allclose(orth.power_symmetric(matrix, 1), matrix)
+    matrix.flags.writeable = True
+    matrix[0, 0] = 5
+    matrix.flags.writeable = False
+    assert np.allclose(orth.power_symmetric(matrix, 1), np.diag([5., 2., 3.]))
+    # matrix cached without checks is still checked
+    with validation.validation("off"):
+        orth.factorize_symmetric(np.array([[2., 1.], [0., 2.]]))
+    assert_raises(ValueError, orth.factorize_symmetric, np.array([[2., 1.], [0., 2.]]))
+    # symmetry is checked once per call, whether the factorization is cached or not
+    is_symmetric, calls = validation.is_symmetric, []
+
+    def counted_is_symmetric(*args, **kwargs):
+        calls.append(args)
+        return is_symmetric(*args, **kwargs)
+
+    validation.is_symmetric = counted_is_symmetric
+    try:
+        orth.factorize_symmetric(np.diag([1., 2., 4.]))
+        orth.factorize_symmetric(np.diag([1., 2., 4.]))
+    finally:
+        validation.is_symmetric = is_symmetric
+    assert len(calls) == 2
+    # cache is bounded by the number of bytes
+    orth.clear_factorization_cache()
+    nbytes = orth.factorize_symmetric(np.diag(np.random.rand(5))).nbytes
+    old_bytes = orth.FACTORIZATION_CACHE_BYTES
+    orth.FACTORIZATION_CACHE_BYTES = 3 * nbytes
+    try:
+        for _ in range(5):
+            orth.factorize_symmetric(np.diag(np.random.rand(5)))
+        assert len(orth._FACTORIZATION_CACHE) == 3
+        orth.factorize_symmetric(np.diag(np.random.rand(10)))
+        assert len(orth._FACTORIZATION_CACHE) == 3
+        orth.FACTORIZATION_CACHE_BYTES = 0
+        orth.clear_factorization_cache()
+        orth.factorize_symmetric(np.diag(np.random.rand(5)))
+        assert len(orth._FACTORIZATION_CACHE) == 0
+    finally:
+        orth.FACTORIZATION_CACHE_BYTES = old_bytes
+    orth.clear_factorization_cache()
+    assert len(orth._FACTORIZATION_CACHE) == 0
+
+    assert_raises(TypeError, orth.factorize_symmetric, np.random.rand(3, 3).tolist())
+    assert_raises(ValueError, orth.factorize_symmetric, np.random.rand(3, 3))
+    assert_raises(ValueError, orth.factorize_symmetric(-np.identity(3)).power, 0.5)
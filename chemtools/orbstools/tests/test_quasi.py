@@ -142,6 +142,8 @@ def test_make_mmo():
     assert_raises(TypeError, make_mmo, olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=8.0)
     assert_raises(ValueError, make_mmo, olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=11)
     assert_raises(ValueError, make_mmo, olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=4)
+    assert_raises(ValueError, make_mmo, olp_aao_ab, coeff_ab_mo, indices_span, block_size=0)
+    assert_raises(TypeError, make_mmo, olp_aao_ab, coeff_ab_mo, indices_span, block_size=2.0)
 
     coeff_ab_mmo = make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=6)
     # check that occupied mo's are spanned exactly
@@ -176,6 +178,31 @@ def test_make_mmo_old_code():
     with path("chemtools.data", "naclo4_coeff_ab_mmo.npy") as fname:
         coeff_ab_mmo = np.load(str(fname))
     assert np.allclose(coeff_ab_mmo, make_mmo(olp_aao_ab, coeff_ab_mo, indices_span))
+    # virtual MMO's from blocks of virtual molecular orbitals are the same up to sign
+    coeff_ab_mmo_block = make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, block_size=10)
+    assert np.allclose(np.abs(coeff_ab_mmo), np.abs(coeff_ab_mmo_block))
+    coeff_ab_mmo_block = make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, block_size=np.int64(10))
+    assert np.allclose(np.abs(coeff_ab_mmo), np.abs(coeff_ab_mmo_block))
+
+
+def test_make_mmo_block_ill_conditioned():
+    """Test orbstools.quasi.make_mmo with blocks against SVD for an ill-conditioned overlap."""
+    np.random.seed(1)
+    coeff_ab_mo = np.linalg.qr(np.random.rand(10, 10))[0]
+    indices_span = np.zeros(10, dtype=bool)
+    indices_span[:2] = True
+    # rank deficient overlap with large and widely spread singular values
+    coeff_left = np.linalg.qr(np.random.rand(4, 4))[0]
+    coeff_right = np.linalg.qr(np.random.rand(10, 10))[0][:, :4]
+    olp_aao_ab = coeff_left.dot(np.diag([1e4, 1e3, 1e1, 0])).dot(coeff_right.T)
+    # more virtual MMO's are requested than the rank, so only three of them are generated
+    coeff_ab_mmo = make_mmo(olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=6)
+    assert coeff_ab_mmo.shape == (10, 5)
+    for block_size in [1, 3, 20]:
+        coeff_ab_mmo_block = make_mmo(
+            olp_aao_ab, coeff_ab_mo, indices_span, dim_mmo=6, block_size=block_size
+        )
+        assert np.allclose(np.abs(coeff_ab_mmo), np.abs(coeff_ab_mmo_block))
 
 
 def test_quambo_old_code():
@@ -199,6 +226,15 @@ def test_quambo_old_code():
     with path("chemtools.data", "naclo4_olp_aao_ab.npy") as fname:
         olp_aao_ab = np.load(str(fname))
     assert np.allclose(coeff_ab_quambo, quambo(olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span))
+    # blocks of virtual molecular orbitals
+    for block_size in [1, 7, 1000]:
+        assert np.allclose(
+            coeff_ab_quambo,
+            quambo(
+                olp_ab_ab, olp_aao_ab, coeff_ab_mo, indices_span, block_size=block_size,
+                check_rank=False,
+            ),
+        )
 
 
 def test_quao_old_code():
@@ -226,6 +262,15 @@ def test_quao_old_code():
     assert np.allclose(
         coeff_ab_quao, quao(olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span)
     )
+    # blocks of virtual molecular orbitals
+    for block_size in [1, 7, 1000]:
+        assert np.allclose(
+            coeff_ab_quao,
+            quao(
+                olp_ab_ab, olp_aao_ab, olp_aao_aao, coeff_ab_mo, indices_span,
+                block_size=block_size, check_rank=False,
+            ),
+        )
 
 
 def test_quambo():
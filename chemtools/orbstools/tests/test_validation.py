@@ -0,0 +1,116 @@
+"""Tests for orbstools.validation."""
+from chemtools.orbstools import validation
+from chemtools.orbstools.mulliken import mulliken_populations, mulliken_populations_batch
+from chemtools.orbstools.quasi import _check_input
+import numpy as np
+from numpy.testing import assert_raises
+
+
+def test_set_validation():
+    """Test orbstools.validation.set_validation and orbstools.validation.validation."""
+    assert validation.get_validation() == "full"
+    assert validation.set_validation("sampled") == "full"
+    assert validation.get_validation() == "sampled"
+    assert validation.set_validation("full") == "sampled"
+    with validation.validation("off", sample_size=4):
+        assert validation.get_validation() == "off"
+        assert validation._POLICY["sample_size"] == 4
+    assert validation.get_validation() == "full"
+    assert validation._POLICY["sample_size"] == 32
+    assert_raises(ValueError, validation.set_validation, "some")
+    assert_raises(ValueError, validation.set_validation, "sampled", sample_size=0)
+    assert_raises(ValueError, validation.set_validation, "sampled", sample_size=2.0)
+    assert validation.get_validation() == "full"
+
+
+def test_checks():
+    """Test the checks of orbstools.validation under each validation policy."""
+    unitary = np.linalg.svd(np.random.rand(50, 50))[0]
+    matrix = (unitary * np.random.rand(50)).dot(unitary.T)
+    asymmetric = matrix + np.triu(np.random.rand(50, 50), k=1)
+    indefinite = matrix - 2 * np.identity(50)
+    coeff = unitary * np.diag(matrix.dot(unitary).T.dot(unitary)) ** (-0.5)
+    weights = np.random.rand(3, 50, 50)
+    weights /= np.sum(weights, axis=0)
+    for mode in ["full", "sampled"]:
+        with validation.validation(mode, sample_size=10):
+            assert validation.is_symmetric(matrix)
+            assert validation.is_symmetric(np.array([matrix, matrix]))
+            assert not validation.is_symmetric(asymmetric)
+            assert validation.is_positive_semidefinite(matrix)
+            assert not validation.is_positive_semidefinite(indefinite)
+            assert validation.is_normalized(coeff, matrix)
+            assert not validation.is_normalized(2 * coeff, matrix)
+            assert validation.is_normalized_batch(np.array([coeff]), np.array([matrix.dot(coeff)]))
+            assert not validation.is_normalized_batch(
+                np.array([coeff, 2 * coeff]), np.array([matrix.dot(coeff), matrix.dot(coeff)])
+            )
+            assert validation.is_partition(weights)
+            assert not validation.is_partition(2 * weights)
+    # sampled checks do not change the global random state
+    state = np.random.get_state()
+    with validation.validation("sampled", sample_size=10):
+        validation.is_symmetric(matrix)
+        validation.is_positive_semidefinite(matrix)
+        validation.is_normalized(coeff, matrix)
+        validation.is_normalized_batch(np.array([coeff]), np.array([coeff]))
+        validation.is_partition(weights)
+    assert all(np.all(old == new) for old, new in zip(state, np.random.get_state()))
+    # sampled rows are reproducible with a seed
+    validation.set_validation("sampled", sample_size=10, seed=1)
+    indices = validation._sample(50)
+    validation.set_validation("full", seed=1)
+    validation.set_validation("sampled")
+    assert np.all(validation._sample(50) == indices)
+    validation.set_validation("full")
+    with validation.validation("off"):
+        assert validation.is_symmetric(asymmetric)
+        assert validation.is_positive_semidefinite(indefinite)
+        assert validation.is_normalized(2 * coeff, matrix)
+        assert validation.is_normalized_batch(np.array([coeff]), np.array([2 * coeff]))
+        assert validation.is_partition(2 * weights)
+
+
+def test_validation_orbstools():
+    """Test the validation policy in orbstools.mulliken and orbstools.quasi."""
+    olp_ab_ab = np.identity(10)
+    coeff_ab_mo = 2 * np.identity(10)
+    occupations = np.array([2] * 4 + [0] * 6)
+    ab_atom_indices = np.array([0, 0, 1, 1, 0, 0, 1, 1, 0, 1])
+    assert_raises(
+        ValueError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 2, ab_atom_indices
+    )
+    assert_raises(ValueError, _check_input, olp_ab_ab=olp_ab_ab, coeff_ab_mo=coeff_ab_mo)
+    with validation.validation("off"):
+        assert np.allclose(
+            mulliken_populations(coeff_ab_mo, occupations, olp_ab_ab, 2, ab_atom_indices), [16, 16]
+        )
+        _check_input(olp_ab_ab=olp_ab_ab, coeff_ab_mo=coeff_ab_mo)
+        # types, shapes and atom indices are still checked
+        assert_raises(
+            TypeError, mulliken_populations, coeff_ab_mo.tolist(), occupations, olp_ab_ab, 2,
+            ab_atom_indices,
+        )
+        assert_raises(
+            ValueError, mulliken_populations, coeff_ab_mo, occupations, olp_ab_ab, 1,
+            ab_atom_indices,
+        )
+    # normalization of a stack of wavefunctions is checked on the sampled molecular orbitals only
+    coeffs = np.ones((2, 10, 50)) / np.sqrt(10)
+    occupations = np.array([2] * 5 + [0] * 45)
+    validation.set_validation("sampled", sample_size=10, seed=2)
+    coeffs[1, :, np.setdiff1d(np.arange(50), validation._sample(50))[0]] *= 2
+    validation.set_validation("sampled", seed=2)
+    try:
+        mulliken_populations_batch(coeffs, occupations, olp_ab_ab, 2, ab_atom_indices)
+        assert_raises(
+            ValueError, mulliken_populations_batch, 2 * coeffs, occupations, olp_ab_ab, 2,
+            ab_atom_indices,
+        )
+    finally:
+        validation.set_validation("full", sample_size=32)
+    assert_raises(
+        ValueError, mulliken_populations_batch, coeffs, occupations, olp_ab_ab, 2, ab_atom_indices
+    )
+    with validation.validation("off"):
+        mulliken_populations_batch(2 * coeffs, occupations, olp_ab_ab, 2, ab_atom_indices)
@@ -0,0 +1,234 @@
+"""Validation policy for the numerical checks of the inputs in orbstools.
+
+The inputs of the functions in orbstools are checked for properties such as the symmetry of the
+overlap matrices and the normalization of the molecular orbitals. Some of these checks cost as
+much as the computation itself, so they can be controlled with a validation policy:
+
+- 'full' checks every entry (default).
+- 'sampled' checks a random subset of rows/columns of the matrices. The subsets are drawn from a
+  random generator owned by the policy, so the global state of `np.random` is not changed.
+- 'off' skips these checks. The types and shapes of the inputs, as well as other checks that
+  are linear in the size of the inputs, are still performed.
+
+"""
+from contextlib import contextmanager
+
+import numpy as np
+
+_MODES = ("full", "sampled", "off")
+_POLICY = {"mode": "full", "sample_size": 32}
+_RANDOM = np.random.RandomState()
+
+
+def get_validation():
+    """Return the current validation policy.
+
+    Returns
+    -------
+    mode : str
+        Validation mode, one of 'full', 'sampled' or 'off'.
+
+    """
+    return _POLICY["mode"]
+
+
+def set_validation(mode, sample_size=None, seed=None):
+    """Set the validation policy.
+
+    Parameters
+    ----------
+    mode : {'full', 'sampled', 'off'}
+        Validation mode.
+    sample_size : int
+        Number of rows/columns that are checked in the 'sampled' mode.
+        Default keeps the current sample size (initially 32).
+    seed : int
+        Seed of the random generator that selects the rows/columns in the 'sampled' mode.
+        Default keeps the current state of the generator.
+
+    Returns
+    -------
+    previous : str
+        Previous validation mode.
+
+    Raises
+    ------
+    ValueError
+        If `mode` is not one of 'full', 'sampled' or 'off'.
+        If `sample_size` is not a positive integer.
+
+    """
+    if mode not in _MODES:
+        raise ValueError(
+            "Validation mode must be one of {0}. Given mode={1}".format(_MODES, mode)
+        )
+    if sample_size is not None:
+        if not (isinstance(sample_size, int) and sample_size > 0):
+            raise ValueError(
+                "Sample size must be a positive integer. Given sample_size={0}".format(sample_size)
+            )
+        _POLICY["sample_size"] = sample_size
+    if seed is not None:
+        _RANDOM.seed(seed)
+    previous = _POLICY["mode"]
+    _POLICY["mode"] = mode
+    return previous
+
+
+@contextmanager
+def validation(mode, sample_size=None):
+    """Use the given validation policy within a `with` block.
+
+    Parameters
+    ----------
+    mode : {'full', 'sampled', 'off'}
+        Validation mode.
+    sample_size : int
+        Number of rows/columns that are checked in the 'sampled' mode.
+
+    Examples
+    --------
+    >>> with validation("off"):
+    ...     pops = mulliken_populations(coeff_ab_mo, occupations, olp_ab_ab, num_atoms, indices)
+
+    """
+    previous_size = _POLICY["sample_size"]
+    previous = set_validation(mode, sample_size)
+    try:
+        yield
+    finally:
+        _POLICY["mode"] = previous
+        _POLICY["sample_size"] = previous_size
+
+
+def _sample(size):
+    """Return the indices that are checked along an axis of the given size, or None if all."""
+    if _POLICY["mode"] == "full" or size <= _POLICY["sample_size"]:
+        return None
+    return np.sort(_RANDOM.choice(size, _POLICY["sample_size"], replace=False))
+
+
+def is_symmetric(array):
+    """Return True if the array is symmetric (Hermitian) with respect to its last two axes.
+
+    Parameters
+    ----------
+    array : np.ndarray(..., N, N)
+        Array whose last two axes have the same size.
+
+    Returns
+    -------
+    symmetric : bool
+        False if the array is found to not be symmetric within the validation policy.
+
+    """
+    if _POLICY["mode"] == "off":
+        return True
+    indices = _sample(array.shape[-1])
+    if indices is None:
+        return np.allclose(array, np.swapaxes(array, -1, -2).conjugate())
+    return np.allclose(
+        array[..., indices, :], np.swapaxes(array[..., indices], -1, -2).conjugate()
+    )
+
+
+def is_normalized(coeff_ab_mo, olp_ab_ab):
+    """Return True if the orbitals have unit norm.
+
+    Only the diagonal of the overlap of the orbitals is computed, i.e. :math:`O(K^2 M)`.
+
+    Parameters
+    ----------
+    coeff_ab_mo : np.ndarray(K, M)
+        Transformation matrix from the atomic basis functions to the orbitals.
+    olp_ab_ab : np.ndarray(K, K)
+        Overlap of the atomic basis functions.
+
+    Returns
+    -------
+    normalized : bool
+        False if the orbitals are found to not be normalized within the validation policy.
+
+    """
+    if _POLICY["mode"] == "off":
+        return True
+    indices = _sample(coeff_ab_mo.shape[1])
+    if indices is not None:
+        coeff_ab_mo = coeff_ab_mo[:, indices]
+    return np.allclose(np.sum(coeff_ab_mo * olp_ab_ab.dot(coeff_ab_mo), axis=0), 1)
+
+
+def is_normalized_batch(coeff_ab_mo, olp_coeff_ab_mo):
+    """Return True if the orbitals of a stack of wavefunctions have unit norm.
+
+    The products of the overlap and the transformation matrices are given, so only the norms are
+    computed, i.e. :math:`O(T K M)`.
+
+    Parameters
+    ----------
+    coeff_ab_mo : np.ndarray(T, K, M)
+        Transformation matrices from the atomic basis functions to the orbitals.
+    olp_coeff_ab_mo : np.ndarray(T, K, M)
+        Products of the overlap of the atomic basis functions and the transformation matrices.
+
+    Returns
+    -------
+    normalized : bool
+        False if the orbitals are found to not be normalized within the validation policy.
+
+    """
+    if _POLICY["mode"] == "off":
+        return True
+    indices = _sample(coeff_ab_mo.shape[2])
+    if indices is not None:
+        coeff_ab_mo, olp_coeff_ab_mo = coeff_ab_mo[:, :, indices], olp_coeff_ab_mo[:, :, indices]
+    return np.allclose(np.sum(coeff_ab_mo * olp_coeff_ab_mo, axis=1), 1)
+
+
+def is_positive_semidefinite(matrix, threshold=1e-9):
+    """Return True if the symmetric matrix has no eigenvalue less than the negative threshold.
+
+    In the 'sampled' mode, only a random principal submatrix is diagonalized, which is a
+    necessary (but not sufficient) condition for positive semidefiniteness.
+
+    Parameters
+    ----------
+    matrix : np.ndarray(N, N)
+        Symmetric matrix.
+    threshold : {1e-9, float}
+        Eigenvalues above the negative threshold are considered nonnegative.
+
+    Returns
+    -------
+    psd : bool
+        False if the matrix is found to not be positive semidefinite within the validation policy.
+
+    """
+    if _POLICY["mode"] == "off":
+        return True
+    indices = _sample(matrix.shape[0])
+    if indices is not None:
+        matrix = matrix[indices[:, None], indices[None, :]]
+    return np.all(np.linalg.eigvalsh(matrix) >= -threshold)
+
+
+def is_partition(weights):
+    """Return True if the weights sum to one over the first axis.
+
+    Parameters
+    ----------
+    weights : np.ndarray(A, K, ...)
+        Weights of `A` parts, e.g. atoms.
+
+    Returns
+    -------
+    normalized : bool
+        False if the weights are found to not sum to one within the validation policy.
+
+    """
+    if _POLICY["mode"] == "off":
+        return True
+    indices = _sample(weights.shape[1])
+    if indices is not None:
+        weights = weights[:, indices]
+    return np.allclose(np.sum(weights, axis=0), 1)
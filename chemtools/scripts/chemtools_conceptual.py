@@ -29,6 +29,7 @@ from __future__ import print_function
 from chemtools import Molecule
 from chemtools import UniformGrid, print_vmd_script_isosurface
 from chemtools import GlobalConceptualDFT, LocalConceptualDFT
+from chemtools.toolbox.utils import get_dict_density
 
 __all__ = [
     'parse_args_global', 'parse_args_local', 'main_conceptual_global',
@@ -137,9 +138,12 @@ def main_conceptual_local(args):
         raise ValueError('Argument cube={0} is not recognized!'.format(
             args.cube))
 
-    # build global tool
-    model = LocalConceptualDFT.from_file(args.file_wfn, args.model,
-                                         cube.points)
+    # load molecules & build the local model once (checked on a single grid point); only the
+    # densities depend on the points, so the local tool of the model is built for one block of
+    # grid points at a time, and the coordinates of all grid points are never stored
+    molecules = LocalConceptualDFT.load_file(args.file_wfn)
+    model = LocalConceptualDFT.from_molecule(molecules, args.model,
+                                             cube.get_points(0, 1))
     # check whether local property exists
     if not hasattr(model, args.prop):
         raise ValueError('The {0} local conceptual DFT class does not contain '
@@ -152,7 +156,14 @@ def main_conceptual_local(args):
     # name of files
     cubefile = '{0}.cube'.format(args.output_name)
     vmdfile = '{0}.vmd'.format(args.output_name)
-    # dump cube file of local property
-    cube.generate_cube(cubefile, getattr(model, args.prop))
+    local_tool = type(model._tool)
+
+    # evaluate local property & write cube file one slab of grid points at a time
+    def compute_property(points):
+        """Evaluate the local property on the given block of points."""
+        tool = local_tool(get_dict_density(molecules, points))
+        return getattr(tool, args.prop)
+
+    cube.generate_cube(cubefile, compute_property)
     # generate VMD scripts for visualizing iso-surface with VMD
     print_vmd_script_isosurface(vmdfile, cubefile, isosurf=args.isosurface)
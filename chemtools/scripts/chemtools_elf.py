@@ -25,7 +25,7 @@
 """Electron Localization Function (ELF) Script."""
 
 
-from chemtools import Molecule, UniformGrid, ELF
+from chemtools import Molecule, UniformGrid, PropertyCache, ELF
 
 
 __all__ = ['parse_args_elf', 'main_elf']
@@ -105,6 +105,14 @@ def parse_args_elf(subparser):
         help='the ELF value of points with density < denscut is set to zero. '
              '[default=%(default)s]')
 
+    subparser.add_argument(
+        '--cache',
+        default=None,
+        type=str,
+        help='directory of an on-disk cache of properties evaluated on the cubic grid. '
+        'Properties computed for the same wave-function and cubic grid in previous runs '
+        'are loaded from this directory instead of being recomputed. [default=%(default)s]')
+
 
 def main_elf(args):
     """Build ELF model and dump VMD script and cube files for visualizing ELF."""
@@ -122,9 +130,12 @@ def main_elf(args):
     else:
         raise ValueError('Argument cube={0} is not recognized!'.format(args.cube))
 
+    # make on-disk cache of properties evaluated on the cubic grid
+    cache = PropertyCache(args.cache) if args.cache is not None else None
+
     # build ELF model
     elf = ELF.from_molecule(mol, grid=cube, trans=args.trans, trans_k=args.trans_k,
-                            trans_a=args.trans_a, denscut=args.denscut)
+                            trans_a=args.trans_a, denscut=args.denscut, cache=cache)
 
     # dump file/script for visualizing ELF
     elf.generate_scripts(args.output, isosurf=args.isosurface)
@@ -134,7 +134,8 @@ def main_esp(args):
     rhoname = args.output + '_rho.cube'
     vmdname = args.output + '.vmd'
 
-    cube.generate_cube(rhoname, mol.compute_density(cube.points))
-    cube.generate_cube(espname, mol.compute_esp(cube.points))
+    # evaluate density & esp and write cube files one slab of grid points at a time
+    cube.generate_cube(rhoname, mol.compute_density)
+    cube.generate_cube(espname, mol.compute_esp)
     print_vmd_script_isosurface(vmdname, rhoname, colorfile=espname, isosurf=args.isosurface,
                                 scalemin=args.scalemin, scalemax=args.scalemax)
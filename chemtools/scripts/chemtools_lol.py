@@ -25,7 +25,7 @@
 """Localized Orbital Locator (LOL) Script."""
 
 
-from chemtools import Molecule, UniformGrid, LOL
+from chemtools import Molecule, UniformGrid, PropertyCache, LOL
 
 
 __all__ = ['parse_args_lol', 'main_lol']
@@ -105,6 +105,14 @@ def parse_args_lol(subparser):
         help='the LOL value of points with density < denscut is set to zero. '
              '[default=%(default)s]')
 
+    subparser.add_argument(
+        '--cache',
+        default=None,
+        type=str,
+        help='directory of an on-disk cache of properties evaluated on the cubic grid. '
+        'Properties computed for the same wave-function and cubic grid in previous runs '
+        'are loaded from this directory instead of being recomputed. [default=%(default)s]')
+
 
 def main_lol(args):
     """Build LOL model and dump VMD script and cube files for visualizing LOL."""
@@ -122,9 +130,12 @@ def main_lol(args):
     else:
         raise ValueError('Argument cube={0} is not recognized!'.format(args.cube))
 
+    # make on-disk cache of properties evaluated on the cubic grid
+    cache = PropertyCache(args.cache) if args.cache is not None else None
+
     # build LOL model
     lol = LOL.from_molecule(mol, grid=cube, trans=args.trans, trans_k=args.trans_k,
-                            trans_a=args.trans_a, denscut=args.denscut)
+                            trans_a=args.trans_a, denscut=args.denscut, cache=cache)
 
     # dump file/script for visualizing LOL
     lol.generate_scripts(args.output, isosurf=args.isosurface)
@@ -25,7 +25,7 @@
 """Non-Covalent Interactions (NCI) Script."""
 
 
-from chemtools import Molecule, UniformGrid, NCI
+from chemtools import Molecule, UniformGrid, PropertyCache, NCI
 
 
 __all__ = ['parse_args_nci', 'main_nci']
@@ -121,6 +121,14 @@ def parse_args_nci(subparser):
         help='color of reduced density gradient vs. signed density scatter plot'
         ' [default=%(default)s]')
 
+    subparser.add_argument(
+        '--cache',
+        default=None,
+        type=str,
+        help='directory of an on-disk cache of properties evaluated on the cubic grid. '
+        'Properties computed for the same wave-function and cubic grid in previous runs '
+        'are loaded from this directory instead of being recomputed. [default=%(default)s]')
+
 
 def main_nci(args):
     """Build NCI model and dump VMD script and cube files for visualizing NCI with VMD."""
@@ -138,8 +146,11 @@ def main_nci(args):
     else:
         raise ValueError('Argument cube={0} is not recognized!'.format(args.cube))
 
+    # make on-disk cache of properties evaluated on the cubic grid
+    cache = PropertyCache(args.cache) if args.cache is not None else None
+
     # build NCI model
-    nci = NCI.from_molecule(mol, grid=cube)
+    nci = NCI.from_molecule(mol, grid=cube, cache=cache)
 
     # dump files/scripts for visualizing NCI
     nci.generate_scripts(args.output, isosurf=args.isosurface, denscut=args.denscut)
@@ -28,7 +28,7 @@ import numpy as np
 
 from chemtools.wrappers.molecule import Molecule
 from chemtools.denstools.densbased import DensGradTool
-from chemtools.utils.utils import doc_inherit
+from chemtools.utils.utils import doc_inherit, eigvalsh_3x3
 from chemtools.utils.cube import UniformGrid
 from chemtools.outputs.plot import plot_scatter
 from chemtools.outputs.vmd import print_vmd_script_nci, print_vmd_script_isosurface
@@ -43,7 +43,7 @@ class BaseInteraction(object):
     """Base class for (non)bonding interactions indicators."""
 
     @classmethod
-    def from_file(cls, fname, spin='ab', index=None, grid=None):
+    def from_file(cls, fname, spin='ab', index=None, grid=None, cache=None):
         """Initialize class using wave-function file.
 
         Parameters
@@ -58,12 +58,15 @@ class BaseInteraction(object):
         grid : instance of `Grid`, optional
             Grid used for calculating and visualizing the property values.
             If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+        cache : PropertyCache, optional
+            On-disk cache of properties evaluated on grid points. Cached properties are loaded
+            instead of being recomputed; only used with a cubic grid.
         """
         molecule = Molecule.from_file(fname)
-        return cls.from_molecule(molecule, spin=spin, index=index, grid=grid)
+        return cls.from_molecule(molecule, spin=spin, index=index, grid=grid, cache=cache)
 
     @classmethod
-    def from_molecule(cls, molecule, spin='ab', index=None, grid=None):
+    def from_molecule(cls, molecule, spin='ab', index=None, grid=None, cache=None):
         """Initialize class from ``Molecule`` object.
 
         Parameters
@@ -78,6 +81,9 @@ class BaseInteraction(object):
         grid : instance of `Grid`, optional
             Grid used for calculating and visualizing the property values.
             If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+        cache : PropertyCache, optional
+            On-disk cache of properties evaluated on grid points. Cached properties are loaded
+            instead of being recomputed; only used with a cubic grid.
         """
         pass
 
@@ -85,11 +91,35 @@ class BaseInteraction(object):
     def _check_grid(molecule, grid):
         if grid is None:
             grid = UniformGrid.from_molecule(molecule, spacing=0.1, extension=2.0)
-        elif not hasattr(grid, 'points'):
+        elif not isinstance(grid, UniformGrid) and not hasattr(grid, 'points'):
             raise ValueError('Argument grid should have "points" attribute!')
 
         return grid
 
+    @staticmethod
+    def _compute_properties(molecule, grid, properties, spin, index, cache):
+        """Return the properties evaluated on grid points, using the cache if given."""
+        if not isinstance(grid, UniformGrid):
+            return molecule.compute_properties(grid.points, properties, spin=spin, index=index)
+        if cache is not None:
+            return cache.compute(molecule, grid, properties, spin=spin, index=index)
+        # evaluate properties on blocks of cubic grid points, without storing all points
+        values = None
+        for start, stop, points in grid.iter_points():
+            block = molecule.compute_properties(points, properties, spin=spin, index=index)
+            if values is None:
+                values = [np.empty((grid.npoints,) + item.shape[1:]) for item in block]
+            for value, item in zip(values, block):
+                value[start:stop] = item
+        return tuple(values)
+
+    @staticmethod
+    def _get_npoints(grid):
+        """Return number of grid points, without computing points of a cubic grid."""
+        if isinstance(grid, UniformGrid):
+            return grid.npoints
+        return len(grid.points)
+
     @staticmethod
     def _transform(ratio, trans, trans_k, trans_a):
         if trans == 'rational':
@@ -107,7 +137,7 @@ class BaseInteraction(object):
 class NCI(BaseInteraction):
     """Non-Covalent Interactions (NCI) Class."""
 
-    def __init__(self, density, rdgradient, grid, hessian=None):
+    def __init__(self, density, rdgradient, grid, hessian=None, indices=None):
         """Initialize class using density, reduced density gradient and `UniformGrid` instance.
 
         Parameters
@@ -121,33 +151,38 @@ class NCI(BaseInteraction):
             If None, it is constructed from molecule with spacing=0.1 and extension=2.0.
         hessian : np.array, optional
             Hessian of density evaluated on grid points of `cube`. This is a array with shape
-            (n, 6) where n is the number of grid points of `cube`.
+            (n, 6) where n is the number of grid points of `cube`, or the number of `indices`.
+        indices : np.array, optional
+            Indices of grid points on which the hessian is evaluated. If None, the hessian is
+            evaluated on all grid points. The density of other grid points is not signed.
         """
-        if density.shape != (len(grid.points),):
+        npoints = BaseInteraction._get_npoints(grid)
+        if density.shape != (npoints,):
             raise ValueError('Shape of density argument {0} does not match '
-                             'expected ({1},) shape.'.format(density.shape, len(grid.points)))
-        if rdgradient.shape != (len(grid.points),):
+                             'expected ({1},) shape.'.format(density.shape, npoints))
+        if rdgradient.shape != (npoints,):
             raise ValueError('Shape of rdgradient argument {0} does not '
-                             'match expected ({1},) shape.'.format(density.shape, len(grid.points)))
+                             'match expected ({1},) shape.'.format(density.shape, npoints))
+        if indices is not None:
+            if hessian is None:
+                raise ValueError('Argument indices requires the hessian argument!')
+            indices = np.asarray(indices, dtype=int)
+            npoints = indices.size
 
         if hessian is not None:
-            if hessian.shape != (len(grid.points), 6):
+            if hessian.shape != (npoints, 6):
                 raise ValueError('Shape of hessian argument {0} does not match expected ({1}, 6)'
-                                 ' shape.'.format(hessian.shape, len(grid.points)))
-
-            # convert the (n, 6) shape to (n, 3, 3) to calculate eigenvalues.
-            hestri = np.zeros((len(grid.points), 9))
-            # NOTE: hard coded in the indices of the upper triangular matrix in the flattened form
-            # in C ordering. Maybe there is a numpy function that does this. This might fail if the
-            # hessian is not in c-ordering
-            hestri[:, [0, 1, 2, 4, 5, 8]] = hessian
-            hestri = hestri.reshape(len(grid.points), 3, 3)
+                                 ' shape.'.format(hessian.shape, npoints))
 
-            # compute hessian and its eigenvalues on cubic grid
-            eigvalues = np.linalg.eigvalsh(hestri, UPLO='U')
+            # compute eigenvalues of hessian directly from its (n, 6) upper-triangular elements
+            eigvalues = eigvalsh_3x3(hessian)
 
             # use sign of second eigenvalue to distinguish interaction types
-            sdens = np.sign(eigvalues[:, 1]) * density
+            if indices is None:
+                sdens = np.sign(eigvalues[:, 1]) * density
+            else:
+                sdens = np.array(density, copy=True)
+                sdens[indices] *= np.sign(eigvalues[:, 1])
 
             self._signed_density = sdens
             self._eigvalues = eigvalues
@@ -159,20 +194,116 @@ class NCI(BaseInteraction):
         self._density = density
         self._rdgrad = rdgradient
         self._grid = grid
+        self._indices = indices
+
+    @classmethod
+    def from_file(cls, fname, spin='ab', index=None, grid=None, cache=None, denscut=None,
+                  rdgcut=None):
+        """Initialize class using wave-function file.
+
+        Parameters
+        ----------
+        fname : str
+            A string representing the path to a molecule's fname.
+        spin : str, optional
+            The type of occupied spin orbitals; options are 'a', 'b' & 'ab'.
+        index : int or Sequence of int, optional
+            Sequence of integers representing the index of spin orbitals.
+            If None, all occupied spin orbitals are included.
+        grid : instance of `Grid`, optional
+            Grid used for calculating and visualizing the property values.
+            If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+        cache : PropertyCache, optional
+            On-disk cache of properties evaluated on grid points. Cached properties are loaded
+            instead of being recomputed; only used with a cubic grid.
+        denscut : float, optional
+            Density cutoff used for screening grid points, see `from_molecule`.
+        rdgcut : float, optional
+            Reduced density gradient cutoff used for screening grid points, see `from_molecule`.
+        """
+        molecule = Molecule.from_file(fname)
+        return cls.from_molecule(molecule, spin=spin, index=index, grid=grid, cache=cache,
+                                 denscut=denscut, rdgcut=rdgcut)
 
     @classmethod
-    @doc_inherit(BaseInteraction, 'from_molecule')
-    def from_molecule(cls, molecule, spin='ab', index=None, grid=None):
+    def from_molecule(cls, molecule, spin='ab', index=None, grid=None, cache=None, denscut=None,
+                      rdgcut=None):
+        """Initialize class from ``Molecule`` object.
+
+        Parameters
+        ----------
+        molecule : instance of `Molecule` class.
+            Instance of `Molecular` class.
+        spin : str, optional
+            The type of occupied spin orbitals; options are 'a', 'b' & 'ab'.
+        index : int or Sequence of int, optional
+            Sequence of integers representing the index of spin orbitals.
+            If None, all occupied spin orbitals are included.
+        grid : instance of `Grid`, optional
+            Grid used for calculating and visualizing the property values.
+            If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+        cache : PropertyCache, optional
+            On-disk cache of properties evaluated on grid points. Cached properties are loaded
+            instead of being recomputed; only used with a cubic grid.
+        denscut : float, optional
+            Density cutoff used for screening grid points. If given, the density is evaluated
+            first, and the gradient & hessian are only evaluated on grid points with
+            density <= denscut. The reduced density gradient of other points is set to 100.0,
+            similar to NCIPlot program, and their density is not signed.
+        rdgcut : float, optional
+            Reduced density gradient cutoff used for screening grid points. If given, the
+            hessian is only evaluated on grid points with reduced density gradient <= rdgcut.
+        """
         # generate or check cubic grid
         grid = BaseInteraction._check_grid(molecule, grid)
+        if denscut is not None or rdgcut is not None:
+            return cls._from_molecule_screened(molecule, spin, index, grid, cache, denscut,
+                                               rdgcut)
         # compute density, gradient & hessian on cubic grid
-        dens = molecule.compute_density(grid.points, spin=spin, index=index)
-        grad = molecule.compute_gradient(grid.points, spin=spin, index=index)
-        hess = molecule.compute_hessian(grid.points, spin=spin, index=index)
+        dens, grad, hess = BaseInteraction._compute_properties(
+            molecule, grid, ["density", "gradient", "hessian"], spin, index, cache)
         # compute reduced gradient
         rdgrad = DensGradTool(dens, grad).reduced_density_gradient
         return cls(dens, rdgrad, grid, hessian=hess)
 
+    @classmethod
+    def _from_molecule_screened(cls, molecule, spin, index, grid, cache, denscut, rdgcut):
+        """Initialize class evaluating gradient & hessian only on screened grid points."""
+        if denscut is not None and not denscut > 0:
+            raise ValueError('Argument denscut should be positive! denscut={0}'.format(denscut))
+        if rdgcut is not None and not rdgcut > 0:
+            raise ValueError('Argument rdgcut should be positive! rdgcut={0}'.format(rdgcut))
+        # compute density on all grid points
+        dens, = BaseInteraction._compute_properties(molecule, grid, ["density"], spin, index,
+                                                    cache)
+        if isinstance(grid, UniformGrid):
+            blocks = grid.iter_points()
+        else:
+            blocks = iter([(0, len(dens), grid.points)])
+        rdgrad = np.full(dens.shape, 100.0)
+        indices, hess = [np.zeros(0, dtype=int)], [np.zeros((0, 6))]
+        for start, stop, points in blocks:
+            # select points with low density
+            select = np.arange(start, stop)
+            if denscut is not None:
+                select = select[np.abs(dens[start:stop]) <= denscut]
+            if select.size == 0:
+                continue
+            points = points[select - start]
+            # compute reduced gradient of selected points (zero density points are set to 100.0)
+            grad = molecule.compute_gradient(points, spin, index)
+            rdg = DensGradTool(dens[select], grad).reduced_density_gradient
+            rdgrad[select] = np.ma.filled(rdg, 100.0)
+            # select points with low reduced gradient & compute their hessian
+            if rdgcut is not None:
+                mask = rdgrad[select] <= rdgcut
+                select, points = select[mask], points[mask]
+            if select.size != 0:
+                indices.append(select)
+                hess.append(molecule.compute_hessian(points, spin, index))
+        return cls(dens, rdgrad, grid, hessian=np.concatenate(hess),
+                   indices=np.concatenate(indices))
+
     @property
     def signed_density(self):
         r"""Signed electron density.
@@ -185,9 +316,18 @@ class NCI(BaseInteraction):
 
     @property
     def eigvalues(self):
-        r"""Eigenvalues of Hessian."""
+        r"""Eigenvalues of Hessian.
+
+        When the hessian is only evaluated on a subset of grid points, this array contains the
+        eigenvalues of those points given by `indices`.
+        """
         return self._eigvalues
 
+    @property
+    def indices(self):
+        r"""Indices of grid points on which the hessian is evaluated, or None for all points."""
+        return self._indices
+
     def generate_plot(self, fname, color='b', denslim=(-0.2, 0.2), rdglim=(0., 2.)):
         r"""Plot reduced density gradient.
 
@@ -343,7 +483,7 @@ class ELF(BaseInteraction):
 
     @classmethod
     def from_molecule(cls, molecule, spin='ab', index=None, grid=None, trans='rational',
-                      trans_k=2, trans_a=1, denscut=0.0005):
+                      trans_k=2, trans_a=1, denscut=0.0005, cache=None):
         """Initialize class from molecule.
 
         Parameters
@@ -365,19 +505,21 @@ class ELF(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. ELF value of points with density < denscut is set to zero.
+        cache : PropertyCache, optional
+            On-disk cache of properties evaluated on grid points. Cached properties are loaded
+            instead of being recomputed; only used with a cubic grid.
 
         """
         # generate cubic grid or check grid
         grid = BaseInteraction._check_grid(molecule, grid)
         # compute density, gradient & kinetic energy density on grid
-        dens = molecule.compute_density(grid.points, spin=spin, index=index)
-        grad = molecule.compute_gradient(grid.points, spin=spin, index=index)
-        kin = molecule.compute_ked(grid.points, spin=spin, index=index)
+        dens, grad, kin = BaseInteraction._compute_properties(
+            molecule, grid, ["density", "gradient", "ked"], spin, index, cache)
         return cls(dens, grad, kin, grid, trans, trans_k, trans_a, denscut)
 
     @classmethod
     def from_file(cls, fname, spin='ab', index=None, grid=None, trans='rational',
-                  trans_k=2, trans_a=1, denscut=0.0005):
+                  trans_k=2, trans_a=1, denscut=0.0005, cache=None):
         """Initialize class from wave-function file.
 
         Parameters
@@ -399,10 +541,14 @@ class ELF(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. ELF value of points with density < denscut is set to zero.
+        cache : PropertyCache, optional
+            On-disk cache of properties evaluated on grid points. Cached properties are loaded
+            instead of being recomputed; only used with a cubic grid.
 
         """
         molecule = Molecule.from_file(fname)
-        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut)
+        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut,
+                                 cache)
 
     @property
     def ratio(self):
@@ -428,7 +574,7 @@ class ELF(BaseInteraction):
         """
         if not isinstance(self._grid, UniformGrid):
             raise ValueError('Only possible if argument grid is a cubic grid.')
-        if self._denstool.density.shape[0] != self._grid.points.shape[0]:
+        if self._denstool.density.shape[0] != self._grid.npoints:
             raise ValueError('Number of grid points should match number of dens values!')
         # dump ELF cube file & generate vmd script
         vmdname = fname + '.vmd'
@@ -514,7 +660,7 @@ class LOL(BaseInteraction):
 
     @classmethod
     def from_molecule(cls, molecule, spin='ab', index=None, grid=None, trans='inverse_rational',
-                      trans_k=1, trans_a=1, denscut=0.0005):
+                      trans_k=1, trans_a=1, denscut=0.0005, cache=None):
         """Initialize class from molecule.
 
         Parameters
@@ -537,19 +683,21 @@ class LOL(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. LOL value of points with density < denscut is set to zero.
+        cache : PropertyCache, optional
+            On-disk cache of properties evaluated on grid points. Cached properties are loaded
+            instead of being recomputed; only used with a cubic grid.
 
         """
         # generate cubic grid or check grid
         grid = BaseInteraction._check_grid(molecule, grid)
         # compute density, gradient & kinetic energy density on grid
-        dens = molecule.compute_density(grid.points, spin=spin, index=index)
-        grad = molecule.compute_gradient(grid.points, spin=spin, index=index)
-        ked = molecule.compute_ked(grid.points, spin=spin, index=index)
+        dens, grad, ked = BaseInteraction._compute_properties(
+            molecule, grid, ["density", "gradient", "ked"], spin, index, cache)
         return cls(dens, grad, ked, grid, trans, trans_k, trans_a, denscut)
 
     @classmethod
     def from_file(cls, fname, spin='ab', index=None, grid=None, trans='inverse_rational',
-                  trans_k=1, trans_a=1, denscut=0.0005):
+                  trans_k=1, trans_a=1, denscut=0.0005, cache=None):
         """Initialize class from wave-function file.
 
         Parameters
@@ -572,10 +720,14 @@ class LOL(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. LOL value of points with density < denscut is set to zero.
+        cache : PropertyCache, optional
+            On-disk cache of properties evaluated on grid points. Cached properties are loaded
+            instead of being recomputed; only used with a cubic grid.
 
         """
         molecule = Molecule.from_file(fname)
-        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut)
+        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut,
+                                 cache)
 
     @property
     def ratio(self):
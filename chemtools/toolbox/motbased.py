@@ -24,6 +24,8 @@
 """Orbital-Based Local Tools."""
 
 
+from functools import partial
+
 from chemtools.utils.utils import doc_inherit
 from chemtools.utils.cube import UniformGrid
 from chemtools.outputs.vmd import print_vmd_script_isosurface
@@ -188,7 +190,8 @@ class MOTBasedTool(object):
         for mo_index in index:
             vmdname = fname + '_mo{0}.vmd'.format(mo_index)
             cubname = fname + '_mo{0}.cube'.format(mo_index)
-            mo_value = self.compute_orbital_expression(grid.points, spin=spin, index=mo_index)
+            # evaluate orbital & write cube file one slab of grid points at a time
+            mo_value = partial(self.compute_orbital_expression, spin=spin, index=mo_index)
             grid.generate_cube(cubname, mo_value)
             print_vmd_script_isosurface(vmdname, cubname, isosurf=isosurf, negative=True,
                                         material='BlownGlass')
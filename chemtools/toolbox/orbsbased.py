@@ -26,7 +26,7 @@
 
 import numpy as np
 
-from scipy.optimize import bisect
+from scipy.special import expit
 
 from chemtools.wrappers.molecule import Molecule
 
@@ -34,6 +34,67 @@ from chemtools.wrappers.molecule import Molecule
 __all__ = ['OrbitalLocalTool']
 
 
+def _solve_chemical_potential(energy, nelectron, beta, maxiter=500, tolerance=1.e-12):
+    r"""Solve for chemical potentials of several sets of orbitals at several temperatures.
+
+    The number of electrons :math:`N(\mu) = \sum_i (1 + e^{\beta (\epsilon_i - \mu)})^{-1}`
+    increases monotonically with :math:`\mu`, so all equations are solved together with
+    Newton steps safeguarded by bisection of the :math:`[\epsilon_1, \epsilon_K]` bracket.
+
+    Parameters
+    ----------
+    energy : np.ndarray
+        Orbital energies of shape (S, K) for S sets of K orbitals sorted in increasing order.
+    nelectron : np.ndarray
+        Number of electrons of shape (S,).
+    beta : np.ndarray
+        Inverse temperatures :math:`1 / k_{\text{B}} T` of shape (T,).
+    maxiter : int, optional
+        Maximum number of iterations.
+    tolerance : float, optional
+        Convergence tolerance of chemical potentials.
+
+    Returns
+    -------
+    mu : np.ndarray
+        Chemical potentials of shape (S, T).
+
+    Raises
+    ------
+    ValueError
+        If the number of electrons is not bracketed by the lowest and highest orbital energies.
+    RuntimeError
+        If the chemical potentials do not converge within `maxiter` iterations.
+    """
+    def residual(mu):
+        # number of electrons at the chemical potentials minus the given number & its derivative
+        occ = expit(-beta[:, np.newaxis] * (energy[:, np.newaxis, :] - mu[:, :, np.newaxis]))
+        return (np.sum(occ, axis=2) - nelectron[:, np.newaxis],
+                beta * np.sum(occ * (1. - occ), axis=2))
+
+    shape = (energy.shape[0], beta.shape[0])
+    lower = np.broadcast_to(energy[:, :1], shape)
+    upper = np.broadcast_to(energy[:, -1:], shape)
+    if np.any(residual(lower)[0] * residual(upper)[0] > 0):
+        raise ValueError('Number of electrons is not bracketed by the orbital energies.')
+    mu = 0.5 * (lower + upper)
+    done = np.zeros(shape, dtype=bool)
+    for _ in range(maxiter):
+        value, deriv = residual(mu)
+        # shrink the brackets, and take newton steps that stay within them
+        lower = np.where(value < 0., mu, lower)
+        upper = np.where(value > 0., mu, upper)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = mu - value / deriv
+        step = np.where((step > lower) & (step < upper), step, 0.5 * (lower + upper))
+        step = np.where(done | (value == 0.), mu, step)
+        done |= (np.abs(step - mu) <= tolerance) | (upper - lower <= tolerance)
+        mu = step
+        if np.all(done):
+            return mu
+    raise RuntimeError('Chemical potential did not converge in {0} iterations.'.format(maxiter))
+
+
 class OrbitalLocalTool(object):
     """Class of orbital-based descriptive tools."""
 
@@ -122,15 +183,53 @@ class OrbitalLocalTool(object):
         # compute occupation & energy of alpha and beta orbitals
         occ_a, occ_b = self._molecule.orbital_occupation
         energy_a, energy_b = self._molecule.orbital_energy
-        # compute density of each alpha and beta orbital on grid points
-        index = np.arange(1, self._molecule.nbasis + 1)
-        ip_a = self.compute_orbital_expression(index, spin='a')**2
-        ip_b = self.compute_orbital_expression(index, spin='b')**2
-        # compute local ionization potential of alpha and beta orbitals
-        ip_a = np.dot(occ_a * energy_a, ip_a.T) / self._density
-        ip_b = np.dot(occ_b * energy_b, ip_b.T) / self._density
+        # compute local ionization potential of alpha and beta orbitals (only occupied orbitals
+        # contribute)
+        ip_a = self._compute_orbital_density('a', occ_a * energy_a) / self._density
+        ip_b = self._compute_orbital_density('b', occ_b * energy_b) / self._density
         return ip_a, ip_b
 
+    def _compute_orbital_density(self, spin, weights, chunk_size=10000):
+        r"""Compute weighted sum of the orbital densities on the grid.
+
+        .. math::
+           f \left(\mathbf{r}\right) = \sum_{i = 1}^{N_{\text{basis}}} w_i
+           |\phi_i (\mathbf{r})|^2
+
+        Only orbitals with a nonzero weight are evaluated, and the points are processed in
+        blocks, so the memory used does not exceed `chunk_size` times the number of these
+        orbitals.
+
+        Parameters
+        ----------
+        spin : str
+            The spin of the orbitals.
+        weights : np.ndarray
+            Weights of the orbitals given as an array of shape (nbasis,), or an array of shape
+            (nbasis, m) for computing m weighted sums at once.
+        chunk_size : int, optional
+            Maximum number of points evaluated at once.
+
+        Returns
+        -------
+        result : np.ndarray
+            Weighted sum of the orbital densities of shape (npoints,) or (npoints, m).
+        """
+        weights = np.asarray(weights, dtype=float)
+        # select orbitals with a nonzero weight (HORTON index the orbitals from 0)
+        index = np.nonzero(np.any(weights.reshape(weights.shape[0], -1) != 0., axis=1))[0]
+        weights = weights[index]
+        npoints = self._points.shape[0]
+        result = np.zeros((npoints,) + weights.shape[1:], float)
+        if index.size == 0:
+            return result
+        for start in range(0, npoints, chunk_size):
+            end = min(start + chunk_size, npoints)
+            orbs = self._molecule.compute_molecular_orbital(self._points[start:end], spin,
+                                                            index + 1)
+            result[start:end] = np.dot(np.square(orbs, out=orbs), weights)
+        return result
+
     def compute_spin_chemical_potential(self, temperature, maxiter=500, tolerance=1.e-12):
         r"""Compute temperature-dependent spin of alpha and beta electrons. on the grid.
 
@@ -148,38 +247,43 @@ class OrbitalLocalTool(object):
         potential of :math:`\sigma`-electrons at temperature :math:`T`.
         The :math:`k_{\text{B}}` is the Boltzmann constant.
 
-        This equation is solved using ``scipy.optimize.bisect`` routine for finding root of a
-        function within :math:`[a, b]` interval. The first and last :math:`\sigma`-molecular
+        This equation is solved for alpha and beta electrons at all given temperatures at once,
+        using Newton steps safeguarded by bisection. The first and last :math:`\sigma`-molecular
         orbital energies have been used as bracketing interval to find :math:`\mu_{\sigma, T}`
         at the given temperature :math:`T`.
 
         Parameters
         ----------
-        temperature : float
-            Temperature at which to evaluate the spin chemical potential (in Kelvin).
+        temperature : float or np.ndarray
+            Temperature at which to evaluate the spin chemical potential (in Kelvin), or a
+            1D array of temperatures.
         maxiter : int, optional
-            Maximum number of iterations of ``scipy.optimize.bisect`` routine.
+            Maximum number of iterations.
         tolerance : float, optional
-            Convergence tolerance of ``scipy.optimize.bisect`` routine.
+            Convergence tolerance of spin chemical potentials.
 
         Returns
         -------
-        spin_mu_a : float
-            Alpha spin chemical potential.
-        spin_mu_b : float
-            Beta spin chemical potential.
+        spin_mu_a : float or np.ndarray
+            Alpha spin chemical potential. For an array of temperatures, it is an array with
+            the same shape.
+        spin_mu_b : float or np.ndarray
+            Beta spin chemical potential. For an array of temperatures, it is an array with
+            the same shape.
         """
-        bt = 1.0 / (self._kb * temperature)
+        if np.ndim(temperature) > 1:
+            raise ValueError('Argument temperature should be a float or a 1D array.')
+        bt = 1.0 / (self._kb * np.atleast_1d(np.asarray(temperature, dtype=float)))
         # get number and energy of alpha and beta electrons
         n_a, n_b = self._molecule.nelectrons
         energy_a, energy_b = self._molecule.orbital_energy
-        # find spin chemical potential of alpha electrons
-        spin_pot_a = bisect(lambda x: np.sum(1. / (1. + np.exp(bt * (energy_a - x)))) - n_a,
-                            energy_a[0], energy_a[-1], maxiter=maxiter, xtol=tolerance)
-        # find spin chemical potential of beta electrons
-        spin_pot_b = bisect(lambda x: (np.sum(1. / (1. + np.exp(bt * (energy_b - x)))) - n_b),
-                            energy_b[0], energy_b[-1], maxiter=maxiter, xtol=tolerance)
-        return spin_pot_a, spin_pot_b
+        # find spin chemical potential of alpha and beta electrons
+        spin_pot = _solve_chemical_potential(np.array([energy_a, energy_b]),
+                                             np.array([n_a, n_b], dtype=float), bt,
+                                             maxiter=maxiter, tolerance=tolerance)
+        if np.ndim(temperature) == 0:
+            return spin_pot[0, 0], spin_pot[1, 0]
+        return spin_pot[0], spin_pot[1]
 
     def compute_temperature_dependent_density(self, temperature):
         r"""Compute temperature-dependent density of alpha and beta electrons on the grid.
@@ -198,31 +302,27 @@ class OrbitalLocalTool(object):
         :math:`\phi_{i\sigma}(\mathbf{r})` denotes the :math:`i^{\text{th}}` :math:`\sigma`-
         molecular orbital. The :math:`k_{\text{B}}` is the Boltzmann constant.
 
+        The orbitals are evaluated once on each block of points, and used for all temperatures.
+
         Parameters
         ----------
-        temperature : float
-            Temperature at which to evaluate the spin chemical potential (in Kelvin).
+        temperature : float or np.ndarray
+            Temperature at which to evaluate the spin chemical potential (in Kelvin), or a
+            1D array of temperatures.
 
         Returns
         -------
         dens_a : np.array
             Temperature-dependent density of alpha electrons evaluated on the grid points.
+            For an array of temperatures, it has a shape (npoints, len(temperature)).
         dens_b : np.array
             Temperature-dependent density of beta electrons evaluated on the grid points.
+            For an array of temperatures, it has a shape (npoints, len(temperature)).
         """
-        bt = 1.0 / (self._kb * temperature)
-        # compute spin chemical potential & energies of alpha and beta orbitals
-        spin_mu_a, spin_mu_b = self.compute_spin_chemical_potential(temperature)
-        energy_a, energy_b = self._molecule.orbital_energy
-        # compute density of each alpha and beta orbital on grid points
-        index = np.arange(1, self._molecule.nbasis + 1)
-        dens_a = self.compute_orbital_expression(index, spin='a')**2
-        dens_b = self.compute_orbital_expression(index, spin='b')**2
-        # compute temperature-dependent density of alpha and beta orbitals
-        dens_a /= (1. + np.exp(bt * (energy_a - spin_mu_a)))
-        dens_b /= (1. + np.exp(bt * (energy_b - spin_mu_b)))
+        # compute fermi occupation of alpha and beta orbitals
+        _, occ_a, occ_b = self._compute_fermi_occupation(temperature)
         # sum temperature-dependent density of all alpha and beta orbitals
-        return np.sum(dens_a, axis=1), np.sum(dens_b, axis=1)
+        return self._compute_orbital_density('a', occ_a), self._compute_orbital_density('b', occ_b)
 
     def compute_temperature_dependent_state(self, temperature):
         r"""Compute temperature-dependent local density of state of alpha & beta electrons on grid.
@@ -243,30 +343,63 @@ class OrbitalLocalTool(object):
         :math:`\phi_{i\sigma}(\mathbf{r})` denotes the :math:`i^{\text{th}}` :math:`\sigma`-
         molecular orbital. The :math:`k_{\text{B}}` is the Boltzmann constant.
 
+        The orbitals are evaluated once on each block of points, and used for all temperatures.
+
         Parameters
         ----------
-        temperature : float
-            Temperature at which to evaluate the spin chemical potential (in Kelvin).
+        temperature : float or np.ndarray
+            Temperature at which to evaluate the spin chemical potential (in Kelvin), or a
+            1D array of temperatures.
 
         Returns
         -------
         dens_a : np.array
             Temperature-dependent local density of state of alpha electrons.
+            For an array of temperatures, it has a shape (npoints, len(temperature)).
         dens_b : np.array
             Temperature-dependent local density of state of beta electrons.
+            For an array of temperatures, it has a shape (npoints, len(temperature)).
         """
-        bt = 1.0 / (self._kb * temperature)
+        # compute fermi occupation of alpha and beta orbitals
+        bt, occ_a, occ_b = self._compute_fermi_occupation(temperature)
+        # the derivative of fermi occupation is -bt * exp(x) / (1 + exp(x))**2 = -bt * n * (1 - n)
+        weights_a = -bt * occ_a * (1. - occ_a)
+        weights_b = -bt * occ_b * (1. - occ_b)
+        # sum temperature-dependent density of all alpha and beta orbitals
+        return (self._compute_orbital_density('a', weights_a),
+                self._compute_orbital_density('b', weights_b))
+
+    def _compute_fermi_occupation(self, temperature):
+        r"""Compute inverse temperature & fermi occupation of alpha and beta orbitals.
+
+        .. math::
+            n_{i \sigma, T} = \frac{1}{1 + e^{\frac{(\epsilon_{i\sigma} - \mu_{\sigma, T})}
+            {k_{\text{B}} T}}}
+
+        Parameters
+        ----------
+        temperature : float or np.ndarray
+            Temperature (in Kelvin), or a 1D array of temperatures.
+
+        Returns
+        -------
+        bt : float or np.ndarray
+            Inverse temperature :math:`1 / k_{\text{B}} T` with the same shape as `temperature`.
+        occ_a : np.ndarray
+            Fermi occupation of alpha orbitals of shape (nbasis,), or (nbasis, len(temperature))
+            for an array of temperatures.
+        occ_b : np.ndarray
+            Fermi occupation of beta orbitals of shape (nbasis,), or (nbasis, len(temperature))
+            for an array of temperatures.
+        """
+        temps = np.atleast_1d(np.asarray(temperature, dtype=float))
+        bt = 1.0 / (self._kb * temps)
         # compute spin chemical potential & energies of alpha and beta orbitals
-        spin_mu_a, spin_mu_b = self.compute_spin_chemical_potential(temperature)
+        spin_mu_a, spin_mu_b = self.compute_spin_chemical_potential(temps)
         energy_a, energy_b = self._molecule.orbital_energy
-        # compute density of each alpha and beta orbital on grid points
-        index = np.arange(1, self._molecule.nbasis + 1)
-        dens_a = self.compute_orbital_expression(index, spin='a')**2
-        dens_b = self.compute_orbital_expression(index, spin='b')**2
-        # compute temperature-dependent density of alpha and beta orbitals
-        factor_a = np.exp(bt * (energy_a - spin_mu_a))
-        factor_b = np.exp(bt * (energy_b - spin_mu_b))
-        dens_a *= -bt * factor_a / (1. + factor_a)**2
-        dens_b *= -bt * factor_b / (1. + factor_b)**2
-        # sum temperature-dependent density of all alpha and beta orbitals
-        return np.sum(dens_a, axis=1), np.sum(dens_b, axis=1)
+        # fermi occupations 1 / (1 + exp(x)) are evaluated as expit(-x) to avoid overflow
+        occ_a = expit(-bt * (energy_a[:, np.newaxis] - spin_mu_a))
+        occ_b = expit(-bt * (energy_b[:, np.newaxis] - spin_mu_b))
+        if np.ndim(temperature) == 0:
+            return bt[0], occ_a[:, 0], occ_b[:, 0]
+        return bt, occ_a, occ_b
@@ -193,3 +193,35 @@ def test_analyze_nci_assert_errors():
         test = '%s/%s' % (dn, 'test.png')
         desp.generate_plot(test)
         assert os.path.isfile(test) and os.access(test, os.R_OK)
+
+
+def test_analyze_nci_h2o_dimer_fchk_screened():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as file_path:
+        mol = Molecule.from_file(file_path)
+    cube = UniformGrid.from_molecule(mol, spacing=0.5, extension=2.0)
+    # NCI with hessian evaluated on all grid points
+    desp = NCI.from_molecule(mol, grid=cube)
+    assert desp.indices is None
+    # NCI with hessian evaluated on low density & low reduced gradient points
+    screened = NCI.from_molecule(mol, grid=cube, denscut=0.05, rdgcut=2.0)
+    mask = np.abs(desp._density) <= 0.05
+    rdg = np.ma.filled(desp._rdgrad, 100.0)
+    indices = np.where(mask & (rdg <= 2.0))[0]
+    assert 0 < screened.indices.size < cube.npoints
+    assert_equal(screened.indices, indices)
+    assert_almost_equal(screened._density, desp._density, decimal=8)
+    assert_almost_equal(screened._rdgrad[mask], rdg[mask], decimal=8)
+    assert_equal(screened._rdgrad[~mask], 100.0)
+    assert_almost_equal(screened.eigvalues, desp.eigvalues[indices], decimal=8)
+    assert_almost_equal(screened.signed_density[indices], desp.signed_density[indices],
+                        decimal=8)
+    # only density screening
+    screened = NCI.from_molecule(mol, grid=cube, denscut=0.05)
+    assert_equal(screened.indices, np.where(mask)[0])
+    assert_almost_equal(screened.eigvalues, desp.eigvalues[mask], decimal=8)
+    # check ValueError
+    assert_raises(ValueError, NCI.from_molecule, mol, grid=cube, denscut=-0.1)
+    assert_raises(ValueError, NCI.from_molecule, mol, grid=cube, rdgcut=0.0)
+    assert_raises(ValueError, NCI, desp._density, desp._rdgrad, cube, indices=indices)
+    assert_raises(ValueError, NCI, desp._density, desp._rdgrad, cube,
+                  hessian=np.zeros((cube.npoints, 6)), indices=indices)
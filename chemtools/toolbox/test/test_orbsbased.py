@@ -58,6 +58,13 @@ def check_orbital_based_properties(tool, data):
     # check spin chemical potential at T=25000K
     result = tool.compute_spin_chemical_potential(25000.0)
     assert_array_almost_equal(result, data["spin_mu_temp_25000"], decimal=6)
+    # check spin chemical potential at several temperatures at once
+    result = tool.compute_spin_chemical_potential(np.array([25000.0, 5000.0, 25000.0]))
+    assert_array_almost_equal(result[0][[0, 2]], [data["spin_mu_temp_25000"][0]] * 2, decimal=6)
+    assert_array_almost_equal(result[1][[0, 2]], [data["spin_mu_temp_25000"][1]] * 2, decimal=6)
+    assert_array_almost_equal(np.array(result)[:, 1], tool.compute_spin_chemical_potential(5000.),
+                              decimal=10)
+    assert_raises(ValueError, tool.compute_spin_chemical_potential, np.ones((2, 2)))
     # check density at T=25000K
     result = tool.compute_temperature_dependent_density(25000.0)
     assert_array_almost_equal(result[0], 0.5 * data["density_temp_25000"], decimal=6)
@@ -66,10 +73,24 @@ def check_orbital_based_properties(tool, data):
     result = tool.compute_temperature_dependent_state(25000)
     assert_array_almost_equal(result[0], 0.5 * data["density_states_temp_25000"], decimal=6)
     assert_array_almost_equal(result[1], 0.5 * data["density_states_temp_25000"], decimal=6)
+    # check density & local density of state at several temperatures at once
+    result = tool.compute_temperature_dependent_density(np.array([25000.0, 25000.0]))
+    assert result[0].shape == (data["points"].shape[0], 2)
+    assert_array_almost_equal(result[0][:, 1], 0.5 * data["density_temp_25000"], decimal=6)
+    assert_array_almost_equal(result[1][:, 0], 0.5 * data["density_temp_25000"], decimal=6)
+    result = tool.compute_temperature_dependent_state(np.array([25000.0]))
+    assert_array_almost_equal(result[0][:, 0], 0.5 * data["density_states_temp_25000"], decimal=6)
+    assert_array_almost_equal(result[1][:, 0], 0.5 * data["density_states_temp_25000"], decimal=6)
+    assert_raises(ValueError, tool.compute_temperature_dependent_density, np.ones((2, 2)))
     # check local ionization potential
     result = tool.average_local_ionization_energy
     assert_array_almost_equal(result[0], 0.5 * data["local_ip"], decimal=4)
     assert_array_almost_equal(result[1], 0.5 * data["local_ip"], decimal=4)
+    # check local ionization potential computed on blocks of points
+    occ_a, _ = tool._molecule.orbital_occupation
+    energy_a, _ = tool._molecule.orbital_energy
+    ip_a = tool._compute_orbital_density("a", occ_a * energy_a, chunk_size=5) / tool._density
+    assert_array_almost_equal(ip_a, result[0], decimal=8)
 
 
 def test_orbital_based_from_file_ch4_uhf_ccpvdz():
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+r"""Partitioning of cubic grid data into basins of attraction of its maxima."""
+
+
+import itertools
+
+import numpy as np
+
+
+__all__ = ["watershed_basins", "integrate_basins"]
+
+
+def watershed_basins(grid, density, cutoff=None):
+    r"""Assign each point of a cubic grid to the basin of a maximum of the density.
+
+    Each grid point points to the neighbouring point (out of 26 neighbours) along the steepest
+    ascent of density, i.e. the neighbour with largest :math:`(\rho_n - \rho) / d_n`, as in
+    the on-grid method of Yu & Trinkle and Henkelman et al. Grid points without a higher
+    neighbour are maxima. The ascent pointers are then followed with pointer jumping, which
+    resolves all the paths together, so the cost is linear in the number of grid points
+    (times the logarithm of the longest path).
+
+    Parameters
+    ----------
+    grid : UniformGrid
+        Cubic grid on which density is given.
+    density : np.ndarray, shape=(npoints,)
+        Density at every point on the grid, ordered as `grid.points`.
+    cutoff : float, optional
+        Grid points with density less than or equal to cutoff are not assigned to any basin,
+        e.g. to exclude vacuum where noise creates spurious maxima.
+
+    Returns
+    -------
+    labels : np.ndarray, shape=(npoints,)
+        Index of the basin (i.e. the maximum) of each grid point, or -1 for points below cutoff.
+    maxima : np.ndarray, shape=(M,)
+        Index of the grid point of each maximum, sorted by decreasing density.
+    """
+    density = np.asarray(density, dtype=float)
+    if density.shape != (grid.npoints,):
+        raise ValueError("Argument density should have shape ({0},)! Given shape={1}".format(
+            grid.npoints, density.shape))
+    shape = tuple(grid.shape)
+    volume = density.reshape(shape)
+    index = np.arange(grid.npoints).reshape(shape)
+    # steepest ascent slope & neighbour of each grid point; a point is its own neighbour
+    # if no neighbour has a higher density
+    slope = np.zeros(shape)
+    parent = index.copy()
+    for offset in itertools.product([-1, 0, 1], repeat=3):
+        if offset == (0, 0, 0):
+            continue
+        # slices of the grid points & of their neighbours along the offset
+        source = tuple(slice(max(-i, 0), n - max(i, 0)) for i, n in zip(offset, shape))
+        target = tuple(slice(max(i, 0), n - max(-i, 0)) for i, n in zip(offset, shape))
+        dist = np.linalg.norm(np.dot(offset, grid.axes))
+        step = (volume[target] - volume[source]) / dist
+        mask = step > slope[source]
+        slope[source][mask] = step[mask]
+        parent[source][mask] = index[target][mask]
+    parent = parent.ravel()
+    if cutoff is not None:
+        parent[density <= cutoff] = -1
+    # follow the ascent pointers until all of them point to maxima
+    while True:
+        valid = parent >= 0
+        ancestor = parent.copy()
+        ancestor[valid] = parent[parent[valid]]
+        if np.array_equal(ancestor, parent):
+            break
+        parent = ancestor
+    # number the maxima by decreasing density
+    maxima = np.flatnonzero(parent == np.arange(grid.npoints))
+    maxima = maxima[np.argsort(-density[maxima], kind="mergesort")]
+    basin = np.empty(grid.npoints, dtype=int)
+    basin[maxima] = np.arange(len(maxima))
+    labels = np.full(grid.npoints, -1, dtype=int)
+    labels[valid] = basin[parent[valid]]
+    return labels, maxima
+
+
+def integrate_basins(grid, labels, data, method="R0"):
+    r"""Integrate the data on a cubic grid over each basin.
+
+    Parameters
+    ----------
+    grid : UniformGrid
+        Cubic grid on which data is given.
+    labels : np.ndarray, shape=(npoints,)
+        Index of the basin of each grid point, or -1 for points not assigned to any basin,
+        e.g. as returned by :func:`watershed_basins`.
+    data : np.ndarray, shape=(npoints,) or (npoints, m)
+        Data at every point on the grid.
+    method : str, default='R0'
+        The method for computing the integration weights, see `UniformGrid.weights`.
+
+    Returns
+    -------
+    value : np.ndarray, shape=(M,) or (M, m)
+        Integral of data over each of the M basins.
+    """
+    labels = np.asarray(labels)
+    data = np.asarray(data, dtype=float)
+    if labels.shape != (grid.npoints,) or data.shape[0] != grid.npoints:
+        raise ValueError("Arguments labels & data should have the same size as the grid for "
+                         "axis=0! {0}, {1}!={2}".format(labels.shape[0], data.shape[0],
+                                                        grid.npoints))
+    mask = labels >= 0
+    nbasin = np.max(labels) + 1 if np.any(mask) else 0
+    weights = grid.weights(method=method)[mask]
+    values = data[mask].reshape(np.sum(mask), -1) * weights[:, None]
+    value = np.stack([np.bincount(labels[mask], values[:, i], minlength=nbasin)
+                      for i in range(values.shape[1])], axis=-1)
+    return value.reshape((nbasin,) + data.shape[1:])
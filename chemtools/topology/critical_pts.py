@@ -21,10 +21,13 @@
 #
 # --
 r"""This file contains functions for finding the critical points."""
+import itertools
 import warnings
 import numpy as np
 from scipy.optimize import root
 from scipy.spatial import KDTree
+from chemtools.topology.paths import trace_gradient_paths
+from chemtools.utils import parallel
 
 
 class CriticalPoint(object):
@@ -61,11 +64,104 @@ class CriticalPoint(object):
         return "{}".format(self.point)
 
 
+# directions from the center to the vertices of a regular tetrahedron, used for cage points
+# 0.942809 = sqrt(8) / 3, 0.471405 = sqrt(2) / 3, 0.816497 = sqrt(2 / 3)
+_CAGE_VECTORS = np.array([
+    [0.942809, 0.0, -0.333333],
+    [-0.471405, 0.816497, -0.333333],
+    [-0.471405, -0.816497, -0.333333],
+    [0.0, 0.0, 1.0],
+])
+
+
+class _VoxelIndex(object):
+    """Hashed voxel grid of labeled points for finding nearby points in constant time.
+
+    Points are stored in cubic cells of the given size, keyed by their integer cell indices,
+    so inserting a point and finding points closer than the cell size only visit the cell of
+    the point and its 26 neighbours.
+    """
+
+    def __init__(self, cell_size):
+        """Initialize empty voxel index.
+
+        Parameters
+        ----------
+        cell_size : float
+            Length of the cubic cells; the maximum distance used for finding nearby points.
+        """
+        self._cell_size = cell_size
+        self._cells = {}
+        self._points = []
+        self._labels = []
+
+    def __len__(self):
+        """int: number of points in the index."""
+        return len(self._points)
+
+    @property
+    def points(self):
+        """np.ndarray(N, 3): coordinates of the points in order of insertion."""
+        return np.array(self._points, dtype=float).reshape(-1, 3)
+
+    @property
+    def labels(self):
+        """np.ndarray(N,): labels of the points in order of insertion."""
+        return np.array(self._labels, dtype=int)
+
+    def _cell(self, point):
+        """tuple(int, int, int): indices of the cell containing the point."""
+        return tuple(int(i) for i in np.floor(np.asarray(point) / self._cell_size))
+
+    def add(self, point, label):
+        """Add a labeled point to the index.
+
+        Parameters
+        ----------
+        point : np.ndarray(3,)
+            coordinates of the point
+        label : int
+            label of the point
+        """
+        self._cells.setdefault(self._cell(point), []).append(len(self._points))
+        self._points.append(np.asarray(point, dtype=float))
+        self._labels.append(int(label))
+
+    def query(self, point, distance):
+        """Return labels of the points closer than the given distance to a point.
+
+        Parameters
+        ----------
+        point : np.ndarray(3,)
+            coordinates of the point
+        distance : float
+            distance to the point, which should not be larger than the cell size
+
+        Returns
+        -------
+        list of int
+            labels of the nearby points
+        """
+        if distance > self._cell_size:
+            raise ValueError(
+                "Distance {} is larger than the cell size {}".format(distance, self._cell_size)
+            )
+        i, j, k = self._cell(point)
+        labels = []
+        for shift in np.ndindex(3, 3, 3):
+            cell = (i + shift[0] - 1, j + shift[1] - 1, k + shift[2] - 1)
+            for index in self._cells.get(cell, []):
+                if np.linalg.norm(self._points[index] - point) < distance:
+                    labels.append(self._labels[index])
+        return labels
+
+
 class Topo(object):
     """Topo class for searching critical points given scalar function."""
 
     def __init__(
-        self, coors, value_func, gradian_func, hess_func, points=None, extra=5
+        self, coors, value_func, gradian_func, hess_func, points=None, extra=5,
+        vectorized=False, adaptive=True
     ):
         """Initialize Topo class instance.
 
@@ -81,10 +177,20 @@ class Topo(object):
             2nd order derivative of the scarlar function
         points : np.ndarray(M, 3), optional
             An array of 3 dimension initial guess points. If not given,
-            a meshgrid (min(x, y, z) - extra, max(x, y, z) + extra, step=0.2)
-            will be generated by default.
+            a meshgrid (min(x, y, z) - extra, max(x, y, z) + extra) is generated,
+            see adaptive argument.
         extra : int, optional
             Extra space for generating meshgrid. Used in above situation
+        vectorized : bool, optional
+            Whether hess_func evaluates an array of points np.ndarray(N, 3) and returns
+            np.ndarray(N, 3, 3). If False, hess_func is called on one point at a time.
+        adaptive : bool, optional
+            Whether the default initial guess points are a coarse meshgrid (step=1.0) refined
+            only where critical points are expected, see `_adaptive_seeds`. If False, a dense
+            meshgrid with step=0.2 is generated. Note that the adaptive meshgrid evaluates
+            gradian_func on the coarse meshgrid when the instance is initialized, so it should
+            be set to False if gradian_func should not be called before searching for critical
+            points. It is ignored if points are given.
         """
         if coors.ndim != 2:
             raise ValueError("Input array need to be (N, 3) shape.")
@@ -92,12 +198,17 @@ class Topo(object):
         self.v_f = value_func
         self.g_f = gradian_func
         self.h_f = hess_func
+        self._vectorized = vectorized
         # num of the maximum equals to num of atoms
-        if points is None:
+        if points is None and adaptive:
+            points = self._adaptive_seeds(extra)
+        elif points is None:
             points = self._default_cube(extra)
-        self._kdtree = KDTree(points)
-        self._found_ct = np.zeros((0, 3))
-        self._found_ct_type = np.zeros(0, dtype=int)
+        # seed points added after building the KD-tree are stored until it is rebuilt
+        self._seeds = KDTree(points)
+        self._new_seeds = []
+        # found critical points indexed by voxels of the distance to consider them the same
+        self._found = _VoxelIndex(1e-3)
         self._crit_max = []
         self._crit_bond = []
         self._crit_ring = []
@@ -126,16 +237,112 @@ class Topo(object):
         g = np.meshgrid(x, y, z)
         return np.stack([i.ravel() for i in g], axis=1)
 
+    def _adaptive_seeds(self, extra=5, spacing=1.0, n_refine=5, pair_cutoff=None):
+        """Generate initial guess points refined only where critical points are expected.
+
+        A coarse cubic meshgrid is refined by a small meshgrid of n_refine**3 points spanning
+        one coarse grid cell around each of these sites: the coarse grid points with smaller
+        gradient norm than all of their 26 neighbours, the centers of coarse grid cells in which
+        every gradient component changes sign, the midpoints of atom pairs, and the centroids of
+        atom triples (ring centers) whose atoms are within pair_cutoff of each other.
+
+        Parameters
+        ----------
+        extra : float, default to 5
+            extra space around the atoms for generating the coarse meshgrid
+        spacing : float, default to 1.0
+            spacing of the coarse meshgrid
+        n_refine : int, default to 5
+            number of refined points along each axis around each site
+        pair_cutoff : float, optional
+            maximum distance of atoms forming pairs & triples. If None, twice the largest
+            distance of an atom to its nearest atom is used.
+
+        Returns
+        -------
+        np.ndarray(K, 3)
+            3 dimenstion arrays
+        """
+        max_xyz = np.max(self.coors, axis=0) + extra
+        min_xyz = np.min(self.coors, axis=0) - extra
+        axes = [np.arange(low, high + spacing, spacing) for low, high in zip(min_xyz, max_xyz)]
+        coarse = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+        shape = coarse.shape[:3]
+        coarse = coarse.reshape(-1, 3)
+        grad = np.concatenate([
+            self.get_gradient(coarse[start:start + 10000])
+            for start in range(0, len(coarse), 10000)
+        ]).reshape(shape + (3,))
+        # coarse grid points with locally minimal gradient norm, except the boundary points
+        norm = np.linalg.norm(grad, axis=-1)
+        minima = np.zeros(shape, dtype=bool)
+        minima[1:-1, 1:-1, 1:-1] = True
+        for offset in itertools.product([-1, 0, 1], repeat=3):
+            if offset == (0, 0, 0):
+                continue
+            source = tuple(slice(max(-i, 0), n - max(i, 0)) for i, n in zip(offset, shape))
+            target = tuple(slice(max(i, 0), n - max(-i, 0)) for i, n in zip(offset, shape))
+            minima[source] &= norm[source] <= norm[target]
+        # coarse grid cells whose corners have both signs of each gradient component
+        corners = [grad[i:i + shape[0] - 1, j:j + shape[1] - 1, k:k + shape[2] - 1]
+                   for i, j, k in itertools.product([0, 1], repeat=3)]
+        positive = np.any([c > 0 for c in corners], axis=0)
+        negative = np.any([c < 0 for c in corners], axis=0)
+        cells = np.all(positive & negative, axis=-1)
+        sites = [
+            coarse[minima.ravel()],
+            coarse.reshape(shape + (3,))[:-1, :-1, :-1][cells] + 0.5 * spacing,
+        ]
+        # midpoints of atom pairs & centroids of atom triples within the cutoff distance
+        if len(self.coors) > 1:
+            dist = np.linalg.norm(self.coors[:, None, :] - self.coors[None, :, :], axis=-1)
+            if pair_cutoff is None:
+                np.fill_diagonal(dist, np.inf)
+                pair_cutoff = 2 * np.max(np.min(dist, axis=1))
+            close = np.triu(dist <= pair_cutoff, k=1)
+            pairs = np.array(np.nonzero(close)).T
+            sites.append(np.mean(self.coors[pairs], axis=1))
+            # atoms k > j close to both atoms of each pair (i, j), since close is upper triangular
+            index, third = np.nonzero(close[pairs[:, 0]] & close[pairs[:, 1]])
+            triples = np.column_stack([pairs[index], third])
+            sites.append(np.mean(self.coors[triples], axis=1).reshape(-1, 3))
+        sites = np.concatenate(sites)
+        # small meshgrid spanning one coarse grid cell centered at each site
+        offsets = (np.arange(n_refine) - (n_refine - 1) / 2.0) * spacing / n_refine
+        offsets = np.stack(np.meshgrid(offsets, offsets, offsets, indexing="ij"), axis=-1)
+        refined = sites[:, None, :] + offsets.reshape(1, -1, 3)
+        return np.concatenate([coarse, refined.reshape(-1, 3)])
+
+    @property
+    def _kdtree(self):
+        """KDTree: KD-tree of all initial guess points, rebuilt once after adding points."""
+        if self._new_seeds:
+            self._seeds = KDTree(np.vstack([self._seeds.data] + self._new_seeds))
+            self._new_seeds = []
+        return self._seeds
+
+    @property
+    def _found_ct(self):
+        """np.ndarray(N, 3): coordinates of the found critical points."""
+        return self._found.points
+
+    @property
+    def _found_ct_type(self):
+        """np.ndarray(N,): sum of sign of eigenvalues of the found critical points."""
+        return self._found.labels
+
     def add_points(self, points):
-        """Add a point to exiting initial guess points.
+        """Add points to exiting initial guess points.
+
+        The KD-tree of initial guess points is rebuilt once when it is next used, so adding
+        points one at a time or in bulk have the same cost.
 
         Parameters
         ----------
-        points : np.ndarray(3,)
-            a numpy 3d array
+        points : np.ndarray(3,) or np.ndarray(M, 3)
+            a numpy 3d array, or an array of M points
         """
-        new_points = np.vstack((self._kdtree.data, points))
-        self._kdtree = KDTree(new_points)
+        self._new_seeds.append(np.asarray(points, dtype=float).reshape(-1, 3))
 
     def _root_find(self, init_guess):
         """Use scipy root method to compute the root.
@@ -154,7 +361,7 @@ class Topo(object):
         sol = root(
             self.g_f,
             x0=init_guess,
-            jac=self.h_f,
+            jac=lambda point: self.get_hessian(point[None])[0],
             tol=1e-15,
             method="hybr",
             options={"maxfev": 1000},
@@ -177,6 +384,23 @@ class Topo(object):
         g_list = self.g_f(points)
         return g_list
 
+    def get_hessian(self, points):
+        """Compute the hessian of given points.
+
+        Parameters
+        ----------
+        points : np.ndarray(N, 3)
+            arbituary number of points
+
+        Returns
+        -------
+        np.ndarray(N, 3, 3)
+            2nd order derivative of given points
+        """
+        if self._vectorized:
+            return np.asarray(self.h_f(points)).reshape(-1, 3, 3)
+        return np.array([self.h_f(point) for point in points]).reshape(-1, 3, 3)
+
     @staticmethod
     def _construct_cage(point, length, n_points=4):
         """Construct points to encage given guess point.
@@ -202,41 +426,217 @@ class Topo(object):
             n_points only support 4 at this moment
         """
         if n_points == 4:
-            # 489898 = sqrt(24), 0.942809 = sqrt(8) / 3
-            # 0.471405 = sqrt(2) / 3, 0.816497 = sqrt(2 / 3)
+            # 489898 = sqrt(24)
             constant = 4.89898 * length
-            p1 = point + constant * np.array([0.942809, 0.0, -0.333333])
-            p2 = point + constant * np.array([-0.471405, 0.816497, -0.333333])
-            p3 = point + constant * np.array([-0.471405, -0.816497, -0.333333])
-            p4 = point + constant * np.array([0.0, 0.0, 1.0])
+            return point + constant * _CAGE_VECTORS
+        raise NotImplementedError(
+            "Given args n_point={} is not valid".format(n_points)
+        )
+
+    def find_critical_pts(self, n_jobs=None):
+        """Start the critical point finding main function.
+
+        Parameters
+        ----------
+        n_jobs : int, optional
+            Number of worker processes searching partitions of the initial guess points. If -1,
+            all available CPUs are used. If None, critical points are searched in this process.
+        """
+        if n_jobs is None:
+            results = [self._search_seeds(self._kdtree.data)]
         else:
-            raise NotImplementedError(
-                "Given args n_point={} is not valid".format(n_points)
-            )
-        return np.vstack((p1, p2, p3, p4))
-
-    def find_critical_pts(self):
-        """Start the critical point finding main function."""
-        for init_point in self._kdtree.data:
-            length, _ = self._kdtree.query(init_point, 4)
-            tetrahedral = self._construct_cage(init_point, length[-1])
-            g_values = self.get_gradient(tetrahedral)
-            central_g = self.get_gradient(init_point)
-            # initial guess points
-            if np.all(np.linalg.norm(central_g) < np.linalg.norm(g_values, axis=-1)):
-                result = self._root_find(init_point)
-                # converge to critical pt
-                if result.success:
-                    point = result.x
-                    # if critical pt is maxima, skip.
-                    if self._is_coors_pt(point):
-                        continue
-                    ct_pt, ct_type = self._classify_critical_pt(point)
-                    if ct_type != 0 and self.check_not_same_pt(ct_pt, ct_type):
-                        self._add_critical_point(ct_pt, ct_type)
+            results = self._search_in_parallel(n_jobs)
+        # merge critical points found from all seeds, skipping duplicates
+        for points, eigenvals, eigenvecs, signatures in results:
+            for point, vals, vecs, ct_type in zip(points, eigenvals, eigenvecs, signatures):
+                ct_pt = CriticalPoint(point, vals, vecs)
+                if ct_type != 0 and self.check_not_same_pt(ct_pt, ct_type):
+                    self._add_critical_point(ct_pt, ct_type)
         if self._satisfy_poincare_hopf() != 1:
             warnings.warn("Poincare Hopf value is not 1", RuntimeWarning)
 
+    def trace_bond_paths(self, offset=1e-3, **kwargs):
+        """Trace the bond paths connecting the found bond critical points to the nuclei.
+
+        Each bond path consists of the two gradient paths ascending from a bond critical point
+        along the eigenvector of the positive eigenvalue of its hessian. The paths of all bond
+        critical points are traced together, see :func:`trace_gradient_paths`.
+
+        Parameters
+        ----------
+        offset : float, optional
+            Distance from the bond critical point to the starting points of the gradient paths.
+        kwargs
+            Keyword arguments of :func:`trace_gradient_paths`, except for ascent & attractors.
+
+        Returns
+        -------
+        paths : list of np.ndarray(L, 3)
+            Points of each bond path, going from one nucleus through the bond critical point
+            to the other nucleus.
+        atoms : np.ndarray(M, 2)
+            Indices of the nuclei (in coors) connected by each bond path; -1 when the gradient
+            path did not reach a nucleus.
+        """
+        if not self._crit_bond:
+            return [], np.zeros((0, 2), dtype=int)
+        bcps = np.array([cp.point for cp in self._crit_bond])
+        # eigenvector of the positive eigenvalue of each bond critical point
+        vecs = np.array([cp.eigenvectors[:, np.argmax(cp.eigenvalues)] for cp in self._crit_bond])
+        starts = np.concatenate([bcps - offset * vecs, bcps + offset * vecs])
+        halves, ends = trace_gradient_paths(
+            self.g_f, starts, ascent=True, attractors=self.coors, **kwargs
+        )
+        nbond = len(bcps)
+        paths = [
+            np.vstack([halves[i][::-1], bcp, halves[i + nbond]])
+            for i, bcp in enumerate(bcps)
+        ]
+        return paths, np.stack([ends[:nbond], ends[nbond:]], axis=1)
+
+    def _search_seeds(self, seeds):
+        """Search critical points starting from the given initial guess points.
+
+        Parameters
+        ----------
+        seeds : np.ndarray(M, 3)
+            initial guess points
+
+        Returns
+        -------
+        tuple(np.ndarray(K, 3), np.ndarray(K, 3), np.ndarray(K, 3, 3), np.ndarray(K,))
+            coordinates, hessian eigenvalues & eigenvectors, and the sum of sign of
+            eigenvalues of the critical points (which may contain duplicates)
+        """
+        candidates = self._find_candidates(seeds)
+        points, converged = self._newton_root_find(candidates)
+        # use scipy root method for candidates not converged by Newton iterations
+        for index in np.where(~converged)[0]:
+            result = self._root_find(candidates[index])
+            if result.success:
+                points[index], converged[index] = result.x, True
+        # if critical pt is maxima, skip.
+        points = points[converged]
+        points = points[~self._is_coors_pts(points)]
+        crit_pts, signatures = self._classify_critical_pts(points)
+        eigenvals = np.array([ct_pt.eigenvalues for ct_pt in crit_pts]).reshape(-1, 3)
+        eigenvecs = np.array([ct_pt.eigenvectors for ct_pt in crit_pts]).reshape(-1, 3, 3)
+        return points, eigenvals, eigenvecs, signatures
+
+    def _search_in_parallel(self, n_jobs):
+        """Search critical points from spatial partitions of seeds using worker processes.
+
+        The seed points are sorted along the axis of their largest extent and split into
+        slabs which are searched by a pool of forked worker processes.
+
+        Parameters
+        ----------
+        n_jobs : int
+            Number of worker processes. If -1, all available CPUs are used.
+
+        Returns
+        -------
+        list of tuple
+            the critical points found from each partition, see `_search_seeds`
+        """
+        n_jobs = parallel.check_n_jobs(n_jobs)
+        seeds = self._kdtree.data
+        if len(seeds) == 0:
+            return []
+        # sort seeds into slabs along the axis of largest extent; use a few slabs per worker
+        # to balance the load, as critical points are not uniformly distributed
+        axis = np.argmax(np.ptp(seeds, axis=0))
+        seeds = seeds[np.argsort(seeds[:, axis], kind="mergesort")]
+        chunk_size = -(-len(seeds) // (4 * n_jobs))
+        bounds = [(start, min(start + chunk_size, len(seeds)))
+                  for start in range(0, len(seeds), chunk_size)]
+
+        # forked workers inherit this instance & seeds, so the (possibly non-picklable)
+        # functions of Topo are not pickled
+        def search_partition(block):
+            """Search critical points from the seed points between the given bounds."""
+            start, end = block
+            return self._search_seeds(seeds[start:end])
+
+        return parallel.map_forked(search_partition, bounds, n_jobs)
+
+    def _find_candidates(self, points, chunk_size=10000):
+        """Return initial guess points with smaller gradient norm than their surrounding cage.
+
+        Parameters
+        ----------
+        points : np.ndarray(M, 3)
+            initial guess points
+        chunk_size : int, default to 10000
+            number of initial guess points whose cages are evaluated at once
+
+        Returns
+        -------
+        np.ndarray(K, 3)
+            initial guess points passing the gradient norm test
+        """
+        candidates = np.zeros(len(points), dtype=bool)
+        for start in range(0, len(points), chunk_size):
+            block = points[start:start + chunk_size]
+            # cage around each point scaled by the distance to its 3rd nearest neighbour
+            length, _ = self._kdtree.query(block, 4)
+            cages = block[:, None, :] + 4.89898 * length[:, -1, None, None] * _CAGE_VECTORS
+            g_values = self.get_gradient(cages.reshape(-1, 3)).reshape(-1, 4, 3)
+            central_g = self.get_gradient(block)
+            candidates[start:start + chunk_size] = np.all(
+                np.linalg.norm(central_g, axis=-1)[:, None] < np.linalg.norm(g_values, axis=-1),
+                axis=1,
+            )
+        return points[candidates]
+
+    def _newton_root_find(self, init_guess, maxiter=100, xtol=1e-12, gtol=1e-8, max_step=1.0):
+        """Find roots of the gradient with Newton iterations on all initial guesses together.
+
+        Parameters
+        ----------
+        init_guess : np.ndarray(M, 3)
+            initial guess points
+        maxiter : int, default to 100
+            maximum number of Newton iterations
+        xtol : float, default to 1e-12
+            convergence threshold of the Newton step length
+        gtol : float, default to 1e-8
+            convergence threshold of the gradient norm at the final point; points whose Newton
+            steps vanish (e.g. along vanishing curvatures) at a larger gradient norm are not
+            converged
+        max_step : float, default to 1.0
+            maximum length of a Newton step
+
+        Returns
+        -------
+        tuple(np.ndarray(M, 3), np.ndarray(M,))
+            the roots and whether the Newton iterations converged for each initial guess
+        """
+        points = np.array(init_guess, dtype=float, copy=True).reshape(-1, 3)
+        converged = np.zeros(len(points), dtype=bool)
+        active = np.arange(len(points))
+        for _ in range(maxiter):
+            if active.size == 0:
+                break
+            grad = self.get_gradient(points[active])
+            eigvals, eigvecs = np.linalg.eigh(self.get_hessian(points[active]))
+            # Newton step in the eigenbasis of hessian, skipping vanishing curvatures
+            inv_eigvals = np.zeros(eigvals.shape)
+            mask = np.abs(eigvals) > 1e-14
+            inv_eigvals[mask] = 1.0 / eigvals[mask]
+            proj = np.einsum("nji,nj->ni", eigvecs, grad)
+            step = -np.einsum("nij,nj->ni", eigvecs, proj * inv_eigvals)
+            length = np.linalg.norm(step, axis=-1)
+            step[length > max_step] *= (max_step / length[length > max_step])[:, None]
+            points[active] += step
+            done = length < xtol
+            if np.any(done):
+                # converged only if the gradient vanishes at the final point
+                g_norm = np.linalg.norm(self.get_gradient(points[active[done]]), axis=-1)
+                converged[active[done]] = g_norm < gtol
+            active = active[~done]
+        return points, converged
+
     def _add_critical_point(self, ct_pt, ct_type):
         """Add criticla point to instance.
 
@@ -254,14 +654,18 @@ class Topo(object):
             1: self._crit_ring,
         }
         signature_dict[ct_type].append(ct_pt)
-        self._found_ct = np.vstack((self._found_ct, ct_pt.point))
-        self._found_ct_type = np.append(self._found_ct_type, int(ct_type))
+        self._found.add(ct_pt.point, ct_type)
 
     def _is_coors_pt(self, pt, atom_eps=1e-3):
         """Bool: return if the point the same as atomic position."""
         # return True if it is the same as atomic position, otherwise False.
         return np.any(np.linalg.norm(pt - self.coors, axis=-1) < atom_eps)
 
+    def _is_coors_pts(self, pts, atom_eps=1e-3):
+        """np.ndarray(N,): return whether each point is the same as an atomic position."""
+        dis = np.linalg.norm(pts[:, None, :] - self.coors[None, :, :], axis=-1)
+        return np.any(dis < atom_eps, axis=1)
+
     def _satisfy_poincare_hopf(self):
         """int: the total sum of poincare hopf eqaution."""
         pre_hopf = (
@@ -302,16 +706,38 @@ class Topo(object):
         # signature_dict[signature].append(crit_pt)
         # self._satisfy_poincare_hopf()
 
+    def _classify_critical_pts(self, points, eigen_cutoff=1e-4):
+        """Classify the type of given critical points.
+
+        Parameters
+        ----------
+        points : np.ndarray(N, 3)
+            Coordinates of given critical points
+        eigen_cutoff : float, default to 1e-4
+            The engenvalue cutoff incase too small value
+
+        Returns
+        -------
+        tuple(list of CriticalPoint, np.ndarray(N,))
+            CriticalPoint instances with all property of crit pts
+            and the sum of sign of eigenvalues of given points
+        """
+        eigenvals, eigenvecs = np.linalg.eigh(self.get_hessian(points))
+        # Zero eigenvalues occur with points that are far away.
+        # If eigenvalues too small, neglect these critical points
+        signatures = np.sum(np.sign(eigenvals), axis=1).astype(int)
+        signatures[np.max(np.abs(eigenvals), axis=1) <= eigen_cutoff] = 0
+        crit_pts = [
+            CriticalPoint(point, vals, vecs)
+            for point, vals, vecs in zip(points, eigenvals, eigenvecs)
+        ]
+        return crit_pts, signatures
+
     def check_not_same_pt(self, pts, ct_type):
         """Bool: check given point is not already included in critical pts."""
         # return True if no existing critical pts.
         # else False
-        dis = np.linalg.norm(pts.point - self._found_ct, axis=-1)
-        pos = np.where(dis < 1e-3)[0]
-        if len(pos) > 0:
-            if ct_type in self._found_ct_type[pos]:
-                return False
-        return True
+        return ct_type not in self._found.query(pts.point, 1e-3)
 
 
 """
@@ -26,6 +26,8 @@ r"""Contains class responsible for calculating various descriptors based on eige
 import warnings
 import numpy as np
 
+from chemtools.utils.utils import eigvalsh_3x3
+
 
 __all__ = ["EigenValueTool"]
 
@@ -51,6 +53,21 @@ class EigenValueTool(object):
         self._eigenvalues = eigenvalues
         self._eps = eps
 
+    @classmethod
+    def from_hessian(cls, hessian, eps=1e-15):
+        r"""Initialize class from the Hessian of points.
+
+        Parameters
+        ----------
+        hessian : np.ndarray, shape=(n, 6)
+            Upper-triangular elements of the Hessian of each point ordered as
+            :math:`(xx, xy, xz, yy, yz, zz)`, e.g. the output of `Molecule.compute_hessian`.
+        eps : float, optional
+            The error bound for being a zero eigenvalue.
+
+        """
+        return cls(eigvalsh_3x3(hessian), eps=eps)
+
     @property
     def eigenvalues(self):
         r"""Eigenvalues of points."""
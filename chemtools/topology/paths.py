@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+r"""Gradient path tracing with adaptive embedded Runge-Kutta integration."""
+
+
+import numpy as np
+
+
+__all__ = ["trace_gradient_paths"]
+
+
+# Dormand-Prince 5(4) coefficients
+_DP_C = np.array([0.0, 1.0 / 5.0, 3.0 / 10.0, 4.0 / 5.0, 8.0 / 9.0, 1.0, 1.0])
+_DP_A = [
+    [],
+    [1.0 / 5.0],
+    [3.0 / 40.0, 9.0 / 40.0],
+    [44.0 / 45.0, -56.0 / 15.0, 32.0 / 9.0],
+    [19372.0 / 6561.0, -25360.0 / 2187.0, 64448.0 / 6561.0, -212.0 / 729.0],
+    [9017.0 / 3168.0, -355.0 / 33.0, 46732.0 / 5247.0, 49.0 / 176.0, -5103.0 / 18656.0],
+    [35.0 / 384.0, 0.0, 500.0 / 1113.0, 125.0 / 192.0, -2187.0 / 6784.0, 11.0 / 84.0],
+]
+# difference between 5th and 4th order weights, used for estimating the local error
+_DP_E = np.array([
+    71.0 / 57600.0, 0.0, -71.0 / 16695.0, 71.0 / 1920.0, -17253.0 / 339200.0, 22.0 / 525.0,
+    -1.0 / 40.0,
+])
+
+
+def _direction(grad_func, points, sign):
+    """Return the unit vectors along (sign times) the gradient of points; zero if it vanishes."""
+    grad = np.asarray(grad_func(points), dtype=float).reshape(-1, 3)
+    norm = np.linalg.norm(grad, axis=-1)
+    direction = np.zeros(grad.shape)
+    mask = norm > 0.0
+    direction[mask] = sign * grad[mask] / norm[mask, None]
+    return direction, norm
+
+
+def trace_gradient_paths(grad_func, points, ascent=True, step_size=0.1, tol=1e-6,
+                         max_steps=1000, attractors=None, attractor_radius=0.1,
+                         grad_cutoff=1e-8):
+    r"""Trace gradient paths of a scalar function from the given points.
+
+    The gradient paths are solutions of
+    :math:`\frac{d\mathbf{r}}{ds} = \pm \frac{\nabla f(\mathbf{r})}{\lVert \nabla f(\mathbf{r})
+    \rVert}`, parametrized by arc length :math:`s`, which are integrated with the embedded
+    Dormand-Prince 5(4) Runge-Kutta method with adaptive step size. All paths are advanced
+    together, so each Runge-Kutta stage is a single call of the gradient function on the
+    points of all unfinished paths.
+
+    Parameters
+    ----------
+    grad_func : Callable[np.ndarray(N, 3) -> np.ndarray(N, 3)]
+        Gradient of the scalar function, e.g. `Molecule.compute_gradient`.
+    points : np.ndarray(M, 3)
+        Starting points of the gradient paths.
+    ascent : bool, optional
+        Whether paths follow the gradient (ascent) or the negative gradient (descent).
+    step_size : float, optional
+        Initial and maximum arc length of a step.
+    tol : float, optional
+        Maximum local error of a step; steps with a larger error estimate are repeated with
+        a smaller step size.
+    max_steps : int, optional
+        Maximum number of (accepted or rejected) steps of each path.
+    attractors : np.ndarray(K, 3), optional
+        Coordinates of attractors, e.g. nuclei for ascending paths of electron density. A path
+        ends at an attractor when it is closer than attractor_radius to it.
+    attractor_radius : float, optional
+        Distance from an attractor at which a path is terminated at the attractor.
+    grad_cutoff : float, optional
+        A path ends when the gradient norm becomes smaller than this value, e.g. at a critical
+        point which is not an attractor.
+
+    Returns
+    -------
+    paths : list of np.ndarray(L, 3)
+        The points of each gradient path, starting from the given point. The last point of a
+        path ending at an attractor is the attractor.
+    ends : np.ndarray(M,)
+        Index of the attractor reached by each path, or -1 if the path did not reach one.
+    """
+    points = np.array(points, dtype=float, copy=True).reshape(-1, 3)
+    if step_size <= 0 or tol <= 0:
+        raise ValueError("Arguments step_size & tol should be positive! "
+                         "Given step_size={0}, tol={1}".format(step_size, tol))
+    if attractors is None:
+        attractors = np.zeros((0, 3))
+    attractors = np.asarray(attractors, dtype=float).reshape(-1, 3)
+    sign = 1.0 if ascent else -1.0
+    npaths = len(points)
+    ends = np.full(npaths, -1, dtype=int)
+    # record of path points as (path index, point) blocks, assembled into paths at the end
+    record_index, record_point = [np.arange(npaths)], [points.copy()]
+
+    def reached_attractor(index):
+        """Mark paths that are close to an attractor and return the mask of those paths."""
+        if len(attractors) == 0:
+            return np.zeros(len(index), dtype=bool)
+        dist = np.linalg.norm(points[index, None, :] - attractors[None, :, :], axis=-1)
+        nearest = np.argmin(dist, axis=1)
+        mask = dist[np.arange(len(index)), nearest] < attractor_radius
+        ends[index[mask]] = nearest[mask]
+        record_index.append(index[mask])
+        record_point.append(attractors[nearest[mask]])
+        return mask
+
+    active = np.arange(npaths)
+    active = active[~reached_attractor(active)]
+    k_first, norm = _direction(grad_func, points[active], sign)
+    mask = norm >= grad_cutoff
+    active, k_first = active[mask], k_first[mask]
+    step = np.full(npaths, float(step_size))
+    for _ in range(max_steps):
+        if active.size == 0:
+            break
+        # Runge-Kutta stages of the unfinished paths
+        h = step[active, None]
+        stages = [k_first]
+        for i in range(1, 7):
+            shift = sum(a * k for a, k in zip(_DP_A[i], stages))
+            direction, norm = _direction(grad_func, points[active] + h * shift, sign)
+            stages.append(direction)
+        new_points = points[active] + h * sum(a * k for a, k in zip(_DP_A[6], stages))
+        error = np.linalg.norm(h * sum(e * k for e, k in zip(_DP_E, stages)), axis=-1)
+        # adapt step size of each path based on its error estimate
+        accept = error <= tol
+        factor = np.full(active.size, 5.0)
+        nonzero = error > 0.0
+        factor[nonzero] = np.clip(0.9 * (tol / error[nonzero]) ** 0.2, 0.2, 5.0)
+        step[active] = np.minimum(step[active] * factor, step_size)
+        # advance accepted paths; the last stage is evaluated at the new point, so it is the
+        # first stage of the next step
+        index = active[accept]
+        points[index] = new_points[accept]
+        record_index.append(index)
+        record_point.append(new_points[accept])
+        k_first = np.where(accept[:, None], stages[6], k_first)
+        # terminate paths reaching an attractor or a vanishing gradient
+        done = np.zeros(active.size, dtype=bool)
+        done[accept] = reached_attractor(index)
+        done |= accept & (norm < grad_cutoff)
+        active, k_first = active[~done], k_first[~done]
+
+    # assemble path points in the order they were recorded
+    record_index = np.concatenate(record_index)
+    record_point = np.concatenate(record_point)
+    order = np.argsort(record_index, kind="mergesort")
+    counts = np.bincount(record_index, minlength=npaths)
+    paths = np.split(record_point[order], np.cumsum(counts)[:-1])
+    return paths, ends
@@ -0,0 +1,46 @@
+"""Test watershed basins on cubic grids."""
+
+from chemtools.utils.cube import UniformGrid
+from chemtools.topology.basins import watershed_basins, integrate_basins
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_equal, assert_raises
+
+
+def _two_gaussians_grid():
+    # cubic grid without points on the z=0 plane and density of two gaussians
+    centers = np.array([[0., 0., -1.5], [0., 0., 1.5]])
+    grid = UniformGrid(np.array([1, 1]), np.array([1., 1.]), centers,
+                       np.array([-5., -5., -5.1]), np.eye(3) * 0.2, np.array([51, 51, 52]))
+    points = grid.points
+    dens = np.exp(-2 * np.sum((points[:, None, :] - centers[None, :, :]) ** 2, axis=-1))
+    return grid, points, dens[:, 0] + 0.5 * dens[:, 1]
+
+
+def test_watershed_basins_two_gaussians():
+    grid, points, dens = _two_gaussians_grid()
+    labels, maxima = watershed_basins(grid, dens)
+    # maxima are sorted by decreasing density
+    assert_allclose(points[maxima], [[0., 0., -1.5], [0., 0., 1.5]], atol=1e-10)
+    assert_equal(labels, (points[:, 2] > 0).astype(int))
+    # points below cutoff are not assigned to any basin
+    labels_cut, maxima_cut = watershed_basins(grid, dens, cutoff=1e-3)
+    assert_equal(maxima_cut, maxima)
+    assert_equal(labels_cut[dens <= 1e-3], -1)
+    assert_equal(labels_cut[dens > 1e-3], labels[dens > 1e-3])
+    assert_raises(ValueError, watershed_basins, grid, dens[:-1])
+
+
+def test_integrate_basins_two_gaussians():
+    grid, points, dens = _two_gaussians_grid()
+    labels, _ = watershed_basins(grid, dens)
+    value = integrate_basins(grid, labels, dens)
+    assert_allclose(value, np.array([1.0, 0.5]) * (np.pi / 2) ** 1.5, rtol=5e-3)
+    # basin integrals of several properties sum up to the integral over the grid
+    data = np.stack([dens, np.ones(grid.npoints)], axis=1)
+    value = integrate_basins(grid, labels, data, method="R")
+    assert value.shape == (2, 2)
+    assert_allclose(np.sum(value, axis=0), grid.integrate(data, method="R"))
+    labels_cut, _ = watershed_basins(grid, dens, cutoff=1e-3)
+    assert_allclose(integrate_basins(grid, labels_cut, dens, method="R"), value[:, 0], rtol=1e-2)
+    assert_raises(ValueError, integrate_basins, grid, labels[:-1], dens)
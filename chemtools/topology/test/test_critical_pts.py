@@ -2,7 +2,7 @@
 
 from unittest import TestCase
 
-from chemtools.topology.critical_pts import Topo, CriticalPoint
+from chemtools.topology.critical_pts import Topo, CriticalPoint, _VoxelIndex
 
 import numpy as np
 from numpy.testing import assert_allclose
@@ -50,9 +50,91 @@ class TestCriticalPoints(TestCase):
     def test_default_cube(self):
         # """Test default cube for points."""
         coors = np.array([[1, 1, 1], [-1, -1, -1]])
-        topo = Topo(coors, self.gauss_func, self.gauss_deriv, self.gauss_deriv2)
+        topo = Topo(coors, self.gauss_func, self.gauss_deriv, self.gauss_deriv2, adaptive=False)
         assert topo._kdtree.data.shape == (60 * 60 * 60, 3)
 
+    def test_adaptive_seeds(self):
+        # """Test coarse meshgrid refined around the expected critical points."""
+        coors = np.array([[1, 1, 1], [-1, -1, -1]])
+        topo = Topo(coors, self.gauss_func, self.gauss_deriv, self.gauss_deriv2)
+        seeds = topo._kdtree.data
+        assert len(seeds) < 60 * 60 * 60 / 10
+        # coarse meshgrid with step 1.0 covering the atoms with extra space
+        assert_allclose(np.min(seeds, axis=0), [-6, -6, -6])
+        assert_allclose(np.max(seeds, axis=0), [6, 6, 6])
+        coarse = np.arange(-6, 7)
+        coarse = np.stack(np.meshgrid(coarse, coarse, coarse, indexing="ij"), axis=-1)
+        assert_allclose(seeds[:13 ** 3], coarse.reshape(-1, 3))
+        # refined points spanning one coarse grid cell around the midpoint of the atoms
+        dist = np.max(np.abs(seeds), axis=1)
+        assert np.sum(dist < 0.5) >= 5 ** 3
+        assert_allclose(np.sort(dist)[:1], [0.0], atol=1e-10)
+        # refined points around the centroid of an atom triple (ring center)
+        coors = np.array([[0.0, 0.0, 0.3], [2.0, 0.0, 0.3], [1.0, 1.7, 0.3], [9.0, 9.0, 9.3]])
+        topo = Topo(coors, self.gauss_func, self.gauss_deriv, self.gauss_deriv2)
+        dist = np.linalg.norm(topo._kdtree.data - np.mean(coors[:3], axis=0), axis=1)
+        assert_allclose(np.min(dist), 0.0, atol=1e-10)
+
+    def test_add_points(self):
+        # """Test add single & bulk initial guess points."""
+        coors = np.array([[1, 1, 1], [-1, -1, -1]])
+        pts = np.random.rand(4, 3)
+        topo = Topo(coors, self.gauss_func, self.gauss_deriv, self.gauss_deriv2, pts)
+        topo.add_points(np.array([0.5, 0.5, 0.5]))
+        topo.add_points(np.random.rand(10, 3))
+        assert topo._kdtree.data.shape == (15, 3)
+        assert_allclose(topo._kdtree.data[:4], pts)
+        assert_allclose(topo._kdtree.data[4], [0.5, 0.5, 0.5])
+        # KD-tree is not rebuilt without new points, but is rebuilt after adding points
+        kdtree = topo._kdtree
+        assert topo._kdtree is kdtree
+        topo.add_points(np.random.rand(2, 3))
+        assert topo._kdtree is not kdtree
+        assert topo._kdtree.data.shape == (17, 3)
+
+    def test_newton_root_find(self):
+        # """Test Newton iterations converge only at vanishing gradient."""
+        coors = np.array([[1, 1, 1], [-1, -1, -1]])
+
+        def fun_d(coors):
+            return np.stack([-2 * coors[:, 0], np.ones(len(coors)), np.zeros(len(coors))], axis=1)
+
+        def fun_d2(coors):
+            hess = np.zeros((len(coors), 3, 3))
+            hess[:, 0, 0] = -2
+            return hess
+
+        topo = Topo(coors, None, fun_d, fun_d2, np.random.rand(4, 3), vectorized=True)
+        # gradient of f = -x**2 + y does not vanish, although the Newton step does
+        points, converged = topo._newton_root_find(np.array([[0.3, 0.2, 0.1]]))
+        assert_allclose(points, [[0.0, 0.2, 0.1]], atol=1e-12)
+        assert not converged[0]
+        # gradient of the gaussian vanishes at its center
+        topo = Topo(coors, self.gauss_func, self.gauss_deriv, self.gauss_deriv2,
+                    np.random.rand(4, 3))
+        points, converged = topo._newton_root_find(np.array([[0.1, -0.1, 0.05]]))
+        assert_allclose(points, [[0.0, 0.0, 0.0]], atol=1e-10)
+        assert converged[0]
+
+    def test_voxel_index(self):
+        # """Test finding nearby labeled points."""
+        index = _VoxelIndex(1e-3)
+        assert len(index) == 0
+        assert index.points.shape == (0, 3)
+        assert index.query(np.zeros(3), 1e-3) == []
+        index.add(np.array([0.0, 0.0, 0.0]), -1)
+        index.add(np.array([0.0, 0.0, 5e-4]), 1)
+        index.add(np.array([-9e-4, 0.0, 0.0]), 3)
+        index.add(np.array([1.0, 1.0, 1.0]), -1)
+        assert len(index) == 4
+        assert_allclose(index.points[3], [1.0, 1.0, 1.0])
+        assert_allclose(index.labels, [-1, 1, 3, -1])
+        assert sorted(index.query(np.array([0.0, 0.0, 1e-4]), 1e-3)) == [-1, 1, 3]
+        assert index.query(np.array([0.0, 0.0, 1e-3]), 1e-3) == [1]
+        assert index.query(np.array([1.0, 1.0, 1.0 - 1e-4]), 1e-3) == [-1]
+        assert index.query(np.array([0.5, 0.5, 0.5]), 1e-3) == []
+        self.assertRaises(ValueError, index.query, np.zeros(3), 1e-2)
+
     def test_construct_cage(self):
         # """Test construct cage among target points."""
         pts = Topo._construct_cage(np.array([0, 0, 0]), 1)
@@ -178,3 +260,99 @@ class TestCriticalPoints(TestCase):
         assert len(tp_ins._crit_ring) == 1
         assert len(tp_ins._crit_max) == 0
         assert len(tp_ins._crit_cage) == 0
+
+    def test_find_tetrahedral_critical_pt_vectorized(self):
+        # """Test four atom critical pts with vectorized hessian function."""
+        atoms = np.array([[1, 1, 1], [1, -1, -1], [-1, 1, -1], [-1, -1, 1]]) * 1.3
+        alf = 0.8
+
+        def fun_v(coors):
+            return sum(self.gauss_func(coors, atom, alphas=alf) for atom in atoms)
+
+        def fun_d(coors):
+            return sum(self.gauss_deriv(coors, atom, alphas=alf) for atom in atoms)
+
+        def fun_d2(coors):
+            hess = 0
+            for atom in atoms:
+                diff = coors - atom
+                value = np.exp(-alf * np.sum(diff ** 2, axis=-1))[:, None, None]
+                outer = 4 * alf ** 2 * diff[:, :, None] * diff[:, None, :]
+                hess += (outer - 2 * alf * np.eye(3)) * value
+            return hess
+
+        tp_ins = Topo(atoms, fun_v, fun_d, fun_d2, extra=1.5, vectorized=True)
+        # compare hessian with finite difference of gradient
+        pts = atoms[:2] + 0.1
+        fdiff = [(fun_d(pts + 1e-6 * vec) - fun_d(pts - 1e-6 * vec)) / 2e-6 for vec in np.eye(3)]
+        assert_allclose(tp_ins.get_hessian(pts), np.stack(fdiff, axis=1), atol=1e-8)
+        tp_ins.find_critical_pts()
+        # one bond critical point on each edge, one ring critical point on each face
+        assert len(tp_ins._crit_bond) == 6
+        assert len(tp_ins._crit_ring) == 4
+        assert len(tp_ins._crit_cage) == 1
+        assert len(tp_ins._crit_max) == 0
+        assert tp_ins._satisfy_poincare_hopf() == 1
+        # cage critical point at the center
+        assert_allclose(tp_ins._crit_cage[0].point, [0, 0, 0], atol=1e-10)
+
+    def test_find_triangle_critical_pt_parallel(self):
+        # """Test three atom ring critical pts with worker processes."""
+        atoms = np.array([[-2, -2, 0], [2, -2, 0], [0, 1, 0]])
+        alf = 1
+
+        def fun_v(coors):
+            return sum(self.gauss_func(coors, atom, alphas=alf) for atom in atoms)
+
+        def fun_d(coors):
+            return sum(self.gauss_deriv(coors, atom, alphas=alf) for atom in atoms)
+
+        def fun_d2(coors):
+            return sum(self.gauss_deriv2(coors, atom, alphas=alf) for atom in atoms)
+
+        serial = Topo(atoms, fun_v, fun_d, fun_d2, extra=1)
+        serial.find_critical_pts()
+        for n_jobs in [1, 2]:
+            tp_ins = Topo(atoms, fun_v, fun_d, fun_d2, extra=1)
+            tp_ins.find_critical_pts(n_jobs=n_jobs)
+            assert len(tp_ins._crit_bond) == 3
+            assert len(tp_ins._crit_ring) == 1
+            assert len(tp_ins._crit_max) == 0
+            assert len(tp_ins._crit_cage) == 0
+            # same critical points as serial search
+            for ct_pt, ct_type in zip(serial._found_ct, serial._found_ct_type):
+                dis = np.linalg.norm(tp_ins._found_ct - ct_pt, axis=-1)
+                assert np.sum((dis < 1e-8) & (tp_ins._found_ct_type == ct_type)) == 1
+        tp_ins = Topo(atoms, fun_v, fun_d, fun_d2, extra=1)
+        self.assertRaises(ValueError, tp_ins.find_critical_pts, n_jobs=0)
+        self.assertRaises(ValueError, tp_ins.find_critical_pts, n_jobs=1.5)
+
+    def test_trace_bond_paths(self):
+        # """Test bond paths of three atoms connect the nuclei through bond critical pts."""
+        atoms = np.array([[-2, -2, 0], [2, -2, 0], [0, 1, 0]])
+        alf = 1
+
+        def fun_v(coors):
+            return sum(self.gauss_func(coors, atom, alphas=alf) for atom in atoms)
+
+        def fun_d(coors):
+            return sum(self.gauss_deriv(coors, atom, alphas=alf) for atom in atoms)
+
+        def fun_d2(coors):
+            return sum(self.gauss_deriv2(coors, atom, alphas=alf) for atom in atoms)
+
+        tp_ins = Topo(atoms, fun_v, fun_d, fun_d2, extra=1)
+        paths, ends = tp_ins.trace_bond_paths()
+        assert paths == [] and ends.shape == (0, 2)
+        tp_ins.find_critical_pts()
+        paths, ends = tp_ins.trace_bond_paths(tol=1e-8)
+        assert len(paths) == 3
+        assert_allclose(np.sort(np.sort(ends, axis=1), axis=0), [[0, 1], [0, 2], [1, 2]])
+        for path, (i, j), bcp in zip(paths, ends, tp_ins._crit_bond):
+            assert_allclose(path[0], atoms[i])
+            assert_allclose(path[-1], atoms[j])
+            assert np.min(np.linalg.norm(path - bcp.point, axis=-1)) == 0.0
+            # density increases from the bond critical point towards both nuclei
+            index = np.argmin(np.linalg.norm(path - bcp.point, axis=-1))
+            assert np.all(np.diff(fun_v(path[index:])) > 0)
+            assert np.all(np.diff(fun_v(path[:index + 1])) < 0)
@@ -94,3 +94,15 @@ def test_ellipticity_h2o_nuclei():
         data = np.load(str(fname))
     result = EigenValueTool(data['nuc_hess_eigval']).ellipticity
     assert_almost_equal(result, data['nuc_ellipticity'], decimal=5)
+
+
+def test_eigenvalue_tool_from_hessian():
+    hessian = np.array([[2., 0., 0., 1., 0., 3.], [1., 2., 0., 1., 0., -1.],
+                        [-1., 0.5, 0.2, 3., 0.7, 0.1]])
+    matrices = np.zeros((3, 9))
+    matrices[:, [0, 1, 2, 4, 5, 8]] = hessian
+    expected = np.linalg.eigvalsh(matrices.reshape(3, 3, 3), UPLO='U')
+    tool = EigenValueTool.from_hessian(hessian, eps=1e-10)
+    assert_almost_equal(tool.eigenvalues, expected, decimal=12)
+    assert_equal(tool.index, EigenValueTool(expected).index)
+    assert_raises(ValueError, EigenValueTool.from_hessian, np.ones((3, 3)))
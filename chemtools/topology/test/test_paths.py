@@ -0,0 +1,57 @@
+"""Test gradient path tracing."""
+
+from chemtools.topology.paths import trace_gradient_paths
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_raises, assert_equal
+
+
+def test_trace_gradient_paths_quadratic():
+    # gradient paths of x^2 + 4 y^2 + z^2 follow y = y0 (x / x0)^4 & z = z0 (x / x0)
+    def grad(points):
+        return 2 * points * np.array([1.0, 4.0, 1.0])
+
+    start = np.array([[1.0, 0.5, 0.2], [-2.0, 0.3, 0.0], [0.5, -1.0, 1.0]])
+    paths, ends = trace_gradient_paths(grad, start, ascent=False, step_size=0.05, tol=1e-8,
+                                       attractors=np.zeros((1, 3)), attractor_radius=0.05)
+    assert_equal(ends, [0, 0, 0])
+    for path, point in zip(paths, start):
+        assert_allclose(path[0], point)
+        assert_allclose(path[-1], np.zeros(3))
+        # points are within the attractor radius only at the end
+        assert np.all(np.linalg.norm(path[:-2], axis=-1) >= 0.05)
+        ratio = path[:-1, 0] / point[0]
+        assert_allclose(path[:-1, 1], point[1] * ratio ** 4, atol=1e-6)
+        assert_allclose(path[:-1, 2], point[2] * ratio, atol=1e-6)
+    # ascending from the same points goes away from the minimum
+    paths, ends = trace_gradient_paths(grad, start, ascent=True, max_steps=20,
+                                       attractors=np.zeros((1, 3)))
+    assert_equal(ends, [-1, -1, -1])
+    assert np.all([len(path) <= 21 for path in paths])
+    assert np.all(np.linalg.norm(paths[0][-1]) > np.linalg.norm(start[0]))
+
+
+def test_trace_gradient_paths_gaussians():
+    # ascending gradient paths of two gaussians end at the nearest gaussian center
+    centers = np.array([[0.0, 0.0, -1.0], [0.0, 0.0, 1.0]])
+
+    def grad(points):
+        diff = points[:, None, :] - centers[None, :, :]
+        value = np.exp(-np.sum(diff ** 2, axis=-1))
+        return np.sum(-2 * diff * value[:, :, None], axis=1)
+
+    start = np.array([[0.3, 0.2, -0.5], [-0.5, 0.1, 0.8], [0.0, 0.0, 0.0], [0.2, 0.1, 0.0]])
+    paths, ends = trace_gradient_paths(grad, start, attractors=centers, max_steps=500)
+    # the midpoint is a critical point, so its path stops immediately
+    assert_equal(ends, [0, 1, -1, -1])
+    assert_allclose(paths[0][-1], centers[0])
+    assert_allclose(paths[1][-1], centers[1])
+    assert_equal(len(paths[2]), 1)
+    # the path on the symmetry plane approaches the bond critical point
+    assert_allclose(paths[3][-1], np.zeros(3), atol=1e-4)
+    # starting points at attractors are not traced
+    paths, ends = trace_gradient_paths(grad, centers, attractors=centers)
+    assert_equal(ends, [0, 1])
+    assert_equal([len(path) for path in paths], [2, 2])
+    assert_raises(ValueError, trace_gradient_paths, grad, start, step_size=0.0)
+    assert_raises(ValueError, trace_gradient_paths, grad, start, tol=-1.0)
@@ -24,5 +24,6 @@
 
 
 from chemtools.utils.cube import *
+from chemtools.utils.cache import *
 from chemtools.utils.utils import *
 from chemtools.utils.mesh import plane_mesh
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""The Property Cache Module."""
+
+
+import os
+import glob
+import hashlib
+import logging
+import tempfile
+import numpy as np
+
+
+__all__ = ['PropertyCache']
+
+
+class PropertyCache(object):
+    """On-disk cache of properties evaluated on grids, stored as memory-mapped `.npy` files.
+
+    Each cached array is addressed by a hash of the wave-function, the grid specification, the
+    name of the property and the spin orbitals used. When the total size of the cached arrays
+    exceeds the maximum size, the least recently used arrays are evicted.
+    """
+
+    def __init__(self, dirname, max_size=2**31):
+        """Initialize class.
+
+        Parameters
+        ----------
+        dirname : str
+            Path to the directory used for storing cached arrays. It is created if it does
+            not exist.
+        max_size : int, optional
+            Maximum total size (in bytes) of the cached arrays.
+        """
+        if not isinstance(max_size, (int, np.integer)) or max_size <= 0:
+            raise ValueError('Argument max_size should be a positive integer! '
+                             'Given max_size={0}'.format(max_size))
+        dirname = str(dirname)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        self._dirname = dirname
+        self._max_size = max_size
+
+    @property
+    def dirname(self):
+        """Path to the directory of cached arrays."""
+        return self._dirname
+
+    @property
+    def max_size(self):
+        """Maximum total size (in bytes) of the cached arrays."""
+        return self._max_size
+
+    @property
+    def size(self):
+        """Total size (in bytes) of the cached arrays."""
+        return sum(os.path.getsize(fname) for fname in self._files())
+
+    @staticmethod
+    def make_key(molecule, grid, name, spin='ab', index=None):
+        """Return the key of a property evaluated on a grid.
+
+        Parameters
+        ----------
+        molecule : Molecule
+            Instance of `Molecule` with a ``fingerprint`` attribute identifying its wave-function.
+        grid : UniformGrid
+            Instance of `UniformGrid` with a ``fingerprint`` attribute identifying its points.
+        name : str
+            Name of the property.
+        spin : str, optional
+            The type of occupied spin orbitals; options are 'a', 'b' & 'ab'.
+        index : int or Sequence of int, optional
+            Sequence of integers representing the index of spin orbitals.
+        """
+        spin = {'a': 'a', 'alpha': 'a', 'b': 'b', 'beta': 'b'}.get(spin, spin)
+        if index is not None:
+            index = np.ravel(index).tolist()
+        key = '{0} {1} {2} {3} {4}'.format(molecule.fingerprint, grid.fingerprint, name,
+                                           spin, index)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def load(self, key):
+        """Return the cached array as a read-only memory-map, or None if it is not cached.
+
+        Parameters
+        ----------
+        key : str
+            Key of the cached array.
+        """
+        fname = self._fname(key)
+        try:
+            value = np.load(fname, mmap_mode='r')
+        except (IOError, OSError, ValueError):
+            return None
+        # mark the array as recently used
+        os.utime(fname, None)
+        return value
+
+    def save(self, key, value):
+        """Store the array in the cache, and evict least recently used arrays if needed.
+
+        Parameters
+        ----------
+        key : str
+            Key of the cached array.
+        value : np.ndarray
+            Array to store.
+        """
+        if value.nbytes > self._max_size:
+            logging.info('Array of {0} bytes exceeds the cache size.'.format(value.nbytes))
+            return
+        # write to a temporary file first, so a cached array is never partially written
+        handle, tmpname = tempfile.mkstemp(suffix='.tmp', dir=self._dirname)
+        with os.fdopen(handle, 'wb') as f:
+            np.save(f, value)
+        os.rename(tmpname, self._fname(key))
+        self._evict()
+
+    def compute(self, molecule, grid, properties, spin='ab', index=None):
+        """Return the properties evaluated on the grid points, only computing uncached ones.
+
+        Parameters
+        ----------
+        molecule : Molecule
+            Instance of `Molecule` class.
+        grid : UniformGrid
+            Instance of `UniformGrid` class.
+        properties : sequence of str
+            Names of the properties to compute, see `Molecule.compute_properties`.
+        spin : str, optional
+            The type of occupied spin orbitals; options are 'a', 'b' & 'ab'.
+        index : int or Sequence of int, optional
+            Sequence of integers representing the index of spin orbitals.
+            If None, all occupied spin orbitals are included.
+
+        Returns
+        -------
+        values : tuple of np.ndarray
+           The arrays of the requested properties in the same order as `properties`.
+        """
+        keys = [self.make_key(molecule, grid, name, spin, index) for name in properties]
+        values = [self.load(key) for key in keys]
+        missing = [name for name, value in zip(properties, values) if value is None]
+        if missing:
+            # evaluate missing properties on blocks of grid points, without storing all points
+            computed = None
+            for start, stop, points in grid.iter_points():
+                block = molecule.compute_properties(points, missing, spin=spin, index=index)
+                if computed is None:
+                    computed = [np.empty((grid.npoints,) + item.shape[1:]) for item in block]
+                for value, item in zip(computed, block):
+                    value[start:stop] = item
+            computed = dict(zip(missing, computed))
+            for i, name in enumerate(properties):
+                if values[i] is None:
+                    values[i] = computed[name]
+                    self.save(keys[i], values[i])
+        return tuple(values)
+
+    def clear(self):
+        """Remove all cached arrays."""
+        for fname in self._files():
+            os.remove(fname)
+
+    def _fname(self, key):
+        """Return path to the file storing the cached array of the given key."""
+        return os.path.join(self._dirname, key + '.npy')
+
+    def _files(self):
+        """Return paths to the files of all cached arrays."""
+        return glob.glob(os.path.join(self._dirname, '*.npy'))
+
+    def _evict(self):
+        """Remove least recently used arrays until the total size does not exceed max size."""
+        files = [(os.path.getmtime(fname), os.path.getsize(fname), fname)
+                 for fname in self._files()]
+        total = sum(size for _, size, _ in files)
+        for _, size, fname in sorted(files):
+            if total <= self._max_size:
+                break
+            os.remove(fname)
+            total -= size
@@ -23,6 +23,7 @@
 """The Cube Module."""
 
 
+import hashlib
 import logging
 import numpy as np
 
@@ -71,24 +72,9 @@ class UniformGrid(object):
         if shape.shape[0] != 3:
             raise ValueError('Argument shape should be an np.ndarray with shape=(3,)')
         self._shape = shape
-        #
-        # Make cubic grid
-        #
-        # Number of points along x, y and z axis
-        npoints_x, npoints_y, npoints_z = self._shape
-        # Total number of grid points
-        self._npoints = npoints_x * npoints_y * npoints_z
-        # Make an array to store coordinates of grid points
-        self._points = np.zeros((self._npoints, 3))
-        coords = np.array(
-            np.meshgrid(np.arange(npoints_x), np.arange(npoints_y), np.arange(npoints_z))
-        )
-        coords = np.swapaxes(coords, 1, 2)
-        coords = coords.reshape(3, -1)
-        coords = coords.T
-        self._points = coords.dot(self._axes)
-        # Compute coordinates of grid points relative to the origin
-        self._points += self._origin
+        # Total number of grid points; the coordinates of grid points are not stored, but
+        # computed on demand from the origin, axes & shape, see `get_points` & `iter_points`.
+        self._npoints = int(np.prod(self._shape))
 
         # log information
         self._log_init()
@@ -166,6 +152,49 @@ class UniformGrid(object):
 
         return cls(numbers, pseudo_numbers, coordinates, origin, axes, shape)
 
+    @classmethod
+    def read_cube(cls, fname):
+        r"""Initialize ``UniformGrid`` class and load data values from a cube file.
+
+        Parameters
+        ----------
+        fname : str
+            Cube file name with \*.cube extension, or binary cube file name with \*.bcube
+            extension written by `generate_binary_cube`.
+
+        Returns
+        -------
+        grid : UniformGrid
+            Instance of `UniformGrid` with the grid specifications of the cube file.
+        data : np.ndarray, shape=(npoints,) or (npoints, m)
+            Data values on the grid points. When the cube file contains `m` values per grid
+            point, e.g. cube files of several orbitals, it has shape (npoints, m). The data
+            of a binary cube file is returned as a read-only memory-map.
+        """
+        fname = str(fname)
+        if fname.endswith('.cube'):
+            with open(fname, 'rb') as f:
+                specs = cls._parse_cube_header(f)
+                size = int(np.prod(specs[5])) * specs[6]
+                # parse all data values at once
+                data = np.fromfile(f, dtype=float, count=size, sep=' ')
+        elif fname.endswith('.bcube'):
+            with open(fname, 'rb') as f:
+                dtype, size = cls._read_binary_cube_line(f, fname)
+                specs = cls._parse_cube_header(f)
+                offset = f.tell()
+            data = np.memmap(fname, dtype=dtype, mode='r', offset=offset, shape=(size,))
+        else:
+            raise ValueError('Argument fname should be a cube file with *.cube or *.bcube '
+                             'extension!')
+        npoints = int(np.prod(specs[5]))
+        if data.size != npoints * specs[6]:
+            raise ValueError('File {0} contains {1} values, expected {2}!'.format(
+                fname, data.size, npoints * specs[6]))
+        if specs[6] > 1:
+            data = data.reshape(npoints, specs[6])
+        return cls(*specs[:6]), data
+
     @classmethod
     def from_file(cls, fname, spacing=0.2, extension=5.0, rotate=True):
         """
@@ -242,8 +271,83 @@ class UniformGrid(object):
 
     @property
     def points(self):
-        """Cartesian coordinates of the cubic grid points."""
-        return self._points
+        """Cartesian coordinates of the cubic grid points.
+
+        The coordinates of all grid points are computed each time this attribute is accessed;
+        use `iter_points` to loop over blocks of grid points without storing all of them.
+        """
+        return self.get_points()
+
+    @property
+    def fingerprint(self):
+        """Hash of the grid specification, i.e. origin, axes & shape of the cube."""
+        sha = hashlib.sha1()
+        sha.update(np.asarray(self._origin, dtype=float).tobytes())
+        sha.update(np.asarray(self._axes, dtype=float).tobytes())
+        sha.update(np.asarray(self._shape, dtype=np.int64).tobytes())
+        return sha.hexdigest()
+
+    def get_points(self, start=0, stop=None):
+        """Return Cartesian coordinates of a range of cubic grid points.
+
+        Grid points are ordered with `x` being the outer loop, `y` the middle loop and `z`
+        the inner loop, matching the order of data in cube files.
+
+        Parameters
+        ----------
+        start : int, optional
+            Index of the first grid point.
+        stop : int, optional
+            Index after the last grid point. If None, the total number of grid points is used.
+
+        Returns
+        -------
+        points : np.ndarray, shape=(stop - start, 3)
+            Cartesian coordinates of grid points with index in [start, stop).
+        """
+        if stop is None:
+            stop = self._npoints
+        if not 0 <= start <= stop <= self._npoints:
+            raise ValueError('Arguments start & stop should satisfy 0 <= start <= stop <= {0}! '
+                             'Given start={1}, stop={2}'.format(self._npoints, start, stop))
+        # convert the flat indices of grid points to indices along x, y & z axes
+        indices = np.unravel_index(np.arange(start, stop), tuple(self._shape))
+        points = np.outer(indices[0], self._axes[0])
+        points += np.outer(indices[1], self._axes[1])
+        points += np.outer(indices[2], self._axes[2])
+        points += self._origin
+        return points
+
+    def iter_points(self, chunk_size=None):
+        """Return an iterator over blocks of cubic grid points.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of grid points in each block. If None, each block is a slab of grid points
+            with the same index along `x` axis, i.e. has ``shape[1] * shape[2]`` points.
+
+        Yields
+        ------
+        start : int
+            Index of the first grid point in the block.
+        stop : int
+            Index after the last grid point in the block.
+        points : np.ndarray, shape=(stop - start, 3)
+            Cartesian coordinates of grid points in the block.
+        """
+        if chunk_size is None:
+            chunk_size = max(int(self._shape[1] * self._shape[2]), 1)
+        if not isinstance(chunk_size, (int, np.integer)) or chunk_size <= 0:
+            raise ValueError('Argument chunk_size should be a positive integer! '
+                             'Given chunk_size={0}'.format(chunk_size))
+
+        def iterate():
+            """Yield the range & coordinates of each block of grid points."""
+            for start in range(0, self._npoints, chunk_size):
+                stop = min(start + chunk_size, self._npoints)
+                yield start, stop, self.get_points(start, stop)
+        return iterate()
 
     def _log_init(self):
         """Log an overview of the cube's properties."""
@@ -255,41 +359,203 @@ class UniformGrid(object):
         logging.info("Axes 3 : {0}".format(self._axes[2]))
         logging.info("Shape  : {0}".format(self._shape))
 
-    def generate_cube(self, fname, data):
+    def generate_cube(self, fname, data, chunk_size=None):
         r"""Write the data evaluated on grid points into a cube file.
 
         Parameters
         ----------
         fname : str
             Cube file name with \*.cube extension.
-        data : np.ndarray, shape=(npoints,)
-            An array containing the evaluated scalar property on the grid points.
+        data : np.ndarray, shape=(npoints,) or callable
+            An array containing the evaluated scalar property on the grid points, or a function
+            evaluating the scalar property on an array of points with shape (n, 3), e.g.
+            `Molecule.compute_density`. A function is evaluated on one block of grid points at
+            a time, and each block of values is written to the cube file once it is computed,
+            so the values on all grid points are never stored in memory.
+        chunk_size : int, optional
+            Number of grid points in each block when data is a function. If None, each block is
+            a slab of grid points with the same index along `x` axis, see `iter_points`.
         """
         if not fname.endswith('.cube'):
             raise ValueError('Argument fname should be a cube file with `*.cube` extension!')
-        if data.size != self._npoints:
-            raise ValueError('Argument data should have the same size as the grid. ' +
-                             '{0}!={1}'.format(data.size, self._npoints))
+        blocks = self._iter_data_blocks(data, chunk_size)
 
         # Write data into the cube file
         with open(fname, 'w') as f:
             # writing the cube header:
-            f.write('Cubefile created with HORTON CHEMTOOLS\n')
-            f.write('OUTER LOOP: X, MIDDLE LOOP: Y, INNER LOOP: Z\n')
-            natom = len(self._numbers)
-            x, y, z = self._origin
-            f.write('{0:5d} {1:11.6f} {2:11.6f} {3:11.6f}\n'.format(natom, x, y, z))
-            rvecs = self._axes
-            for i, (x, y, z) in zip(self._shape, rvecs):
-                f.write('{0:5d} {1:11.6f} {2:11.6f} {3:11.6f}\n'.format(i, x, y, z))
-            for i, q, (x, y, z) in zip(self._numbers, self._pseudo_numbers, self._coordinates):
-                f.write('{0:5d} {1:11.6f} {2:11.6f} {3:11.6f} {4:11.6f}\n'.format(i, q, x, y, z))
-            # writing the cube data:
-            num_chunks = 6
-            for i in range(0, data.size, num_chunks):
-                row_data = data.flat[i:i+num_chunks]
-                f.write((row_data.size*' {:12.5E}').format(*row_data))
-                f.write('\n')
+            f.write(self._cube_header())
+            # writing the cube data; values of incomplete lines are carried to the next block
+            remainder = np.zeros(0)
+            for block in blocks:
+                if remainder.size != 0:
+                    block = np.concatenate((remainder, block))
+                remainder = self._write_cube_data(f, block, complete=False)
+            self._write_cube_data(f, remainder)
+
+    def generate_binary_cube(self, fname, data, dtype=np.float64, chunk_size=None):
+        r"""Write the data evaluated on grid points into a binary cube file.
+
+        The binary cube file contains a line specifying the data type and number of values,
+        followed by the header of the cube file and the raw data values. Writing it has almost
+        no formatting cost, and it can be converted to a cube file with `convert_binary_cube`.
+
+        Parameters
+        ----------
+        fname : str
+            Binary cube file name with \*.bcube extension.
+        data : np.ndarray, shape=(npoints,) or callable
+            An array containing the evaluated scalar property on the grid points, or a function
+            evaluating the scalar property on an array of points with shape (n, 3) which is
+            evaluated & written one block of grid points at a time, see `generate_cube`.
+        dtype : np.float32 or np.float64, optional
+            Floating-point type used for storing the data values.
+        chunk_size : int, optional
+            Number of grid points in each block when data is a function. If None, each block is
+            a slab of grid points with the same index along `x` axis, see `iter_points`.
+        """
+        if not fname.endswith('.bcube'):
+            raise ValueError('Argument fname should be a binary cube file with `*.bcube` '
+                             'extension!')
+        dtype = np.dtype(dtype)
+        if dtype not in [np.dtype(np.float32), np.dtype(np.float64)]:
+            raise ValueError('Argument dtype should be either np.float32 or np.float64! '
+                             'Given dtype={0}'.format(dtype))
+        # store data values in little-endian byte order
+        dtype = dtype.newbyteorder('<')
+        blocks = self._iter_data_blocks(data, chunk_size)
+
+        with open(fname, 'wb') as f:
+            f.write('CHEMTOOLS BINARY CUBE {0} {1}\n'.format(dtype.str, self._npoints).encode())
+            f.write(self._cube_header().encode())
+            for block in blocks:
+                block.astype(dtype, copy=False).tofile(f)
+
+    def _iter_data_blocks(self, data, chunk_size=None):
+        """Return an iterator over blocks of data values on consecutive grid points.
+
+        Parameters
+        ----------
+        data : np.ndarray, shape=(npoints,) or callable
+            An array of data values on the grid points, or a function evaluating the data values
+            on an array of points with shape (n, 3).
+        chunk_size : int, optional
+            Number of grid points in each block when data is a function.
+        """
+        if not callable(data):
+            if data.size != self._npoints:
+                raise ValueError('Argument data should have the same size as the grid. '
+                                 '{0}!={1}'.format(data.size, self._npoints))
+            return iter([np.ravel(data)])
+        # check chunk_size before the file is written
+        points = self.iter_points(chunk_size)
+
+        def evaluate():
+            """Evaluate the data values on each block of grid points."""
+            for start, stop, block in points:
+                values = np.ravel(data(block))
+                if values.size != stop - start:
+                    raise ValueError('Function data should return one value per point! '
+                                     '{0}!={1}'.format(values.size, stop - start))
+                yield values
+        return evaluate()
+
+    @staticmethod
+    def convert_binary_cube(fname_binary, fname):
+        r"""Convert a binary cube file into a cube file.
+
+        Parameters
+        ----------
+        fname_binary : str
+            Binary cube file name with \*.bcube extension, written by `generate_binary_cube`.
+        fname : str
+            Cube file name with \*.cube extension.
+        """
+        if not fname_binary.endswith('.bcube'):
+            raise ValueError('Argument fname_binary should be a binary cube file with '
+                             '`*.bcube` extension!')
+        if not fname.endswith('.cube'):
+            raise ValueError('Argument fname should be a cube file with `*.cube` extension!')
+
+        with open(fname_binary, 'rb') as f:
+            dtype, size = UniformGrid._read_binary_cube_line(f, fname_binary)
+            # the header has 6 lines plus one line per atom
+            header = [f.readline().decode() for _ in range(3)]
+            natom = int(header[2].split()[0])
+            header += [f.readline().decode() for _ in range(3 + natom)]
+            data = np.fromfile(f, dtype=dtype, count=size)
+        if data.size != size:
+            raise ValueError('File {0} contains {1} values, expected {2}!'.format(
+                fname_binary, data.size, size))
+
+        with open(fname, 'w') as f:
+            f.write(''.join(header))
+            UniformGrid._write_cube_data(f, data)
+
+    @staticmethod
+    def _read_binary_cube_line(f, fname):
+        """Return data type & number of values from the first line of an open binary cube file."""
+        words = f.readline().decode('latin-1').split()
+        if words[:3] != ['CHEMTOOLS', 'BINARY', 'CUBE'] or len(words) != 5:
+            raise ValueError('File {0} is not a binary cube file!'.format(fname))
+        return np.dtype(words[3]), int(words[4])
+
+    def _cube_header(self):
+        """Return the header of the cube file, i.e. the grid and molecule specifications."""
+        header = 'Cubefile created with HORTON CHEMTOOLS\n'
+        header += 'OUTER LOOP: X, MIDDLE LOOP: Y, INNER LOOP: Z\n'
+        natom = len(self._numbers)
+        x, y, z = self._origin
+        header += '{0:5d} {1:11.6f} {2:11.6f} {3:11.6f}\n'.format(natom, x, y, z)
+        rvecs = self._axes
+        for i, (x, y, z) in zip(self._shape, rvecs):
+            header += '{0:5d} {1:11.6f} {2:11.6f} {3:11.6f}\n'.format(i, x, y, z)
+        for i, q, (x, y, z) in zip(self._numbers, self._pseudo_numbers, self._coordinates):
+            header += '{0:5d} {1:11.6f} {2:11.6f} {3:11.6f} {4:11.6f}\n'.format(i, q, x, y, z)
+        return header
+
+    @staticmethod
+    def _write_cube_data(f, data, nrows=8192, complete=True):
+        """Write the data values into an open cube file, six values per line.
+
+        Values are formatted in blocks of `nrows` lines with a single string formatting call,
+        instead of formatting each line separately.
+
+        Parameters
+        ----------
+        f : file
+            Cube file opened for writing text.
+        data : np.ndarray, shape=(npoints,)
+            An array containing the data values.
+        nrows : int, optional
+            Number of lines formatted at once.
+        complete : bool, optional
+            If False, values of the last incomplete line are not written but returned, so they
+            can be written with the values of the next block.
+
+        Returns
+        -------
+        remainder : np.ndarray
+            Values of the last incomplete line which are not written; empty if complete=True.
+        """
+        num_chunks = 6
+        block_size = num_chunks * nrows
+        block_fmt = (num_chunks * ' %12.5E' + '\n') * nrows
+        # number of values in complete lines
+        nfull = (data.size // num_chunks) * num_chunks
+        for start in range(0, nfull, block_size):
+            block = data[start:min(start + block_size, nfull)]
+            if block.size == block_size:
+                f.write(block_fmt % tuple(block.tolist()))
+            else:
+                fmt = (num_chunks * ' %12.5E' + '\n') * (block.size // num_chunks)
+                f.write(fmt % tuple(block.tolist()))
+        if not complete:
+            return data[nfull:]
+        # write the last incomplete line
+        if nfull < data.size:
+            block = data[nfull:]
+            f.write((block.size * ' %12.5E' + '\n') % tuple(block.tolist()))
+        return data[:0]
 
     def weights(self, method='R'):
         """
@@ -358,47 +624,81 @@ class UniformGrid(object):
         fname : str
             Cube file name with *.cube extension.
         """
-        with open(fname) as f:
-            # skip the title
-            f.readline()
-            # skip the second line
-            f.readline()
-
-            def read_grid_line(line):
-                """Read a number and (x, y, z) coordinate from the cube file line."""
-                words = line.split()
-                return (
-                    int(words[0]),
-                    np.array([float(words[1]), float(words[2]), float(words[3])], float)
-                    # all coordinates in a cube file are in atomic units
-                )
-
-            # number of atoms and origin of the grid
-            natom, origin = read_grid_line(f.readline())
-            # numer of grid points in A direction and step vector A, and so on
-            shape0, axis0 = read_grid_line(f.readline())
-            shape1, axis1 = read_grid_line(f.readline())
-            shape2, axis2 = read_grid_line(f.readline())
-            shape = np.array([shape0, shape1, shape2], int)
-            axes = np.array([axis0, axis1, axis2])
-
-            def read_coordinate_line(line):
-                """Read atomic number and (x, y, z) coordinate from the cube file line."""
-                words = line.split()
-                return (
-                    int(words[0]), float(words[1]),
-                    np.array([float(words[2]), float(words[3]), float(words[4])], float)
-                    # all coordinates in a cube file are in atomic units
-                )
-
-            numbers = np.zeros(natom, int)
-            pseudo_numbers = np.zeros(natom, float)
-            coordinates = np.zeros((natom, 3), float)
-            for i in xrange(natom):
-                numbers[i], pseudo_numbers[i], coordinates[i] = read_coordinate_line(f.readline())
-                # If the pseudo_number field is zero, we assume that no effective core
-                # potentials were used.
-                if pseudo_numbers[i] == 0.0:
-                    pseudo_numbers[i] = numbers[i]
-
+        with open(fname, 'rb') as f:
+            numbers, pseudo_numbers, coordinates, origin, axes, shape, _ = \
+                UniformGrid._parse_cube_header(f)
         return numbers, pseudo_numbers, coordinates, origin, axes, shape
+
+    @staticmethod
+    def _parse_cube_header(f):
+        """
+        Return specifications of the cubic grid from the header of an open cube file.
+
+        After reading the header, the file is positioned at the beginning of the data values.
+
+        Parameters
+        ----------
+        f : file
+            Cube file opened for reading, positioned at the beginning of the header.
+
+        Returns
+        -------
+        numbers, pseudo_numbers, coordinates, origin, axes, shape
+            Specifications of the molecule & cubic grid, see `UniformGrid`.
+        nvalue : int
+            Number of data values per grid point, e.g. the number of orbitals in a cube file
+            with a negative number of atoms.
+        """
+        # skip the title
+        f.readline()
+        # skip the second line
+        f.readline()
+
+        def read_grid_line(line):
+            """Read a number and (x, y, z) coordinate from the cube file line."""
+            words = line.split()
+            return (
+                int(words[0]),
+                np.array([float(words[1]), float(words[2]), float(words[3])], float)
+                # all coordinates in a cube file are in atomic units
+            )
+
+        # number of atoms and origin of the grid
+        natom, origin = read_grid_line(f.readline())
+        # numer of grid points in A direction and step vector A, and so on
+        shape0, axis0 = read_grid_line(f.readline())
+        shape1, axis1 = read_grid_line(f.readline())
+        shape2, axis2 = read_grid_line(f.readline())
+        shape = np.array([shape0, shape1, shape2], int)
+        axes = np.array([axis0, axis1, axis2])
+
+        def read_coordinate_line(line):
+            """Read atomic number and (x, y, z) coordinate from the cube file line."""
+            words = line.split()
+            return (
+                int(words[0]), float(words[1]),
+                np.array([float(words[2]), float(words[3]), float(words[4])], float)
+                # all coordinates in a cube file are in atomic units
+            )
+
+        numbers = np.zeros(abs(natom), int)
+        pseudo_numbers = np.zeros(abs(natom), float)
+        coordinates = np.zeros((abs(natom), 3), float)
+        for i in range(abs(natom)):
+            numbers[i], pseudo_numbers[i], coordinates[i] = read_coordinate_line(f.readline())
+            # If the pseudo_number field is zero, we assume that no effective core
+            # potentials were used.
+            if pseudo_numbers[i] == 0.0:
+                pseudo_numbers[i] = numbers[i]
+
+        # A negative number of atoms means the header has an extra line listing the number
+        # of data values per grid point (e.g. orbitals) followed by their identifiers.
+        nvalue = 1
+        if natom < 0:
+            words = f.readline().split()
+            nvalue = int(words[0])
+            # identifiers may continue on the following lines
+            while len(words) < nvalue + 1:
+                words += f.readline().split()
+
+        return numbers, pseudo_numbers, coordinates, origin, axes, shape, nvalue
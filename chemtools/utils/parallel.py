@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""The Parallel Evaluation Module.
+
+Tasks are evaluated by a pool of forked worker processes. The workers inherit the task function
+(and the data it refers to) from the parent process, so they are never pickled, and only the
+arguments and results of each task are sent between processes.
+"""
+
+
+import os
+import multiprocessing
+
+import numpy as np
+
+
+__all__ = ["check_n_jobs", "shared_array", "map_forked"]
+
+
+# task function inherited by the forked worker processes of `map_forked`
+_TASK = None
+
+
+def _call_task(arg):
+    """Call the task function inherited from the parent process on the given argument."""
+    return _TASK(arg)
+
+
+def _has_fork():
+    """Return True if worker processes can be started by forking the current process."""
+    if hasattr(multiprocessing, "get_all_start_methods"):
+        return "fork" in multiprocessing.get_all_start_methods()
+    return hasattr(os, "fork")
+
+
+def check_n_jobs(n_jobs):
+    """Return the number of worker processes after checking it.
+
+    Parameters
+    ----------
+    n_jobs : int
+        Number of worker processes. If -1, all available CPUs are used.
+
+    Returns
+    -------
+    n_jobs : int
+        Number of worker processes.
+
+    Raises
+    ------
+    ValueError
+        If `n_jobs` is not a positive integer or -1.
+        If more than one worker process is requested on a platform without the fork start
+        method (e.g. Windows).
+    """
+    if n_jobs == -1:
+        n_jobs = multiprocessing.cpu_count()
+    if not isinstance(n_jobs, (int, np.integer)) or n_jobs <= 0:
+        raise ValueError("Argument n_jobs should be a positive integer or -1! "
+                         "Given n_jobs={0}".format(n_jobs))
+    if n_jobs != 1 and not _has_fork():
+        raise ValueError("Argument n_jobs={0} requires forking worker processes, which is not "
+                         "supported on this platform. Use n_jobs=1 or None.".format(n_jobs))
+    return n_jobs
+
+
+def shared_array(shape):
+    """Return an array of zeros in shared memory which forked worker processes can write into.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the array of floats.
+    """
+    size = int(np.prod(shape))
+    return np.frombuffer(multiprocessing.RawArray("d", size), dtype=float).reshape(shape)
+
+
+def map_forked(func, args, n_jobs):
+    """Return the results of a function applied to each argument by forked worker processes.
+
+    Parameters
+    ----------
+    func : callable
+        Function called as ``func(arg)`` for each argument. It is inherited by the workers, so
+        it does not need to be picklable, while the arguments and results are pickled.
+    args : sequence
+        Arguments of the function.
+    n_jobs : int
+        Number of worker processes. If -1, all available CPUs are used. If 1 (or there is only
+        one argument), the function is applied in this process.
+
+    Returns
+    -------
+    results : list
+        Results of the function in the same order as the arguments.
+    """
+    global _TASK
+    n_jobs = min(check_n_jobs(n_jobs), len(args))
+    if n_jobs <= 1:
+        return [func(arg) for arg in args]
+    if hasattr(multiprocessing, "get_context"):
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing
+    _TASK = func
+    pool = context.Pool(n_jobs)
+    try:
+        return pool.map(_call_task, args)
+    finally:
+        pool.close()
+        pool.join()
+        _TASK = None
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.utils.cache."""
+
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+from numpy.testing import assert_raises, assert_almost_equal
+
+from chemtools.wrappers.molecule import Molecule
+from chemtools.utils.cube import UniformGrid
+from chemtools.utils.cache import PropertyCache
+try:
+    from importlib_resources import path
+except ImportError:
+    from importlib.resources import path
+
+
+@contextmanager
+def tmpdir(name):
+    """Create temporary directory that gets deleted after accessing it."""
+    dn = tempfile.mkdtemp(name)
+    try:
+        yield dn
+    finally:
+        shutil.rmtree(dn)
+
+
+def test_property_cache_raises():
+    with tmpdir('chemtools.utils.test.test_cache.test_property_cache_raises') as dn:
+        assert_raises(ValueError, PropertyCache, dn, max_size=0)
+        assert_raises(ValueError, PropertyCache, dn, max_size=-10)
+        assert_raises(ValueError, PropertyCache, dn, max_size=10.5)
+
+
+def test_property_cache_load_save_evict():
+    with tmpdir('chemtools.utils.test.test_cache.test_property_cache_load_save_evict') as dn:
+        cache = PropertyCache(os.path.join(dn, 'cache'), max_size=3 * 800 + 3 * 128)
+        assert os.path.isdir(cache.dirname)
+        assert cache.load('a') is None
+        # store arrays of 800 bytes (plus .npy header)
+        for key in ['a', 'b', 'c']:
+            cache.save(key, np.arange(100, dtype=float))
+            os.utime(cache._fname(key), (0, len(cache._files())))
+        assert cache.size <= cache.max_size
+        # load array as read-only memory-map
+        value = cache.load('a')
+        assert isinstance(value, np.memmap)
+        assert not value.flags.writeable
+        assert_almost_equal(value, np.arange(100))
+        # least recently used array (b) is evicted
+        cache.save('d', np.ones(100))
+        assert cache.load('b') is None
+        assert_almost_equal(cache.load('a'), np.arange(100))
+        assert_almost_equal(cache.load('c'), np.arange(100))
+        assert_almost_equal(cache.load('d'), np.ones(100))
+        # arrays larger than the cache are not stored
+        cache.save('e', np.ones(1000))
+        assert cache.load('e') is None
+        cache.clear()
+        assert cache.size == 0
+
+
+def test_property_cache_compute_h2o_dimer():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as fname:
+        mol = Molecule.from_file(str(fname))
+    grid = UniformGrid.from_molecule(mol, spacing=1.0, extension=1.0)
+    expected = mol.compute_properties(grid.points, ['density', 'gradient', 'ked'], spin='a')
+    with tmpdir('chemtools.utils.test.test_cache.test_property_cache_compute_h2o_dimer') as dn:
+        cache = PropertyCache(dn)
+        # keys depend on wave-function, grid, property & spin
+        key = cache.make_key(mol, grid, 'density', 'a')
+        assert key == cache.make_key(mol, grid, 'density', 'alpha')
+        assert key != cache.make_key(mol, grid, 'density', 'b')
+        assert key != cache.make_key(mol, grid, 'gradient', 'a')
+        assert key != cache.make_key(mol, grid, 'density', 'a', [1, 2])
+        grid2 = UniformGrid.from_molecule(mol, spacing=0.9, extension=1.0)
+        assert key != cache.make_key(mol, grid2, 'density', 'a')
+        # compute & store properties
+        result = cache.compute(mol, grid, ['density', 'gradient'], spin='a')
+        assert len(cache._files()) == 2
+        assert_almost_equal(result[0], expected[0], decimal=10)
+        assert_almost_equal(result[1], expected[1], decimal=10)
+        # load stored properties & compute missing ones
+        result = cache.compute(mol, grid, ['ked', 'gradient', 'density'], spin='alpha')
+        assert len(cache._files()) == 3
+        assert isinstance(result[1], np.memmap)
+        assert isinstance(result[2], np.memmap)
+        assert_almost_equal(result[0], expected[2], decimal=10)
+        assert_almost_equal(result[1], expected[1], decimal=10)
+        assert_almost_equal(result[2], expected[0], decimal=10)
@@ -23,6 +23,7 @@
 """Test chemtools.utils.cube."""
 
 
+import os
 import shutil
 import tempfile
 from contextlib import contextmanager
@@ -177,3 +178,125 @@ def test_uniformgrid_points_h2o():
                          [ 1.59848155e-01, -2.00000000e+00, -1.99360191e+00],
                          [ 1.59848155e-01, -4.99999997e-09, -1.99360191e+00]])
     assert_allclose(cube.points, expected, rtol=1.e-7, atol=1.e-7)
+
+
+def test_uniformgrid_iter_points_h2o():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as fpath:
+        cube = UniformGrid.from_file(fpath, spacing=0.5, extension=1.0, rotate=True)
+    # coordinates of all grid points with x outer, y middle & z inner loop
+    i, j, k = np.meshgrid(*[np.arange(n) for n in cube.shape], indexing='ij')
+    expected = np.array([i.ravel(), j.ravel(), k.ravel()]).T.dot(cube.axes) + cube.origin
+    assert_allclose(cube.points, expected, rtol=1.e-10, atol=1.e-10)
+    assert_allclose(cube.get_points(5, 17), expected[5:17], rtol=1.e-10, atol=1.e-10)
+    assert cube.get_points(3, 3).shape == (0, 3)
+    # default blocks are slabs of grid points
+    blocks = list(cube.iter_points())
+    assert len(blocks) == cube.shape[0]
+    for start, stop, points in blocks:
+        assert stop - start == cube.shape[1] * cube.shape[2]
+        assert_allclose(points, expected[start:stop], rtol=1.e-10, atol=1.e-10)
+    # blocks of given size
+    blocks = list(cube.iter_points(chunk_size=100))
+    assert blocks[0][:2] == (0, 100)
+    assert blocks[-1][1] == cube.npoints
+    points = np.concatenate([block[2] for block in blocks])
+    assert_allclose(points, expected, rtol=1.e-10, atol=1.e-10)
+    # check ValueError
+    assert_raises(ValueError, cube.get_points, -1, 10)
+    assert_raises(ValueError, cube.get_points, 10, 5)
+    assert_raises(ValueError, cube.get_points, 0, cube.npoints + 1)
+    assert_raises(ValueError, cube.iter_points, chunk_size=0)
+    assert_raises(ValueError, cube.iter_points, chunk_size=2.5)
+
+
+def test_uniformgrid_binary_cube_h2o_dimer():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g-dens.cube') as file_path:
+        cube = UniformGrid.from_cube(file_path)
+        mol = Molecule.from_file(str(file_path))
+    data = mol.cube_data.ravel()
+    with tmpdir('chemtools.test.test_base.test_uniformgrid_binary_cube_h2o_dimer') as dn:
+        fname = '%s/%s' % (dn, 'h2o_dimer_pbe_sto3g-dens.cube')
+        cube.generate_cube(fname, data)
+        with open(fname) as f:
+            expected = f.read()
+        # cube file converted from binary cube file of double precision data is identical
+        fname_binary = '%s/%s' % (dn, 'h2o_dimer_pbe_sto3g-dens.bcube')
+        cube.generate_binary_cube(fname_binary, data)
+        assert os.path.getsize(fname_binary) < os.path.getsize(fname)
+        fname_converted = '%s/%s' % (dn, 'h2o_dimer_pbe_sto3g-dens-converted.cube')
+        UniformGrid.convert_binary_cube(fname_binary, fname_converted)
+        with open(fname_converted) as f:
+            assert f.read() == expected
+        # single precision data
+        cube.generate_binary_cube(fname_binary, data, dtype=np.float32)
+        UniformGrid.convert_binary_cube(fname_binary, fname_converted)
+        mol2 = Molecule.from_file(fname_converted)
+        np.testing.assert_allclose(mol2.cube_data.ravel(), data, rtol=1.e-5)
+        np.testing.assert_equal(mol.numbers, mol2.numbers)
+        # check ValueError
+        assert_raises(ValueError, cube.generate_binary_cube, '%s/test.cube' % dn, data)
+        assert_raises(ValueError, cube.generate_binary_cube, fname_binary, data[:10])
+        assert_raises(ValueError, cube.generate_binary_cube, fname_binary, data, np.int32)
+        assert_raises(ValueError, UniformGrid.convert_binary_cube, fname, fname_converted)
+        assert_raises(ValueError, UniformGrid.convert_binary_cube, fname_binary, fname + '.txt')
+        fname_wrong = '%s/%s' % (dn, 'wrong.bcube')
+        shutil.copyfile(fname, fname_wrong)
+        assert_raises(ValueError, UniformGrid.convert_binary_cube, fname_wrong, fname_converted)
+
+
+def test_uniformgrid_read_cube_h2o_dimer():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g-dens.cube') as file_path:
+        cube, data = UniformGrid.read_cube(file_path)
+        expected = UniformGrid.from_cube(file_path)
+        mol = Molecule.from_file(str(file_path))
+    # check grid & data values
+    assert cube.fingerprint == expected.fingerprint
+    np.testing.assert_equal(cube.numbers, expected.numbers)
+    np.testing.assert_allclose(cube.coordinates, expected.coordinates)
+    assert data.shape == (cube.npoints,)
+    np.testing.assert_allclose(data, mol.cube_data.ravel(), rtol=1.e-10)
+    with tmpdir('chemtools.test.test_base.test_uniformgrid_read_cube_h2o_dimer') as dn:
+        # read binary cube file as memory-map
+        fname = '%s/%s' % (dn, 'h2o_dimer_pbe_sto3g-dens.bcube')
+        cube.generate_binary_cube(fname, data)
+        cube2, data2 = UniformGrid.read_cube(fname)
+        assert cube2.fingerprint == cube.fingerprint
+        assert isinstance(data2, np.memmap)
+        np.testing.assert_equal(data2, data)
+        del data2
+        # check ValueError
+        assert_raises(ValueError, UniformGrid.read_cube, '%s/test.wrong_end' % dn)
+        fname = '%s/%s' % (dn, 'h2o_dimer_pbe_sto3g-dens.cube')
+        cube.generate_cube(fname, data)
+        with open(fname) as f:
+            lines = f.readlines()
+        with open(fname, 'w') as f:
+            f.writelines(lines[:-1])
+        assert_raises(ValueError, UniformGrid.read_cube, fname)
+
+
+def test_uniformgrid_generate_cube_function_h2o_dimer():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as fpath:
+        mol = Molecule.from_file(str(fpath))
+    cube = UniformGrid.from_molecule(mol, spacing=0.5, extension=1.0)
+    with tmpdir('chemtools.test.test_base.test_uniformgrid_generate_cube_function') as dn:
+        fname = '%s/%s' % (dn, 'h2o_dimer_pbe_sto3g-dens.cube')
+        cube.generate_cube(fname, mol.compute_density(cube.points))
+        with open(fname) as f:
+            expected = f.read()
+        # evaluate density & write cube file one block of points at a time
+        for chunk_size in [None, 1, 6, 7, 10 * cube.npoints]:
+            fname = '%s/%s' % (dn, 'h2o_dimer_pbe_sto3g-dens-stream.cube')
+            cube.generate_cube(fname, mol.compute_density, chunk_size=chunk_size)
+            with open(fname) as f:
+                assert f.read() == expected
+            fname = '%s/%s' % (dn, 'h2o_dimer_pbe_sto3g-dens-stream.bcube')
+            cube.generate_binary_cube(fname, mol.compute_density, chunk_size=chunk_size)
+            UniformGrid.convert_binary_cube(fname, fname[:-6] + '.cube')
+            with open(fname[:-6] + '.cube') as f:
+                assert f.read() == expected
+        # check ValueError
+        fname = '%s/%s' % (dn, 'test.cube')
+        assert_raises(ValueError, cube.generate_cube, fname, mol.compute_density, 0)
+        assert not os.path.exists(fname)
+        assert_raises(ValueError, cube.generate_cube, fname, mol.compute_gradient)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.utils.parallel."""
+
+
+import numpy as np
+from numpy.testing import assert_raises, assert_equal
+
+from chemtools.utils import parallel
+
+
+def test_map_forked():
+    # shared array written by the forked workers
+    output = parallel.shared_array((10, 2))
+    assert_equal(output, np.zeros((10, 2)))
+
+    def task(index):
+        output[index] = [index, index ** 2]
+        return -index
+
+    for n_jobs in [1, 2, 3, -1]:
+        output[:] = 0.
+        assert_equal(parallel.map_forked(task, list(range(10)), n_jobs), -np.arange(10))
+        assert_equal(output, np.array([np.arange(10), np.arange(10) ** 2]).T)
+    assert_equal(parallel.map_forked(task, [], 2), [])
+
+
+def test_check_n_jobs():
+    assert_equal(parallel.check_n_jobs(2), 2)
+    assert_equal(parallel.check_n_jobs(np.int64(3)), 3)
+    assert parallel.check_n_jobs(-1) >= 1
+    assert_raises(ValueError, parallel.check_n_jobs, 0)
+    assert_raises(ValueError, parallel.check_n_jobs, -2)
+    assert_raises(ValueError, parallel.check_n_jobs, 1.5)
+    # without the fork start method only serial evaluation is allowed
+    has_fork = parallel._has_fork
+    parallel._has_fork = lambda: False
+    try:
+        assert_equal(parallel.check_n_jobs(1), 1)
+        assert_raises(ValueError, parallel.check_n_jobs, 2)
+        assert_raises(ValueError, parallel.map_forked, abs, [1, 2], 2)
+    finally:
+        parallel._has_fork = has_fork
@@ -24,9 +24,10 @@
 
 import os
 
-from numpy.testing import assert_equal, assert_raises
+import numpy as np
+from numpy.testing import assert_equal, assert_raises, assert_allclose
 
-from chemtools.utils.utils import doc_inherit
+from chemtools.utils.utils import doc_inherit, eigvalsh_3x3
 
 
 def test_doc_inherit():
@@ -64,3 +65,25 @@ def test_doc_inherit():
     assert_equal(Bar.foo.__doc__, Foo.foo.__doc__)
     assert_equal(Bar.boo.__doc__, Foo.boo.__doc__)
     assert_raises(AttributeError, doc_inherit(Foo), Poo.poo)
+
+
+def test_eigvalsh_3x3():
+    np.random.seed(42)
+    packed = np.random.uniform(-10., 10., (1000, 6)) * 10.**np.random.randint(-5, 3, (1000, 1))
+    # add diagonal, degenerate & zero matrices
+    packed[:4] = [[2., 0., 0., 1., 0., 3.], [1., 0., 0., 1., 0., 1.],
+                  [0., 0., 0., 0., 0., 0.], [2., 0., 0., 2., 0., -1.]]
+    matrices = np.zeros((packed.shape[0], 9))
+    matrices[:, [0, 1, 2, 4, 5, 8]] = packed
+    matrices = matrices.reshape(-1, 3, 3)
+    expected = np.linalg.eigvalsh(matrices, UPLO='U')
+    result = eigvalsh_3x3(packed)
+    assert result.shape == (packed.shape[0], 3)
+    scale = np.max(np.abs(expected), axis=1)[:, None] + 1.e-300
+    assert_allclose(result / scale, expected / scale, rtol=0., atol=1.e-12)
+    assert_allclose(result[:4], [[1., 2., 3.], [1., 1., 1.], [0., 0., 0.], [-1., 2., 2.]],
+                    atol=1.e-14)
+    # check ValueError
+    assert_raises(ValueError, eigvalsh_3x3, packed[:, :5])
+    assert_raises(ValueError, eigvalsh_3x3, packed.ravel())
+    assert_raises(ValueError, eigvalsh_3x3, packed.tolist())
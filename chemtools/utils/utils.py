@@ -25,7 +25,9 @@
 import os
 from glob import glob
 
-__all__ = ['doc_inherit']
+import numpy as np
+
+__all__ = ['doc_inherit', 'eigvalsh_3x3']
 
 
 def doc_inherit(base_class, base_method=None):
@@ -66,3 +68,51 @@ def doc_inherit(base_class, base_method=None):
         return method
 
     return decorator
+
+
+def eigvalsh_3x3(matrices):
+    r"""Return eigenvalues of symmetric 3x3 matrices stored in packed upper-triangular form.
+
+    The eigenvalues are computed analytically with the trigonometric solution of the
+    characteristic cubic equation (Smith's method), working directly on the columns of the
+    packed array, e.g. the Hessian of density returned by `Molecule.compute_hessian`.
+    The analytic solution loses precision for (nearly) degenerate eigenvalues, so those
+    matrices are diagonalized with `np.linalg.eigvalsh` instead.
+
+    Parameters
+    ----------
+    matrices : np.ndarray, shape=(n, 6)
+        Upper-triangular elements of `n` symmetric 3x3 matrices ordered as
+        :math:`(xx, xy, xz, yy, yz, zz)`.
+
+    Returns
+    -------
+    eigenvalues : np.ndarray, shape=(n, 3)
+        Eigenvalues of each matrix in ascending order.
+    """
+    if not isinstance(matrices, np.ndarray) or matrices.ndim != 2 or matrices.shape[1] != 6:
+        raise ValueError('Argument matrices should be a 2D array with shape (n, 6)! '
+                         'Given shape={0}'.format(np.shape(matrices)))
+    a00, a01, a02, a11, a12, a22 = [matrices[:, i] for i in range(6)]
+    # shift the matrices by a third of their trace
+    shift = (a00 + a11 + a22) / 3.
+    d00, d11, d22 = a00 - shift, a11 - shift, a22 - shift
+    offdiag = a01**2 + a02**2 + a12**2
+    scale = np.sqrt((d00**2 + d11**2 + d22**2 + 2. * offdiag) / 6.)
+    # half determinant of the shifted matrices divided by scale**3 is the cosine of 3 * angle
+    det = d00 * (d11 * d22 - a12**2) - a01 * (a01 * d22 - a12 * a02) + a02 * (a01 * a12 - d11 * a02)
+    nonzero = scale > 0.
+    ratio = np.zeros(matrices.shape[0])
+    ratio[nonzero] = det[nonzero] / (2. * scale[nonzero]**3)
+    angle = np.arccos(np.clip(ratio, -1., 1.)) / 3.
+    eigenvalues = np.empty((matrices.shape[0], 3))
+    eigenvalues[:, 2] = shift + 2. * scale * np.cos(angle)
+    eigenvalues[:, 0] = shift + 2. * scale * np.cos(angle + 2. * np.pi / 3.)
+    eigenvalues[:, 1] = 3. * shift - eigenvalues[:, 0] - eigenvalues[:, 2]
+    # diagonalize matrices with nearly degenerate eigenvalues, i.e. cos(3 * angle) close to +/-1
+    degenerate = np.where(nonzero & (np.abs(ratio) > 1. - 1.e-4))[0]
+    if degenerate.size != 0:
+        full = np.zeros((degenerate.size, 3, 3))
+        full[:, [0, 0, 0, 1, 1, 2], [0, 1, 2, 1, 2, 2]] = matrices[degenerate]
+        eigenvalues[degenerate] = np.linalg.eigvalsh(full, UPLO='U')
+    return eigenvalues
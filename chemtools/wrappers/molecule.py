@@ -23,9 +23,11 @@
 """Wrapper Module."""
 
 
+import hashlib
 import logging
 import numpy as np
 from horton import IOData, DenseLinalgFactory
+from chemtools.utils import parallel
 try:
     from importlib_resources import path
 except ImportError:
@@ -171,6 +173,24 @@ class Molecule(object):
         """
         return self._exp_alpha.coeffs, self._exp_beta.coeffs
 
+    @property
+    def fingerprint(self):
+        """Hash of the wave-function, i.e. basis set, orbital coefficients & occupations."""
+        arrays = [self._coordinates, self._numbers]
+        obasis = getattr(self._iodata, "obasis", None)
+        if obasis is not None:
+            arrays += [getattr(obasis, attr) for attr in
+                       ["centers", "shell_map", "nprims", "shell_types", "alphas", "con_coeffs"]]
+        for exp in [self._exp_alpha, self._exp_beta]:
+            if exp is not None:
+                arrays += [exp.coeffs, exp.occupations]
+        sha = hashlib.sha1()
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            sha.update("{0} {1}".format(array.dtype, array.shape).encode("utf-8"))
+            sha.update(array.tobytes())
+        return sha.hexdigest()
+
     def compute_orbital_overlap(self):
         """Return the overlap matrix of molecular orbitals."""
         # make linear algebra factory
@@ -187,7 +207,7 @@ class Molecule(object):
         dm = self._get_density_matrix(spin)
         return dm._array
 
-    def _get_density_matrix(self, spin):
+    def _get_density_matrix(self, spin, index=None):
         """
         Return HORTON density matrix object corresponding to the specified spin.
 
@@ -200,12 +220,24 @@ class Molecule(object):
            - "a" or "alpha": consider alpha electrons
            - "b" or "beta": consider beta electrons
            - "ab": consider alpha and beta electrons
+
+        index : sequence, default=None
+           Sequence of integers representing the index of spin orbitals. Alpha and beta spin
+           orbitals are each indexed from 1 to :attr:`nbasis`, and each selected orbital is
+           singly occupied. If ``None``, the density matrix of the wavefunction is returned.
         """
         # check orbital spin
         if spin not in ["a", "b", "alpha", "beta", "ab"]:
             raise ValueError("Argument spin={0} is not recognized!".format(spin))
         # compute density matrix
-        if spin == "ab":
+        if index is not None:
+            # get density matrix of specified set of orbitals
+            dm = DenseLinalgFactory(self.nbasis).create_two_index()
+            dm._array[:] = 0.
+            for exp, orbs, weight in self._get_orbital_expressions(spin, index):
+                coeffs = exp.coeffs[:, orbs]
+                dm._array += weight * coeffs.dot(coeffs.T)
+        elif spin == "ab":
             # get density matrix of alpha & beta electrons
             dm = self._iodata.get_dm_full()
         else:
@@ -216,6 +248,73 @@ class Molecule(object):
             dm = exp.to_dm()
         return dm
 
+    def _get_orbital_index(self, spin, index):
+        """
+        Return HORTON index (starting from 0) of the specified spin orbitals.
+
+        Parameters
+        ----------
+        spin : str
+           The type of spin orbitals, i.e. "a", "alpha", "b" or "beta".
+        index : sequence
+           Sequence of integers representing the index of spin orbitals. Alpha and beta spin
+           orbitals are each indexed from 1 to :attr:`nbasis`.
+           If ``None``, all occupied spin orbitals are included.
+        """
+        if index is None:
+            # include all occupied orbitals of specified spin
+            spin_index = {"a": 0, "alpha": 0, "b": 1, "beta": 1}
+            return np.arange(self.homo_index[spin_index[spin]])
+        # include specified set of orbitals
+        index = np.copy(np.asarray(index)) - 1
+        if index.ndim == 0:
+            index = np.array([index])
+        if np.any(index < 0):
+            raise ValueError('Argument index={0} cannot be less than one!'.format(index + 1))
+        if np.any(index >= self.nbasis):
+            raise ValueError('Argument index={0} cannot be greater than nbasis={1}!'.format(
+                index + 1, self.nbasis))
+        return index
+
+    def _get_orbital_expressions(self, spin, index):
+        """
+        Return orbital expressions, HORTON orbital index & weight of the specified spin orbitals.
+
+        For "ab" spin of a restricted wavefunction, the alpha and beta orbitals are the same, so
+        a single orbital expression with a weight of 2 is returned.
+
+        Parameters
+        ----------
+        spin : str
+           The type of spin orbitals, i.e. "a", "alpha", "b", "beta" or "ab".
+        index : sequence
+           Sequence of integers representing the index of spin orbitals. Alpha and beta spin
+           orbitals are each indexed from 1 to :attr:`nbasis`.
+           If ``None``, all occupied spin orbitals are included.
+        """
+        if spin not in ["a", "b", "alpha", "beta", "ab"]:
+            raise ValueError("Argument spin={0} is not recognized!".format(spin))
+        if spin != "ab":
+            spin_type = {"a": "alpha", "alpha": "alpha", "b": "beta", "beta": "beta"}
+            exp = getattr(self, "_exp_" + spin_type[spin])
+            return [(exp, self._get_orbital_index(spin, index), 1.)]
+        index_a = self._get_orbital_index("a", index)
+        index_b = self._get_orbital_index("b", index)
+        if self._exp_alpha is self._exp_beta and np.array_equal(index_a, index_b):
+            return [(self._exp_alpha, index_a, 2.)]
+        return [(self._exp_alpha, index_a, 1.), (self._exp_beta, index_b, 1.)]
+
+    def _use_orbitals(self, spin, index):
+        """Return True, if few orbitals are selected to be evaluated instead of density matrix.
+
+        Evaluating norb orbitals on a point scales as nbasis * norb, while contracting the
+        density matrix scales as nbasis ** 2.
+        """
+        if index is None:
+            return False
+        norbs = sum(orbs.size for _, orbs, _ in self._get_orbital_expressions(spin, index))
+        return 2 * norbs <= self.nbasis
+
     def compute_molecular_orbital(self, points, spin, index=None, output=None):
         """
         Return molecular orbitals evaluated on the given points for the spin orbitals.
@@ -246,17 +345,7 @@ class Molecule(object):
             raise ValueError("Argument points should be a 2d-array of floats!")
 
         # assign orbital index (HORTON index the orbitals from 0)
-        if index is None:
-            # include all occupied orbitals of specified spin
-            spin_index = {"a": 0, "alpha": 0, "b": 1, "beta": 1}
-            index = np.arange(self.homo_index[spin_index[spin]])
-        else:
-            # include specified set of orbitals
-            index = np.copy(np.asarray(index)) - 1
-            if index.ndim == 0:
-                index = np.array([index])
-            if np.any(index < 0):
-                raise ValueError('Argument index={0} cannot be less than one!'.format(index + 1))
+        index = self._get_orbital_index(spin, index)
 
         # allocate output array
         if output is None:
@@ -272,7 +361,8 @@ class Molecule(object):
         self._iodata.obasis.compute_grid_orbitals_exp(exp, points, index, output=output)
         return output
 
-    def compute_density(self, points, spin="ab", index=None, output=None):
+    def compute_density(self, points, spin="ab", index=None, output=None, chunk_size=None,
+                        n_jobs=None):
         r"""
         Return electron density evaluated on the given points for the spin orbitals.
 
@@ -296,6 +386,17 @@ class Molecule(object):
         output : np.ndarray
            Array with shape (n,) to store the output, where n in the number of points.
            When ``None`` the array is allocated.
+        chunk_size : int, default=None
+           Maximum number of points evaluated at once. When given, points are evaluated in
+           blocks of this size and each block is written directly into `output`, so the memory
+           used for evaluation does not grow with the number of points. Passing a memory-mapped
+           `output` array keeps the peak memory flat for arbitrarily large grids.
+           When ``None``, all points are evaluated at once.
+        n_jobs : int, default=None
+           Number of worker processes used for evaluation. When given, blocks of points (of size
+           `chunk_size`, or an equal share of points when `chunk_size` is ``None``) are evaluated
+           by a pool of forked processes which write directly into a shared-memory output array.
+           If -1, all available CPUs are used. When ``None``, points are evaluated in this process.
         """
         # check points
         if not isinstance(points, np.ndarray) or points.ndim != 2 or points.shape[1] != 3:
@@ -303,35 +404,37 @@ class Molecule(object):
         if not np.issubdtype(points.dtype, np.float64):
             raise ValueError("Argument points should be a 2d-array of floats!")
 
-        # allocate output array
+        # check output array
+        if output is not None and output.shape != (points.shape[0],):
+            raise ValueError("Argument output should be a {0} array.".format((points.shape[0],)))
+
+        # evaluate blocks of points in parallel or in serial, writing each block into output
+        if n_jobs is not None:
+            # worker processes write into an output array allocated in shared memory
+            return self._compute_in_parallel(self.compute_density, points, output, (), n_jobs,
+                                             chunk_size, spin=spin, index=index)
         if output is None:
             output = np.zeros((points.shape[0],), float)
-        if output.shape != (points.shape[0],):
-            raise ValueError("Argument output should be a {0} array.".format((points.shape[0],)))
+        if chunk_size is not None:
+            return self._compute_in_chunks(self.compute_density, points, output, chunk_size,
+                                           spin=spin, index=index)
 
         # compute density
-        if index is None:
-            # get density matrix corresponding to the specified spin
-            dm = self._get_density_matrix(spin)
-            # include all orbitals
-            self._iodata.obasis.compute_grid_density_dm(dm, points, output=output)
+        if self._use_orbitals(spin, index):
+            # include small subset of molecular orbitals by evaluating them on points
+            output[:] = 0.
+            for exp, orbs, weight in self._get_orbital_expressions(spin, index):
+                mo = np.zeros((points.shape[0], orbs.size), float)
+                self._iodata.obasis.compute_grid_orbitals_exp(exp, points, orbs, output=mo)
+                output += weight * np.einsum("ij,ij->i", mo, mo)
         else:
-            # include subset of molecular orbitals
-            if spin == "ab":
-                # compute mo expression of alpha & beta orbitals
-                mo_a = self.compute_molecular_orbital(points, "a", index)
-                mo_b = self.compute_molecular_orbital(points, "b", index)
-                # add density of alpha & beta molecular orbitals
-                np.sum(mo_a**2, axis=1, out=output)
-                output += np.sum(mo_b**2, axis=1)
-            else:
-                # compute mo expression of specified molecular orbitals
-                mo = self.compute_molecular_orbital(points, spin, index)
-                # add density of specified molecular orbitals
-                np.sum(mo**2, axis=1, out=output)
+            # get density matrix corresponding to the specified spin & orbitals
+            dm = self._get_density_matrix(spin, index)
+            self._iodata.obasis.compute_grid_density_dm(dm, points, output=output)
         return output
 
-    def compute_gradient(self, points, spin="ab", index=None, output=None):
+    def compute_gradient(self, points, spin="ab", index=None, output=None, chunk_size=None,
+                         n_jobs=None):
         r"""
         Return gradient of electron density evaluated on the given points for the spin orbitals.
 
@@ -355,6 +458,17 @@ class Molecule(object):
         output : np.ndarray
            Array with shape (n, 3) to store the output, where n in the number of points.
            When ``None`` the array is allocated.
+        chunk_size : int, default=None
+           Maximum number of points evaluated at once. When given, points are evaluated in
+           blocks of this size and each block is written directly into `output`, so the memory
+           used for evaluation does not grow with the number of points. Passing a memory-mapped
+           `output` array keeps the peak memory flat for arbitrarily large grids.
+           When ``None``, all points are evaluated at once.
+        n_jobs : int, default=None
+           Number of worker processes used for evaluation. When given, blocks of points (of size
+           `chunk_size`, or an equal share of points when `chunk_size` is ``None``) are evaluated
+           by a pool of forked processes which write directly into a shared-memory output array.
+           If -1, all available CPUs are used. When ``None``, points are evaluated in this process.
         """
         # check points
         if not isinstance(points, np.ndarray) or points.ndim != 2 or points.shape[1] != 3:
@@ -362,24 +476,53 @@ class Molecule(object):
         if not np.issubdtype(points.dtype, np.float64):
             raise ValueError("Argument points should be a 2d-array of floats!")
 
-        # allocate output array
+        # check output array
+        if output is not None and output.shape != (points.shape[0], 3):
+            raise ValueError("Argument output should be a {0} array.".format((points.shape[0], 3)))
+
+        # evaluate blocks of points in parallel or in serial, writing each block into output
+        if n_jobs is not None:
+            # worker processes write into an output array allocated in shared memory
+            return self._compute_in_parallel(self.compute_gradient, points, output, (3,), n_jobs,
+                                             chunk_size, spin=spin, index=index)
         if output is None:
             output = np.zeros((points.shape[0], 3), float)
-        if output.shape != (points.shape[0], 3):
-            raise ValueError("Argument output should be a {0} array.".format((points.shape[0], 3)))
+        if chunk_size is not None:
+            return self._compute_in_chunks(self.compute_gradient, points, output, chunk_size,
+                                           spin=spin, index=index)
 
-        # get density matrix corresponding to the specified spin
-        dm = self._get_density_matrix(spin)
         # compute gradient
-        if index is None:
-            # include all orbitals
-            self._iodata.obasis.compute_grid_gradient_dm(dm, points, output=output)
+        obasis = self._iodata.obasis
+        if self._use_orbitals(spin, index) and hasattr(obasis, "compute_grid_orb_gradient_exp"):
+            # include small subset of molecular orbitals by evaluating them on points
+            self._compute_orbital_gradient(points, spin, index, output)
         else:
-            # include specified set of orbitals
-            raise NotImplementedError()
+            # get density matrix corresponding to the specified spin & orbitals
+            dm = self._get_density_matrix(spin, index)
+            obasis.compute_grid_gradient_dm(dm, points, output=output)
         return output
 
-    def compute_hessian(self, points, spin="ab", index=None, output=None):
+    def _compute_orbital_gradient(self, points, spin, index, output, chunk_size=1000):
+        r"""Compute gradient of density of the specified orbitals from orbitals & their gradients.
+
+        The gradient of density is :math:`2 \sum_i \phi_i \nabla \phi_i`, and it is
+        evaluated on blocks of points, so the memory used does not exceed ``chunk_size * norb``
+        orbital values and gradients.
+        """
+        obasis = self._iodata.obasis
+        output[:] = 0.
+        for exp, orbs, weight in self._get_orbital_expressions(spin, index):
+            for start in range(0, points.shape[0], chunk_size):
+                end = min(start + chunk_size, points.shape[0])
+                mo = np.zeros((end - start, orbs.size), float)
+                obasis.compute_grid_orbitals_exp(exp, points[start:end], orbs, output=mo)
+                mo_grad = np.zeros((end - start, orbs.size, 3), float)
+                obasis.compute_grid_orb_gradient_exp(exp, points[start:end], orbs,
+                                                     output=mo_grad)
+                output[start:end] += 2 * weight * np.einsum("ij,ijk->ik", mo, mo_grad)
+
+    def compute_hessian(self, points, spin="ab", index=None, output=None, chunk_size=None,
+                        n_jobs=None):
         r"""
         Return hessian of electron density evaluated on the given points for the spin orbitals.
 
@@ -403,6 +546,17 @@ class Molecule(object):
         output : np.ndarray
            Array with shape (n, 6) to store the output, where n in the number of points.
            When ``None`` the array is allocated.
+        chunk_size : int, default=None
+           Maximum number of points evaluated at once. When given, points are evaluated in
+           blocks of this size and each block is written directly into `output`, so the memory
+           used for evaluation does not grow with the number of points. Passing a memory-mapped
+           `output` array keeps the peak memory flat for arbitrarily large grids.
+           When ``None``, all points are evaluated at once.
+        n_jobs : int, default=None
+           Number of worker processes used for evaluation. When given, blocks of points (of size
+           `chunk_size`, or an equal share of points when `chunk_size` is ``None``) are evaluated
+           by a pool of forked processes which write directly into a shared-memory output array.
+           If -1, all available CPUs are used. When ``None``, points are evaluated in this process.
         """
         # check points
         if not isinstance(points, np.ndarray) or points.ndim != 2 or points.shape[1] != 3:
@@ -410,24 +564,29 @@ class Molecule(object):
         if not np.issubdtype(points.dtype, np.float64):
             raise ValueError("Argument points should be a 2d-array of floats!")
 
-        # allocate output array
+        # check output array
+        if output is not None and output.shape != (points.shape[0], 6):
+            raise ValueError("Argument output should be a {0} array.".format((points.shape[0], 6)))
+
+        # evaluate blocks of points in parallel or in serial, writing each block into output
+        if n_jobs is not None:
+            # worker processes write into an output array allocated in shared memory
+            return self._compute_in_parallel(self.compute_hessian, points, output, (6,), n_jobs,
+                                             chunk_size, spin=spin, index=index)
         if output is None:
             output = np.zeros((points.shape[0], 6), float)
-        if output.shape != (points.shape[0], 6):
-            raise ValueError("Argument output should be a {0} array.".format((points.shape[0], 6)))
+        if chunk_size is not None:
+            return self._compute_in_chunks(self.compute_hessian, points, output, chunk_size,
+                                           spin=spin, index=index)
 
-        # get density matrix corresponding to the specified spin
-        dm = self._get_density_matrix(spin)
+        # get density matrix corresponding to the specified spin & orbitals
+        dm = self._get_density_matrix(spin, index)
         # compute hessian
-        if index is None:
-            # include all orbitals
-            self._iodata.obasis.compute_grid_hessian_dm(dm, points, output=output)
-        else:
-            # include specified set of orbitals
-            raise NotImplementedError()
+        self._iodata.obasis.compute_grid_hessian_dm(dm, points, output=output)
         return output
 
-    def compute_esp(self, points, spin="ab", index=None, output=None, charges=None):
+    def compute_esp(self, points, spin="ab", index=None, output=None, charges=None,
+                    chunk_size=None, n_jobs=None):
         r"""
         Return the molecular electrostatic potential on the given points for the specified spin.
 
@@ -464,6 +623,17 @@ class Molecule(object):
         charges : np.ndarray, default=None
            Array with shape (n,) representing the point charges at the position of the nuclei.
            When ``None``, the pseudo numbers are used.
+        chunk_size : int, default=None
+           Maximum number of points evaluated at once. When given, points are evaluated in
+           blocks of this size and each block is written directly into `output`, so the memory
+           used for evaluation does not grow with the number of points. Passing a memory-mapped
+           `output` array keeps the peak memory flat for arbitrarily large grids.
+           When ``None``, all points are evaluated at once.
+        n_jobs : int, default=None
+           Number of worker processes used for evaluation. When given, blocks of points (of size
+           `chunk_size`, or an equal share of points when `chunk_size` is ``None``) are evaluated
+           by a pool of forked processes which write directly into a shared-memory output array.
+           If -1, all available CPUs are used. When ``None``, points are evaluated in this process.
         """
         # check points
         if not isinstance(points, np.ndarray) or points.ndim != 2 or points.shape[1] != 3:
@@ -471,14 +641,23 @@ class Molecule(object):
         if not np.issubdtype(points.dtype, np.float64):
             raise ValueError("Argument points should be a 2d-array of floats!")
 
-        # allocate output array
+        # check output array
+        if output is not None and output.shape != (points.shape[0],):
+            raise ValueError("Argument output should be a {0} array.".format((points.shape[0],)))
+
+        # evaluate blocks of points in parallel or in serial, writing each block into output
+        if n_jobs is not None:
+            # worker processes write into an output array allocated in shared memory
+            return self._compute_in_parallel(self.compute_esp, points, output, (), n_jobs,
+                                             chunk_size, spin=spin, index=index, charges=charges)
         if output is None:
             output = np.zeros((points.shape[0],), np.float)
-        if output.shape != (points.shape[0],):
-            raise ValueError("Argument output should be a {0} array.".format((points.shape[0],)))
+        if chunk_size is not None:
+            return self._compute_in_chunks(self.compute_esp, points, output, chunk_size,
+                                           spin=spin, index=index, charges=charges)
 
-        # get density matrix corresponding to the specified spin
-        dm = self._get_density_matrix(spin)
+        # get density matrix corresponding to the specified spin & orbitals
+        dm = self._get_density_matrix(spin, index)
         # assign point charges
         if charges is None:
             charges = self.pseudo_numbers
@@ -486,16 +665,12 @@ class Molecule(object):
             raise ValueError("Argument charges should be a 1d-array "
                              "with {0} shape.".format(self.numbers.shape))
         # compute esp
-        if index is None:
-            # include all orbitals
-            self._iodata.obasis.compute_grid_esp_dm(dm, self.coordinates, charges, points,
-                                                    output=output)
-        else:
-            # include specified set of orbitals
-            raise NotImplementedError()
+        self._iodata.obasis.compute_grid_esp_dm(dm, self.coordinates, charges, points,
+                                                output=output)
         return output
 
-    def compute_ked(self, points, spin="ab", index=None, output=None):
+    def compute_ked(self, points, spin="ab", index=None, output=None, chunk_size=None,
+                    n_jobs=None):
         r"""
         Return positive definite kinetic energy density on the given points for the specified spin.
 
@@ -525,26 +700,40 @@ class Molecule(object):
         output : np.ndarray
            Array with shape (n,) to store the output, where n in the number of points.
            When ``None`` the array is allocated.
+        chunk_size : int, default=None
+           Maximum number of points evaluated at once. When given, points are evaluated in
+           blocks of this size and each block is written directly into `output`, so the memory
+           used for evaluation does not grow with the number of points. Passing a memory-mapped
+           `output` array keeps the peak memory flat for arbitrarily large grids.
+           When ``None``, all points are evaluated at once.
+        n_jobs : int, default=None
+           Number of worker processes used for evaluation. When given, blocks of points (of size
+           `chunk_size`, or an equal share of points when `chunk_size` is ``None``) are evaluated
+           by a pool of forked processes which write directly into a shared-memory output array.
+           If -1, all available CPUs are used. When ``None``, points are evaluated in this process.
         """
         # check points
         if not isinstance(points, np.ndarray) or points.ndim != 2 or points.shape[1] != 3:
             raise ValueError("Argument points should be a 2d-array with 3 columns.")
         if not np.issubdtype(points.dtype, np.float64):
             raise ValueError("Argument points should be a 2d-array of floats!")
-        # allocate output array
+        # check output array
+        if output is not None and output.shape != (points.shape[0],):
+            raise ValueError("Argument output should be a {0} array.".format((points.shape[0],)))
+        # evaluate blocks of points in parallel or in serial, writing each block into output
+        if n_jobs is not None:
+            # worker processes write into an output array allocated in shared memory
+            return self._compute_in_parallel(self.compute_ked, points, output, (), n_jobs,
+                                             chunk_size, spin=spin, index=index)
         if output is None:
             output = np.zeros((points.shape[0],), float)
-        if output.shape != (points.shape[0],):
-            raise ValueError("Argument output should be a {0} array.".format((points.shape[0],)))
-        # get density matrix corresponding to the specified spin
-        dm = self._get_density_matrix(spin)
+        if chunk_size is not None:
+            return self._compute_in_chunks(self.compute_ked, points, output, chunk_size,
+                                           spin=spin, index=index)
+        # get density matrix corresponding to the specified spin & orbitals
+        dm = self._get_density_matrix(spin, index)
         # compute kinetic energy
-        if index is None:
-            # include all orbitals
-            self._iodata.obasis.compute_grid_kinetic_dm(dm, points, output=output)
-        else:
-            # include specified set of orbitals
-            raise NotImplementedError()
+        self._iodata.obasis.compute_grid_kinetic_dm(dm, points, output=output)
         return output
 
     def compute_megga(self, points, spin='ab', index=None):
@@ -574,12 +763,208 @@ class Molecule(object):
         if not np.issubdtype(points.dtype, np.float64):
             raise ValueError("Argument points should be a 2d-array of floats!")
 
-        # get density matrix corresponding to the specified spin
-        dm = self._get_density_matrix(spin)
-
+        # get density matrix corresponding to the specified spin & orbitals
+        dm = self._get_density_matrix(spin, index)
         # compute for the given set of orbitals
-        if index is None:
-            output = self._iodata.obasis.compute_grid_mgga_dm(dm, points)
-        else:
-            raise NotImplementedError()
+        output = self._iodata.obasis.compute_grid_mgga_dm(dm, points)
         return output[:, 0], output[:, 1:4], output[:, 4], output[:, 5]
+
+    def compute_properties(self, points, properties, spin="ab", index=None, chunk_size=None):
+        r"""Return the requested properties of electron density evaluated together on the points.
+
+        The basis functions and their derivatives are evaluated once for each block of points
+        and shared between all requested properties. Density, gradient, laplacian and positive
+        definite kinetic energy density are obtained from a single pass over the basis functions,
+        and the hessian requires only one additional pass.
+
+        Parameters
+        ----------
+        points : ndarray
+           The 2d-array containing the cartesian coordinates of points on which density is
+           evaluated. It has a shape (n, 3) where n is the number of points.
+        properties : sequence of str
+           Names of the properties to compute:
+
+           - "density": electron density with shape (n,)
+           - "gradient": gradient of electron density with shape (n, 3)
+           - "laplacian": laplacian of electron density with shape (n,)
+           - "hessian": hessian of electron density with shape (n, 6)
+           - "ked": positive definite kinetic energy density with shape (n,)
+
+        spin : str
+           The type of occupied spin orbitals. By default, the alpha and beta electrons (i.e.
+           alpha and beta occupied spin orbitals) are used for computing the electron density.
+
+           - "a" or "alpha": consider alpha electrons
+           - "b" or "beta": consider beta electrons
+           - "ab": consider alpha and beta electrons
+
+        index : sequence
+           Sequence of integers representing the index of spin orbitals. Alpha and beta spin
+           orbitals are each indexed from 1 to :attr:`nbasis`.
+           If ``None``, all occupied spin orbitals are included.
+        chunk_size : int, default=None
+           Maximum number of points evaluated at once. When ``None``, all points are evaluated
+           at once.
+
+        Returns
+        -------
+        values : tuple of np.ndarray
+           The arrays of the requested properties in the same order as `properties`.
+        """
+        # check points
+        if not isinstance(points, np.ndarray) or points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError("Argument points should be a 2d-array with 3 columns.")
+        if not np.issubdtype(points.dtype, np.float64):
+            raise ValueError("Argument points should be a 2d-array of floats!")
+        # check properties
+        shapes = {"density": (), "gradient": (3,), "laplacian": (), "hessian": (6,), "ked": ()}
+        if isinstance(properties, str) or len(properties) == 0:
+            raise ValueError("Argument properties should be a sequence of property names.")
+        for name in properties:
+            if name not in shapes:
+                raise ValueError("Argument properties contains unknown property {0}! Choose "
+                                 "from {1}".format(name, sorted(shapes.keys())))
+
+        # allocate output arrays
+        npoints = points.shape[0]
+        output = dict((name, np.zeros((npoints,) + shapes[name], float)) for name in properties)
+
+        # get density matrix corresponding to the specified spin & orbitals
+        dm = self._get_density_matrix(spin, index)
+        if chunk_size is None:
+            chunk_size = max(npoints, 1)
+        if not isinstance(chunk_size, (int, np.integer)) or chunk_size <= 0:
+            raise ValueError("Argument chunk_size should be a positive integer! "
+                             "Given chunk_size={0}".format(chunk_size))
+        # evaluate all properties on each block of points
+        for start in range(0, npoints, chunk_size):
+            end = min(start + chunk_size, npoints)
+            block = dict((name, value[start:end]) for name, value in output.items())
+            self._compute_properties_dm(dm, points[start:end], block)
+        return tuple(output[name] for name in properties)
+
+    def _compute_properties_dm(self, dm, points, output):
+        """Compute properties of the given density matrix on points, and store them in output.
+
+        Parameters
+        ----------
+        dm : horton.matrix.dense.DenseTwoIndex
+           Density matrix.
+        points : ndarray
+           The 2d-array containing the cartesian coordinates of points. It has a shape (n, 3)
+           where n is the number of points.
+        output : dict
+           Dictionary of property name and array used to store the evaluated property.
+        """
+        obasis = self._iodata.obasis
+        # properties obtained from the basis functions and their first derivatives
+        # (the laplacian is taken from the hessian, if it is requested)
+        first = set(output.keys()) & set(["density", "gradient", "ked", "laplacian"])
+        if "hessian" in output:
+            first.discard("laplacian")
+
+        if first == set(["density"]):
+            obasis.compute_grid_density_dm(dm, points, output=output["density"])
+        elif first == set(["gradient"]):
+            obasis.compute_grid_gradient_dm(dm, points, output=output["gradient"])
+        elif first == set(["ked"]):
+            obasis.compute_grid_kinetic_dm(dm, points, output=output["ked"])
+        elif first:
+            if first <= set(["density", "gradient"]):
+                # density & gradient in one pass
+                values = obasis.compute_grid_gga_dm(dm, points)
+            else:
+                # density, gradient, laplacian & kinetic energy density in one pass
+                values = obasis.compute_grid_mgga_dm(dm, points)
+            columns = {"density": 0, "gradient": slice(1, 4), "laplacian": 4, "ked": 5}
+            for name in first:
+                output[name][:] = values[:, columns[name]]
+
+        if "hessian" in output:
+            hess = output["hessian"]
+            obasis.compute_grid_hessian_dm(dm, points, output=hess)
+            if "laplacian" in output:
+                output["laplacian"][:] = hess[:, 0] + hess[:, 3] + hess[:, 5]
+
+    @staticmethod
+    def _compute_in_chunks(method, points, output, chunk_size, **kwargs):
+        """Evaluate a property method on consecutive blocks of points.
+
+        Parameters
+        ----------
+        method : callable
+           Bound ``compute_*`` method called as ``method(points, output=output, **kwargs)``.
+        points : ndarray
+           The 2d-array containing the cartesian coordinates of points. It has a shape (n, 3)
+           where n is the number of points.
+        output : np.ndarray
+           Array with the first dimension equal to n in which the result of each block is stored.
+        chunk_size : int
+           Maximum number of points evaluated at once.
+        """
+        if not isinstance(chunk_size, (int, np.integer)) or chunk_size <= 0:
+            raise ValueError("Argument chunk_size should be a positive integer! "
+                             "Given chunk_size={0}".format(chunk_size))
+        for start in range(0, points.shape[0], chunk_size):
+            end = min(start + chunk_size, points.shape[0])
+            method(points[start:end], output=output[start:end], **kwargs)
+        return output
+
+    @staticmethod
+    def _compute_in_parallel(method, points, output, shape, n_jobs, chunk_size=None, **kwargs):
+        """Evaluate a property method on blocks of points using a pool of worker processes.
+
+        The worker processes are forked, so they inherit the molecule and points without
+        pickling, and they write the result of each block into an output array allocated in
+        shared memory, see `chemtools.utils.parallel`.
+
+        Parameters
+        ----------
+        method : callable
+           Bound ``compute_*`` method called as ``method(points, output=output, **kwargs)``.
+        points : ndarray
+           The 2d-array containing the cartesian coordinates of points. It has a shape (n, 3)
+           where n is the number of points.
+        output : np.ndarray or None
+           Array with shape (n,) + `shape` in which the result is stored. When ``None``, the
+           shared-memory array is returned, otherwise the result is copied into `output`.
+        shape : tuple of int
+           Shape of the property evaluated on one point.
+        n_jobs : int
+           Number of worker processes. If -1, all available CPUs are used.
+        chunk_size : int, default=None
+           Maximum number of points evaluated at once by a worker. When ``None``, the points are
+           split into `n_jobs` blocks of (almost) equal size.
+        """
+        n_jobs = parallel.check_n_jobs(n_jobs)
+        if chunk_size is not None:
+            if not isinstance(chunk_size, (int, np.integer)) or chunk_size <= 0:
+                raise ValueError("Argument chunk_size should be a positive integer! "
+                                 "Given chunk_size={0}".format(chunk_size))
+        npoints = points.shape[0]
+        # make bounds of blocks of points
+        if chunk_size is None:
+            chunk_size = max(-(-npoints // n_jobs), 1)
+        bounds = [(start, min(start + chunk_size, npoints))
+                  for start in range(0, npoints, chunk_size)]
+        if n_jobs == 1 or len(bounds) <= 1:
+            # evaluate blocks in this process
+            if output is None:
+                output = np.zeros((npoints,) + shape, float)
+            for start, end in bounds:
+                method(points[start:end], output=output[start:end], **kwargs)
+            return output
+        # allocate output array in shared memory, which the workers write into
+        shared = parallel.shared_array((npoints,) + shape)
+
+        def compute_block(block):
+            """Evaluate the method on the points between the given bounds."""
+            start, end = block
+            method(points[start:end], output=shared[start:end], **kwargs)
+
+        parallel.map_forked(compute_block, bounds, n_jobs)
+        if output is None:
+            return shared
+        output[:] = shared
+        return output
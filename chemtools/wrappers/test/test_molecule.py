@@ -88,13 +88,14 @@ def check_horton_molecule_raises(mol):
     assert_raises(ValueError, mol.compute_esp, points, spin="ab", output=np.zeros(3))
     assert_raises(ValueError, mol.compute_esp, points, spin="b", output=np.zeros((2, 4)))
     assert_raises(ValueError, mol.compute_ked, points, "a", None, np.zeros(3))
-    # check not implemented erros
-    assert_raises(NotImplementedError, mol.compute_gradient, points, "ab", [0, 1], None)
-    assert_raises(NotImplementedError, mol.compute_gradient, points, "a", [5, 7], None)
-    assert_raises(NotImplementedError, mol.compute_gradient, points, "b", [20], None)
-    assert_raises(NotImplementedError, mol.compute_hessian, points, "ab", [32, 33], None)
-    assert_raises(NotImplementedError, mol.compute_esp, points, "a", [33], None)
-    assert_raises(NotImplementedError, mol.compute_ked, points, "a", [30])
+    # check invalid orbital index
+    assert_raises(ValueError, mol.compute_density, points, "ab", [0, 1], None)
+    assert_raises(ValueError, mol.compute_gradient, points, "ab", [0, 1], None)
+    assert_raises(ValueError, mol.compute_gradient, points, "b", [mol.nbasis + 1], None)
+    assert_raises(ValueError, mol.compute_hessian, points, "ab", [32, mol.nbasis + 1], None)
+    assert_raises(ValueError, mol.compute_esp, points, "a", [0], None)
+    assert_raises(ValueError, mol.compute_ked, points, "a", [-1])
+    assert_raises(ValueError, mol.compute_megga, points, "a", [0])
 
 
 def test_horton_molecule_check_raises_fchk_ch4_uhf_ccpvdz():
@@ -342,6 +343,22 @@ def check_horton_molecule_against_fortran_ch4_uhf_ccpvdz(mol):
     assert_almost_equal(mol.compute_molecular_orbital(points, "beta", 9), exp9, decimal=6)
     # check positive definite ke
     assert_almost_equal(mol.compute_ked(points, "ab"), ke, decimal=6)
+    # check gradient & ke computed from the density matrix of occupied orbitals
+    assert_almost_equal(mol.compute_gradient(points, "ab", range(1, 6)), grad, decimal=6)
+    assert_almost_equal(mol.compute_gradient(points, "a", range(1, 6)), grad / 2, decimal=6)
+    assert_almost_equal(mol.compute_ked(points, "ab", range(1, 6)), ke, decimal=6)
+    assert_almost_equal(mol.compute_ked(points, "b", range(1, 6)), ke / 2, decimal=6)
+    assert_almost_equal(mol.compute_hessian(points, "ab", range(1, 6)),
+                        mol.compute_hessian(points, "ab"), decimal=6)
+    assert_almost_equal(mol.compute_esp(points, "ab", range(1, 6)),
+                        mol.compute_esp(points, "ab"), decimal=6)
+    assert_almost_equal(mol.compute_megga(points, "ab", range(1, 6))[3], ke, decimal=6)
+    # check gradient of a single orbital density against its orbital expression
+    dens9 = mol.compute_density(points, "ab", 9)
+    assert_almost_equal(dens9, 2 * exp9[:, 0]**2, decimal=6)
+    grad9 = mol.compute_gradient(points, "ab", 9)
+    assert_almost_equal(mol.compute_properties(points, ["gradient"], "ab", 9)[0], grad9, decimal=8)
+    assert_almost_equal(grad9, 2 * mol.compute_gradient(points, "a", [9]), decimal=8)
 
 
 def test_horton_molecule_grid_fortran_fchk_ch4_uhf_ccpvdz():
@@ -358,6 +375,102 @@ def test_horton_molecule_grid_fortran_fchk_ch4_rhf_ccpvdz():
     check_horton_molecule_against_fortran_ch4_uhf_ccpvdz(molecule)
 
 
+def test_horton_molecule_grid_chunks_fchk_ch4_uhf_ccpvdz():
+    with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as fname:
+        mol = Molecule.from_file(fname)
+    # get expected data computed by Fortran code
+    points, _, _, dens, grad, ke, _, _ = load_data_fortran_ch4_uhf_ccpvdz()
+    # check chunked evaluation against expected values & unchunked evaluation
+    for chunk_size in [1, 4, 7, points.shape[0], 2 * points.shape[0]]:
+        assert_almost_equal(mol.compute_density(points, chunk_size=chunk_size), dens, decimal=6)
+        assert_almost_equal(mol.compute_density(points, "a", range(1, 6), chunk_size=chunk_size),
+                            dens / 2, decimal=6)
+        assert_almost_equal(mol.compute_gradient(points, chunk_size=chunk_size), grad, decimal=6)
+        assert_almost_equal(mol.compute_ked(points, chunk_size=chunk_size), ke, decimal=6)
+        assert_almost_equal(mol.compute_hessian(points, "b", chunk_size=chunk_size),
+                            mol.compute_hessian(points, "b"), decimal=8)
+        assert_almost_equal(mol.compute_esp(points, chunk_size=chunk_size),
+                            mol.compute_esp(points), decimal=8)
+    # check chunked evaluation writes into the given output array
+    output = np.zeros(points.shape[0])
+    result = mol.compute_density(points, "ab", None, output, chunk_size=5)
+    assert result is output
+    assert_almost_equal(output, dens, decimal=6)
+    # check invalid chunk_size argument
+    assert_raises(ValueError, mol.compute_density, points, chunk_size=0)
+    assert_raises(ValueError, mol.compute_gradient, points, chunk_size=-2)
+    assert_raises(ValueError, mol.compute_hessian, points, chunk_size=2.5)
+    assert_raises(ValueError, mol.compute_ked, points, chunk_size="10")
+
+
+def test_horton_molecule_grid_parallel_fchk_ch4_uhf_ccpvdz():
+    with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as fname:
+        mol = Molecule.from_file(fname)
+    # get expected data computed by Fortran code
+    points, _, _, dens, grad, ke, _, _ = load_data_fortran_ch4_uhf_ccpvdz()
+    # check parallel evaluation against expected values & serial evaluation
+    for n_jobs, chunk_size in [(1, None), (2, None), (2, 3), (3, 100)]:
+        assert_almost_equal(mol.compute_density(points, n_jobs=n_jobs, chunk_size=chunk_size),
+                            dens, decimal=6)
+        assert_almost_equal(mol.compute_gradient(points, n_jobs=n_jobs, chunk_size=chunk_size),
+                            grad, decimal=6)
+        assert_almost_equal(mol.compute_ked(points, n_jobs=n_jobs, chunk_size=chunk_size),
+                            ke, decimal=6)
+        assert_almost_equal(mol.compute_hessian(points, n_jobs=n_jobs, chunk_size=chunk_size),
+                            mol.compute_hessian(points), decimal=8)
+        assert_almost_equal(mol.compute_esp(points, n_jobs=n_jobs, chunk_size=chunk_size),
+                            mol.compute_esp(points), decimal=8)
+    # check parallel evaluation writes into the given output array
+    output = np.zeros(points.shape[0])
+    result = mol.compute_density(points, "a", range(1, 6), output, n_jobs=2)
+    assert result is output
+    assert_almost_equal(output, dens / 2, decimal=6)
+    # check invalid n_jobs argument
+    assert_raises(ValueError, mol.compute_density, points, n_jobs=0)
+    assert_raises(ValueError, mol.compute_gradient, points, n_jobs=-2)
+    assert_raises(ValueError, mol.compute_hessian, points, n_jobs=1.5)
+    assert_raises(ValueError, mol.compute_ked, points, n_jobs=2, chunk_size=0)
+
+
+def test_horton_molecule_grid_properties_fchk_ch4_uhf_ccpvdz():
+    with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as fname:
+        mol = Molecule.from_file(fname)
+    # get expected data computed by Fortran code
+    points, _, _, dens, grad, ke, _, _ = load_data_fortran_ch4_uhf_ccpvdz()
+    hess = mol.compute_hessian(points)
+    lap = hess[:, 0] + hess[:, 3] + hess[:, 5]
+    # check bundled evaluation against separate evaluations
+    for chunk_size in [None, 4]:
+        result = mol.compute_properties(points, ["density", "gradient", "hessian"],
+                                        chunk_size=chunk_size)
+        assert_almost_equal(result[0], dens, decimal=6)
+        assert_almost_equal(result[1], grad, decimal=6)
+        assert_almost_equal(result[2], hess, decimal=8)
+        result = mol.compute_properties(points, ["ked", "density", "gradient"],
+                                        chunk_size=chunk_size)
+        assert_almost_equal(result[0], ke, decimal=6)
+        assert_almost_equal(result[1], dens, decimal=6)
+        assert_almost_equal(result[2], grad, decimal=6)
+        result = mol.compute_properties(points, ["laplacian", "density"], chunk_size=chunk_size)
+        assert_almost_equal(result[0], lap, decimal=6)
+        assert_almost_equal(result[1], dens, decimal=6)
+        result = mol.compute_properties(points, ["hessian", "laplacian"], chunk_size=chunk_size)
+        assert_almost_equal(result[0], hess, decimal=8)
+        assert_almost_equal(result[1], lap, decimal=8)
+        result = mol.compute_properties(points, ["gradient"], "a", chunk_size=chunk_size)
+        assert_almost_equal(result[0], grad / 2, decimal=6)
+    # check subset of molecular orbitals
+    result = mol.compute_properties(points, ["density"], "b", range(1, 6))
+    assert_almost_equal(result[0], dens / 2, decimal=6)
+    # check invalid arguments
+    assert_raises(ValueError, mol.compute_properties, points, "density")
+    assert_raises(ValueError, mol.compute_properties, points, [])
+    assert_raises(ValueError, mol.compute_properties, points, ["density", "esp"])
+    assert_raises(ValueError, mol.compute_properties, points, ["density"], "alphabeta")
+    assert_raises(ValueError, mol.compute_properties, points, ["ked"], chunk_size=0)
+    assert_raises(ValueError, mol.compute_properties, np.array([[0., 0.]]), ["density"])
+
+
 # def test_horton_molecule_fortran_wfn_ch4_uhf_ccpvdz():
 #     # make an instance of molecule
 #     molecule = HortonMolecule.from_file(context.get_fn("test/ch4_uhf_ccpvdz.wfn"))